@@ -0,0 +1,95 @@
+"""
+Порівняння вартості JSON для списку пропозицій (одна сторінка, PAGE_SIZE записів).
+
+Створює тестову БД, заповнює її пропозиціями з вкладеними гравцями, серіалізує сторінку
+так само, як TicTacToePropositionViewSet.list, і міряє:
+рендер (DRF JSONRenderer проти ORJSONRenderer), розбір на бекенді (JSONParser проти ORJSONParser)
+і розбір на боці tg_front (json.loads проти orjson.loads).
+
+    python -m benchmarks.bench_json --number 500
+"""
+import argparse
+import io
+import json
+import os
+import timeit
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bot_backend.settings')
+django.setup()
+
+import orjson  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from bot_backend.renderers import ORJSONParser, ORJSONRenderer  # noqa: E402
+from tictactoe.models import PossibleSign, TicTacToeProposition  # noqa: E402
+from tictactoe.serializers import TicTacToePropositionGetSerializer  # noqa: E402
+from user_management.models import TgUser  # noqa: E402
+
+
+def build_page(size: int) -> dict:
+    content_type = TgUser.get_content_type()
+    TgUser.objects.bulk_create([
+        TgUser(id=9_000_000_000 + index, tg_first_name=f'Player {index}', tg_username=f'player_{index}',
+               language_code='uk')
+        for index in range(size + 1)
+    ])
+    TicTacToeProposition.objects.bulk_create([
+        TicTacToeProposition(
+            player1_content_type=content_type,
+            player1_object_id=9_000_000_000,
+            player2_content_type=content_type,
+            player2_object_id=9_000_000_001 + index,
+            player1_sign=PossibleSign.CROSS,
+            player2_sign=PossibleSign.NOUGHT,
+            player1_first=bool(index % 2),
+        )
+        for index in range(size)
+    ])
+    request = APIRequestFactory().get('/')
+    propositions = TicTacToeProposition.objects.select_related('player1_content_type', 'player2_content_type')
+    results = TicTacToePropositionGetSerializer(propositions[:size], many=True, context={'request': request}).data
+    return {'count': size, 'next': None, 'previous': None, 'results': results}
+
+
+def report(name: str, number: int, seconds: float) -> None:
+    print(f'{name:<40} {seconds / number * 1e6:10.1f} us/op')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='JSON encode/decode cost for a page of propositions')
+    parser.add_argument('--number', type=int, default=500)
+    args = parser.parse_args()
+    number = args.number
+    size = settings.REST_FRAMEWORK['PAGE_SIZE']
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        page = build_page(size)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    drf_body = JSONRenderer().render(page)
+    orjson_body = ORJSONRenderer().render(page)
+    assert json.loads(drf_body) == json.loads(orjson_body)
+    print(f'page of {size} propositions: {len(drf_body)} bytes (DRF), {len(orjson_body)} bytes (orjson)')
+
+    report('render: DRF JSONRenderer', number, timeit.timeit(lambda: JSONRenderer().render(page), number=number))
+    report('render: ORJSONRenderer', number, timeit.timeit(lambda: ORJSONRenderer().render(page), number=number))
+    report('parse: DRF JSONParser', number, timeit.timeit(
+        lambda: JSONParser().parse(io.BytesIO(drf_body)), number=number))
+    report('parse: ORJSONParser', number, timeit.timeit(
+        lambda: ORJSONParser().parse(io.BytesIO(drf_body)), number=number))
+    report('tg_front: json.loads', number, timeit.timeit(lambda: json.loads(drf_body), number=number))
+    report('tg_front: orjson.loads', number, timeit.timeit(lambda: orjson.loads(drf_body), number=number))
+
+
+if __name__ == '__main__':
+    main()
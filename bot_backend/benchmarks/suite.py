@@ -0,0 +1,241 @@
+"""
+Набір мікробенчмарків рушія гри і серіалізаторів з JSON-базовими лініями.
+
+Кожен бенчмарк - функція підготовки, що повертає виклик для вимірювання. Вимірювання - timeit:
+кількість викликів у серії підбирається autorange (>= 0.2 с), серій --repeat; у звіт ідуть
+мінімум і медіана часу одного виклику в мікросекундах. Бенчмарки з db=True виконуються
+на тимчасовій тестовій БД (як у manage.py test).
+
+    python -m benchmarks.suite run --save benchmarks/baselines/main.json
+    python -m benchmarks.suite run --compare benchmarks/baselines/main.json --threshold 0.1
+    python -m benchmarks.suite compare benchmarks/baselines/main.json current.json
+
+compare (і run --compare) завершується з кодом 1, якщо медіана хоча б одного бенчмарку
+зросла більше ніж на --threshold відносно базової лінії.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime, timezone
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bot_backend.settings')
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.http import QueryDict  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from tic_tac_toe_3x3.logic.minimax import find_best_move  # noqa: E402
+
+from tictactoe.models import Game, GameState, PossibleSign, TicTacToeProposition  # noqa: E402
+from tictactoe.serializers import (  # noqa: E402
+    GameMoveSerializer, TicTacToePropositionFilterSerializer, TicTacToePropositionGetSerializer,
+)
+from user_management.models import TgUser  # noqa: E402
+
+DEFAULT_THRESHOLD = 0.1
+BENCHMARKS = {}
+
+# Дошки з різних етапів гри: початок, середина, виграш, нічия
+BOARDS = ('         ', 'X0  X    ', 'XX 00    ', 'X0 0X   X', 'X0X00XXX0')
+
+
+def benchmark(name: str, db: bool = False):
+    def register(setup):
+        BENCHMARKS[name] = (setup, db)
+        return setup
+    return register
+
+
+def make_game(**fields) -> Game:
+    """Незбережена гра: рушію і серіалізатору ходу БД не потрібна."""
+    return Game(
+        id=1, player1_content_type_id=1, player1_object_id=1, player2_content_type_id=1, player2_object_id=2,
+        player1_first=True, player1_symbol=PossibleSign.CROSS, player2_symbol=PossibleSign.NOUGHT, **fields,
+    )
+
+
+@benchmark('engine.evaluate_board')
+def bench_evaluate_board():
+    """Підсумок дошки за рушієм (Game.progress): черга ходу, переможець, виграшні клітинки, кінець гри."""
+    game = make_game()
+    states = [GameState(id=index, game=game, cells=cells) for index, cells in enumerate(BOARDS)]
+    return lambda: [game.progress(state) for state in states]
+
+
+@benchmark('engine.validate_move')
+def bench_validate_move():
+    """Перевірка ходу GameMoveSerializer: ply, черговість, зайнятість клітинки і новий стан дошки."""
+    game = make_game()
+    state = GameState(id=1, game=game, cells='X0  X    ')
+    context = {'game': game, 'state': state, 'player_content_type_id': 1, 'player_object_id': 2}
+
+    def validate():
+        serializer = GameMoveSerializer(data={'cell': 8, 'ply': 3}, context=context)
+        assert serializer.is_valid(), serializer.errors
+
+    return validate
+
+
+@benchmark('engine.ai_move')
+def bench_ai_move():
+    """Вибір ходу мінімаксом рушія tic_tac_toe_3x3 з середини гри (повний перебір без відсікань)."""
+    engine_state = make_game().engine_state('X0  X    ')
+    return lambda: find_best_move(engine_state)
+
+
+@benchmark('serializers.proposition_list_50', db=True)
+def bench_proposition_list():
+    """TicTacToePropositionGetSerializer(many=True) для 50 рядків з уже завантаженими гравцями (без SQL)."""
+    content_type = TgUser.get_content_type()
+    TgUser.objects.bulk_create([
+        TgUser(id=9_100_000_000 + index, tg_first_name=f'Player {index}', tg_username=f'player_{index}',
+               language_code='uk')
+        for index in range(51)
+    ])
+    TicTacToeProposition.objects.bulk_create([
+        TicTacToeProposition(
+            player1_content_type=content_type,
+            player1_object_id=9_100_000_000,
+            player2_content_type=content_type,
+            player2_object_id=9_100_000_001 + index,
+            player1_sign=PossibleSign.CROSS,
+            player2_sign=PossibleSign.NOUGHT,
+            player1_first=bool(index % 2),
+        )
+        for index in range(50)
+    ])
+    propositions = list(
+        TicTacToeProposition.objects.select_related('player1_content_type', 'player2_content_type')
+        .prefetch_related('player1', 'player2').order_by('id')
+    )
+    context = {'request': APIRequestFactory().get('/')}
+    return lambda: TicTacToePropositionGetSerializer(propositions, many=True, context=context).data
+
+
+@benchmark('serializers.filter_statuses')
+def bench_filter_statuses():
+    """Розбір query-параметрів списку пропозицій, зокрема statuses через кому."""
+    query = QueryDict('statuses=pending,accepted,rejected&is_player1=true&expired=false')
+
+    def parse():
+        serializer = TicTacToePropositionFilterSerializer(data=query)
+        assert serializer.is_valid(), serializer.errors
+
+    return parse
+
+
+def measure(func, repeat: int) -> dict:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = [seconds / number * 1e6 for seconds in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'min_us': round(min(timings), 3),
+        'median_us': round(statistics.median(timings), 3),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def run(names: list[str], repeat: int = 5) -> dict:
+    results = {}
+    plain = [name for name in names if not BENCHMARKS[name][1]]
+    with_db = [name for name in names if BENCHMARKS[name][1]]
+    for name in plain:
+        results[name] = measure(BENCHMARKS[name][0](), repeat)
+    if with_db:
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            for name in with_db:
+                results[name] = measure(BENCHMARKS[name][0](), repeat)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'benchmarks': {name: results[name] for name in names},
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """Порівняння медіан; regression - зростання більше ніж на `threshold` (частка)."""
+    rows = []
+    for name, result in current['benchmarks'].items():
+        base = baseline['benchmarks'].get(name)
+        if base is None:
+            rows.append({'name': name, 'baseline_us': None, 'current_us': result['median_us'], 'change': None,
+                         'regression': False})
+            continue
+        change = result['median_us'] / base['median_us'] - 1
+        rows.append({'name': name, 'baseline_us': base['median_us'], 'current_us': result['median_us'],
+                     'change': round(change, 4), 'regression': change > threshold})
+    return rows
+
+
+def print_results(report: dict) -> None:
+    print(f"{'benchmark':<36} {'median us':>12} {'min us':>12} {'calls':>8}")
+    for name, result in report['benchmarks'].items():
+        print(f"{name:<36} {result['median_us']:>12.2f} {result['min_us']:>12.2f} {result['number']:>8}")
+
+
+def print_comparison(rows: list[dict], threshold: float) -> bool:
+    print(f"{'benchmark':<36} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for row in rows:
+        baseline = f"{row['baseline_us']:.2f}" if row['baseline_us'] is not None else '-'
+        change = f"{row['change']:+.1%}" if row['change'] is not None else 'new'
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['name']:<36} {baseline:>12} {row['current_us']:>12.2f} {change:>8}{flag}")
+    regressions = [row['name'] for row in rows if row['regression']]
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {threshold:.0%}: {', '.join(regressions)}")
+    return not regressions
+
+
+def load(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Game engine and serializer microbenchmarks with JSON baselines')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='run benchmarks')
+    run_parser.add_argument('names', nargs='*', help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--save', help='write results to this JSON file (e.g. a new baseline)')
+    run_parser.add_argument('--compare', help='baseline JSON file to compare the results with')
+    run_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        sys.exit(0 if print_comparison(compare(load(args.baseline), load(args.current), args.threshold),
+                                       args.threshold) else 1)
+
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    report = run(args.names or list(BENCHMARKS), args.repeat)
+    print_results(report)
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(report, file, indent=2)
+    if args.compare:
+        print()
+        if not print_comparison(compare(load(args.compare), report, args.threshold), args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
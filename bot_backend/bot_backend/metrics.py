@@ -0,0 +1,230 @@
+"""
+Метрики процесу в текстовому форматі Prometheus (exposition format 0.0.4) без сторонніх залежностей.
+
+Лічильники й гістограми живуть у пам'яті процесу: при кількох воркерах кожен віддає свої значення,
+тож Prometheus має опитувати воркери окремо або агрегувати за instance.
+Значення, які дешевше зчитати в момент запиту /metrics (стан пулу з'єднань), дають колектори.
+"""
+import ipaddress
+import math
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Поточні значення в ConnectionPool.get_stats(); решта статистики psycopg_pool - лічильники від старту пулу
+POOL_GAUGES = {'pool_min', 'pool_max', 'pool_size', 'pool_available', 'requests_waiting'}
+
+
+def escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] += amount
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        lines = self.header()
+        for key, value in values.items():
+            lines.append(f'{self.name}{format_labels(dict(zip(self.labelnames, key)))} {format_value(value)}')
+        return lines
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (math.inf,)
+        # ключ міток -> [лічильники кошиків..., сума, кількість]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            values = {key: list(state) for key, state in self._values.items()}
+        lines = self.header()
+        for key, state in values.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for index, bound in enumerate(self.buckets):
+                cumulative += state[index]
+                bucket_labels = format_labels({**labels, 'le': format_value(float(bound))})
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{self.name}_sum{format_labels(labels)} {format_value(state[-2])}')
+            lines.append(f'{self.name}_count{format_labels(labels)} {state[-1]}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[Metric] = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, func):
+        """Реєструє функцію, що повертає рядки метрик на момент запиту."""
+        self._collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.histogram(
+    'django_http_request_duration_seconds',
+    'HTTP request latency by DRF route (URL name) and viewset action.',
+    ['method', 'view', 'action', 'status'],
+)
+REQUEST_DB_QUERIES = registry.histogram(
+    'django_http_request_db_queries',
+    'Number of DB queries per HTTP request.',
+    ['view'],
+    buckets=(1, 2, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_DURATION = registry.histogram(
+    'django_http_request_db_duration_seconds',
+    'Total DB time per HTTP request.',
+    ['view'],
+)
+CONDITIONAL_REQUESTS = registry.counter(
+    'django_http_conditional_requests_total',
+    'Conditional GET requests by ETag: hit - answered 304 Not Modified, miss - full response.',
+    ['view', 'result'],
+)
+DB_CONNECTIONS_CREATED = registry.counter(
+    'django_db_connections_created_total',
+    'New DB connections opened by this process.',
+    ['alias'],
+)
+
+
+def count_connection(sender, connection, **kwargs):
+    DB_CONNECTIONS_CREATED.inc(alias=connection.alias)
+
+
+connection_created.connect(count_connection, dispatch_uid='metrics_count_connection')
+
+
+@registry.collector
+def db_pool_metrics() -> list[str]:
+    """Стан пулу psycopg (якщо увімкнено OPTIONS["pool"]) і налаштування постійних з'єднань."""
+    lines = [
+        '# HELP django_db_conn_max_age_seconds CONN_MAX_AGE of the database alias (0 - connection per request).',
+        '# TYPE django_db_conn_max_age_seconds gauge',
+    ]
+    # статистика -> рядки значень усіх псевдонімів: у форматі Prometheus кожна метрика має свої HELP і TYPE
+    pool_samples = defaultdict(list)
+    for alias, database in settings.DATABASES.items():
+        labels = format_labels({'alias': alias})
+        lines.append(f'django_db_conn_max_age_seconds{labels} {database.get("CONN_MAX_AGE") or 0}')
+        if not database.get('OPTIONS', {}).get('pool'):
+            continue
+        for stat, value in connections[alias].pool.get_stats().items():
+            pool_samples[stat].append(f'django_db_pool_{stat}{labels} {value}')
+    for stat, samples in pool_samples.items():
+        kind = 'gauge' if stat in POOL_GAUGES else 'counter'
+        description = 'current value' if kind == 'gauge' else 'total since the pool was opened'
+        lines.append(f'# HELP django_db_pool_{stat} psycopg_pool statistic {stat}, {description}.')
+        lines.append(f'# TYPE django_db_pool_{stat} {kind}')
+        lines.extend(samples)
+    return lines
+
+
+def view_labels(request) -> tuple[str, str]:
+    """Ім'я маршруту і дія DRF (list, retrieve, accept, ...) - обмежений набір значень для міток."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>', ''
+    actions = getattr(match.func, 'actions', None) or {}
+    return match.view_name or match.route, actions.get(request.method.lower(), '')
+
+
+def is_allowed_address(address: str | None) -> bool:
+    """Чи входить адреса клієнта в METRICS_ALLOWED_IPS (окремі адреси або мережі у форматі CIDR)."""
+    try:
+        address = ipaddress.ip_address(address or '')
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False) for network in settings.METRICS_ALLOWED_IPS)
+
+
+def metrics_view(request):
+    # Метрики розкривають маршрути, навантаження й стан БД - лише для Prometheus зі списку дозволених адрес
+    if not settings.METRICS_ALLOWED_IPS:
+        return HttpResponseNotFound()
+    if not is_allowed_address(request.META.get('REMOTE_ADDR')):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,141 @@
+"""
+Інструментування запитів до БД на кожен HTTP-запит.
+
+Через connection.execute_wrapper рахуються кількість запитів, сумарний час у БД,
+найповільніший запит і повтори однакових запитів (за відбитком SQL без літералів).
+У DEBUG (або з QUERY_STATS_HEADERS) статистика віддається в заголовках X-DB-*,
+завжди - у структурований лог; перевищення порогів логуються як warning разом із SQL.
+Запити, виконані під час віддачі StreamingHttpResponse, не враховуються.
+
+MetricsMiddleware додає тривалість запиту та статистику БД у гістограми bot_backend.metrics.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import REQUEST_DB_DURATION, REQUEST_DB_QUERIES, REQUEST_DURATION, view_labels
+
+logger = logging.getLogger('bot_backend.db')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """Нормалізований SQL: літерали й списки IN замінено на "?", щоб N+1 запити мали однаковий відбиток."""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryStats:
+    """execute_wrapper, що збирає статистику запитів одного HTTP-запиту."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = None
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.total += duration
+            self.fingerprints[fingerprint(sql)] += 1
+            if duration >= self.slowest:
+                self.slowest = duration
+                self.slowest_sql = (sql, params)
+
+    @property
+    def duplicates(self) -> dict[str, int]:
+        return {sql: count for sql, count in self.fingerprints.items() if count > 1}
+
+    def summary(self) -> dict:
+        return {
+            'queries': self.count,
+            'db_time_ms': round(self.total * 1000, 3),
+            'slowest_ms': round(self.slowest * 1000, 3),
+            'duplicate_queries': sum(count - 1 for count in self.duplicates.values()),
+        }
+
+
+class QueryStatsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        with ExitStack() as stack:
+            for alias in settings.DATABASES:
+                stack.enter_context(connections[alias].execute_wrapper(stats))
+            response = self.get_response(request)
+        # Для метрик та інших middleware вище за стеком
+        request.db_stats = stats
+
+        summary = stats.summary()
+        if settings.DEBUG or settings.QUERY_STATS_HEADERS:
+            response['X-DB-Query-Count'] = str(summary['queries'])
+            response['X-DB-Time-Ms'] = str(summary['db_time_ms'])
+            response['X-DB-Slowest-Ms'] = str(summary['slowest_ms'])
+            response['X-DB-Duplicate-Queries'] = str(summary['duplicate_queries'])
+
+        route = getattr(getattr(request, 'resolver_match', None), 'route', None) or request.path
+        log_context = {'method': request.method, 'route': route, 'status': response.status_code, **summary}
+        logger.info(
+            "%s %s: %s queries, %s ms in DB", request.method, route, summary['queries'], summary['db_time_ms'],
+            extra={'db': log_context},
+        )
+        self.check_thresholds(stats, log_context)
+        return response
+
+    @staticmethod
+    def check_thresholds(stats: QueryStats, log_context: dict):
+        if stats.slowest * 1000 >= settings.SLOW_QUERY_MS and stats.slowest_sql is not None:
+            sql, params = stats.slowest_sql
+            logger.warning(
+                "Slow query (%.1f ms) in %s %s: %s; params=%r",
+                stats.slowest * 1000, log_context['method'], log_context['route'], sql, params,
+                extra={'db': log_context},
+            )
+        if stats.count > settings.QUERY_COUNT_THRESHOLD or stats.total * 1000 >= settings.QUERY_TIME_THRESHOLD_MS:
+            repeated = sorted(stats.duplicates.items(), key=lambda item: -item[1])[:5]
+            logger.warning(
+                "Too many queries in %s %s: %s queries, %.1f ms; repeated: %s",
+                log_context['method'], log_context['route'], stats.count, stats.total * 1000,
+                '; '.join(f"{count}x {sql}" for sql, count in repeated) or '-',
+                extra={'db': log_context},
+            )
+
+
+class MetricsMiddleware:
+    """Має стояти перед QueryStatsMiddleware: читає request.db_stats, який та встановлює."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        view, action = view_labels(request)
+        REQUEST_DURATION.observe(duration, method=request.method, view=view, action=action,
+                                 status=response.status_code)
+        stats = getattr(request, 'db_stats', None)
+        if stats is not None:
+            REQUEST_DB_QUERIES.observe(stats.count, view=view)
+            REQUEST_DB_DURATION.observe(stats.total, view=view)
+        return response
@@ -0,0 +1,147 @@
+"""
+Вибірковий профайлер повільних запитів.
+
+Один фоновий потік стежить за потоками, що обробляють запити. Поки запит не перевищив поріг,
+потік спить до найближчого дедлайну і нічого не робить; після порогу (або одразу - для частки
+запитів, відібраних випадково) він кожні PROFILE_INTERVAL_MS знімає стек потоку запиту
+через sys._current_frames(). Профіль записується у файл collapsed stacks
+("frame;frame;frame count" на рядок), з якого flamegraph.pl або speedscope будують flame graph.
+
+Стеки знімаються лише після порогу, тож профіль показує саме ту частину запиту, що виявилась повільною.
+"""
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger('bot_backend.profiling')
+
+
+def frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def collapse(frame) -> str:
+    """Стек від кореня до поточного кадру у форматі collapsed stacks."""
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def write_collapsed(stacks: Counter, directory: Path, label: str) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    safe_label = ''.join(char if char.isalnum() or char in '-_.' else '_' for char in label)[:100]
+    path = directory / f"{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}-{safe_label}.collapsed"
+    path.write_text(''.join(f"{stack} {count}\n" for stack, count in stacks.most_common()))
+    return path
+
+
+class Profile:
+    __slots__ = ('thread_id', 'started', 'deadline', 'stacks')
+
+    def __init__(self, thread_id: int, threshold: float):
+        self.thread_id = thread_id
+        self.started = time.monotonic()
+        self.deadline = self.started + threshold
+        self.stacks = Counter()
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+
+class StackSampler:
+    """Фоновий потік, що знімає стеки зареєстрованих потоків після їхнього дедлайну."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._profiles: dict[int, Profile] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self, threshold: float) -> Profile:
+        profile = Profile(threading.get_ident(), threshold)
+        with self._lock:
+            self._profiles[profile.thread_id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return profile
+
+    def stop(self, profile: Profile) -> Profile:
+        with self._lock:
+            self._profiles.pop(profile.thread_id, None)
+        return profile
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                # Під блокуванням: stop() не забере профіль, поки в нього дописується вибірка
+                profiles = list(self._profiles.values())
+                due = [profile for profile in profiles if profile.deadline <= now]
+                if due:
+                    frames = sys._current_frames()
+                    for profile in due:
+                        frame = frames.get(profile.thread_id)
+                        if frame is not None and profile.thread_id != own_id:
+                            profile.stacks[collapse(frame)] += 1
+                    del frames
+            if due:
+                timeout = self.interval
+            elif profiles:
+                # Жоден запит ще не повільний - спимо до найближчого порогу
+                timeout = min(profile.deadline for profile in profiles) - now
+            else:
+                timeout = None
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+
+class ProfilingMiddleware:
+    """
+    Профілює запити, довші за PROFILE_THRESHOLD_MS, і частку PROFILE_SAMPLE_RATE усіх запитів.
+    Вимкнений (PROFILING_ENABLED=0) - не потрапляє в ланцюжок middleware зовсім.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.PROFILE_THRESHOLD_MS / 1000
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE
+        self.directory = Path(settings.PROFILE_DIR)
+        self.sampler = StackSampler(settings.PROFILE_INTERVAL_MS / 1000)
+
+    def __call__(self, request):
+        sampled = self.sample_rate and random.random() < self.sample_rate
+        profile = self.sampler.start(0 if sampled else self.threshold)
+        try:
+            return self.get_response(request)
+        finally:
+            self.sampler.stop(profile)
+            if profile.samples:
+                self.save(request, profile)
+
+    def save(self, request, profile: Profile):
+        match = getattr(request, 'resolver_match', None)
+        label = f"{request.method}-{match.view_name if match else request.path}"
+        path = write_collapsed(profile.stacks, self.directory, label)
+        logger.info(
+            "Profiled %s %s: %.1f ms, %s samples -> %s",
+            request.method, request.path, (time.monotonic() - profile.started) * 1000, profile.samples, path,
+        )
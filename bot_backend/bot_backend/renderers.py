@@ -0,0 +1,38 @@
+"""
+JSON-рендерер і парсер DRF на orjson (необов'язкова залежність).
+
+Вивід сумісний з rest_framework.renderers.JSONRenderer: компактний UTF-8,
+datetime/Decimal/lazy-рядки серіалізуються тим самим JSONEncoder DRF.
+Якщо orjson не встановлено, settings підключають стандартні класи DRF.
+"""
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_encoder = JSONEncoder()
+# datetime передається в JSONEncoder DRF - він обрізає мікросекунди до мілісекунд і пише "Z" для UTC
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=_encoder.default, option=OPTIONS)
+
+
+class ORJSONParser(BaseParser):
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
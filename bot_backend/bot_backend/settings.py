@@ -46,10 +46,16 @@ INSTALLED_APPS = [
     "rest_framework",
     "user_management",
     "tictactoe",
+    "diagnostics",
     "drf_spectacular",
 ]
 
 MIDDLEWARE = [
+    "bot_backend.middleware.MetricsMiddleware",
+    "bot_backend.middleware.QueryStatsMiddleware",
+    "diagnostics.slow_queries.SlowQueryMiddleware",
+    "bot_backend.profiling.ProfilingMiddleware",
+    "bot_backend.tracing.TracingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -139,12 +145,82 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# orjson - необов'язкове пришвидшення JSON; без нього (або з USE_ORJSON=0) працюють стандартні класи DRF
+try:
+    import orjson  # noqa: F401
+    USE_ORJSON = os.environ.get("USE_ORJSON", "1") == "1"
+except ImportError:
+    USE_ORJSON = False
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 50,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'bot_backend.renderers.ORJSONRenderer' if USE_ORJSON else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'bot_backend.renderers.ORJSONParser' if USE_ORJSON else 'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Ендпоінт /metrics (bot_backend.metrics) віддає метрики лише адресам і мережам зі списку (через кому);
+# порожній список вимикає ендпоінт. Перевіряється REMOTE_ADDR - за проксі вкажіть адресу проксі
+METRICS_ALLOWED_IPS = [
+    address.strip() for address in os.environ.get("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if address.strip()
+]
+
+# Статистика запитів до БД на HTTP-запит (bot_backend.middleware.QueryStatsMiddleware):
+# заголовки X-DB-* поза DEBUG і пороги для warning-логів із SQL
+QUERY_STATS_HEADERS = os.environ.get("QUERY_STATS_HEADERS", "0") == "1"
+QUERY_COUNT_THRESHOLD = int(os.environ.get("QUERY_COUNT_THRESHOLD", 20))
+QUERY_TIME_THRESHOLD_MS = float(os.environ.get("QUERY_TIME_THRESHOLD_MS", 200))
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 100))
+
+# Захоплення повільних запитів (diagnostics.slow_queries): запити, довші за SLOW_QUERY_MS, агрегуються
+# за відбитком у SlowQuery (адмінка); фоновий потік пояснює найдорожчі через EXPLAIN (ANALYZE, BUFFERS)
+# на SLOW_QUERY_EXPLAIN_DATABASE (можна вказати репліку) не частіше, ніж раз на SLOW_QUERY_EXPLAIN_MAX_AGE секунд
+SLOW_QUERY_CAPTURE_ENABLED = os.environ.get("SLOW_QUERY_CAPTURE_ENABLED", "0") == "1"
+SLOW_QUERY_FLUSH_SECONDS = float(os.environ.get("SLOW_QUERY_FLUSH_SECONDS", 30))
+SLOW_QUERY_EXPLAIN_LIMIT = int(os.environ.get("SLOW_QUERY_EXPLAIN_LIMIT", 5))
+SLOW_QUERY_EXPLAIN_MAX_AGE = float(os.environ.get("SLOW_QUERY_EXPLAIN_MAX_AGE", 3600))
+SLOW_QUERY_EXPLAIN_DATABASE = os.environ.get("SLOW_QUERY_EXPLAIN_DATABASE", "default")
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.environ.get("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", 5000))
+
+# Помісячні розділи TicTacToeProposition і GameState (tictactoe.partitions, manage.py manage_partitions):
+# на скільки місяців наперед створювати розділи і скільки повних місяців зберігати (0 - не видаляти).
+# Видалення лише явне: термін зберігання задається в оточенні, а розділи видаляє запуск manage_partitions
+# за розкладом (при старті сервісу - тільки --create-only).
+# Стани завершених ігор переносить в архів archive_games; решта - стани незавершених ігор, тож за замовчуванням
+# розділи GameState не видаляються, а з терміном зберігання видаляються лише вже порожні
+PARTITION_MONTHS_AHEAD = int(os.environ.get("PARTITION_MONTHS_AHEAD", 3))
+PARTITION_RETENTION_MONTHS = {
+    "tictactoe.TicTacToeProposition": int(os.environ.get("PROPOSITION_RETENTION_MONTHS", 0)),
+    "tictactoe.GameState": int(os.environ.get("GAME_STATE_RETENTION_MONTHS", 0)),
 }
 
+# Вибірковий профайлер (bot_backend.profiling): стеки запитів, довших за поріг, і випадкової частки запитів
+# пишуться у PROFILE_DIR у форматі collapsed stacks для flame graph
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+PROFILE_THRESHOLD_MS = float(os.environ.get("PROFILE_THRESHOLD_MS", 500))
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 5))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", BASE_DIR / "profiles")
+
+# Трасування (bot_backend.tracing): контекст із заголовка traceparent від tg_front, span-и в'юх,
+# серіалізаторів і SQL у форматі OTLP/JSON - у файл і/або на OTLP/HTTP-колектор (http://collector:4318)
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "0") == "1"
+TRACING_SAMPLE_RATE = float(os.environ.get("TRACING_SAMPLE_RATE", 0))
+TRACING_EXPORT_PATH = os.environ.get("TRACING_EXPORT_PATH", "")
+TRACING_OTLP_ENDPOINT = os.environ.get("TRACING_OTLP_ENDPOINT", "")
+
+# Server-sent events (стрім оновлень пропозицій та ходів для TgUser)
+EVENTS_KEEPALIVE_SECONDS = int(os.environ.get("EVENTS_KEEPALIVE_SECONDS", 15))
+EVENTS_QUEUE_SIZE = int(os.environ.get("EVENTS_QUEUE_SIZE", 100))
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'TicTacToe API',
     'DESCRIPTION': 'API for managing TicTacToe.',
@@ -0,0 +1,312 @@
+"""
+Трасування запиту від оновлення Telegram до SQL.
+
+tg_front передає контекст трасування в заголовку traceparent (W3C Trace Context).
+TracingMiddleware продовжує цей trace: span запиту, span в'юхи, span-и серіалізаторів
+(TracedSerializerMixin) і span на кожен SQL-запит (connection.execute_wrapper).
+Без заголовка trace починається тут із ймовірністю TRACING_SAMPLE_RATE.
+
+Span-и пишуться у фоновому потоці пачками у форматі OTLP/JSON (ExportTraceServiceRequest):
+рядок на пачку у файл TRACING_EXPORT_PATH (читає otlpjsonfile receiver колектора OpenTelemetry)
+та/або POST на TRACING_OTLP_ENDPOINT + /v1/traces. Якщо запит не трасується, span() нічого не робить.
+"""
+import json
+import logging
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Callable
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import serializers
+
+from .middleware import fingerprint
+
+logger = logging.getLogger('bot_backend.tracing')
+
+TRACEPARENT_HEADER = 'traceparent'
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """(trace_id, parent_span_id, sampled) або None, якщо заголовка немає чи він некоректний."""
+    match = _TRACEPARENT.match((value or '').strip().lower())
+    if match is None or match.group(1) == '0' * 32 or match.group(2) == '0' * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+def otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class Span:
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'kind', 'attributes', 'start_ns', 'end_ns', 'error')
+
+    def __init__(self, trace_id: str, parent_id: str | None, name: str, kind: int = SPAN_KIND_INTERNAL,
+                 attributes: dict | None = None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def traceparent(self) -> str:
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+    def to_otlp(self) -> dict:
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [{'key': key, 'value': otlp_value(value)} for key, value in self.attributes.items()],
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        if self.error:
+            span['status'] = {'code': 2, 'message': self.error}
+        return span
+
+
+class SpanExporter:
+    """Черга готових span-ів і фоновий потік, що скидає їх пачками у файл та/або OTLP/HTTP."""
+
+    def __init__(self, service_name: str, path: str = '', endpoint: str = '',
+                 batch_size: int = 512, flush_interval: float = 1.0, max_queue: int = 10_000):
+        self.service_name = service_name
+        self.path = path
+        self.endpoint = endpoint.rstrip('/')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name='span-exporter', daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            # Трасування не повинно гальмувати запити: span-и понад чергу відкидаються
+            self.dropped += 1
+
+    def payload(self, spans: list[Span]) -> dict:
+        return {'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': otlp_value(self.service_name)}]},
+            'scopeSpans': [{'scope': {'name': __name__}, 'spans': [span.to_otlp() for span in spans]}],
+        }]}
+
+    def write(self, spans: list[Span]):
+        body = json.dumps(self.payload(spans), separators=(',', ':'))
+        if self.path:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(body + '\n')
+        if self.endpoint:
+            request = urllib.request.Request(
+                f'{self.endpoint}/v1/traces', data=body.encode(), headers={'Content-Type': 'application/json'},
+            )
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Чекає, поки фоновий потік запише всі span-и з черги (для тестів і завершення роботи)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _run(self):
+        while True:
+            spans = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(spans) < self.batch_size:
+                try:
+                    spans.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self.write(spans)
+            except Exception:
+                logger.exception("Failed to export %s spans", len(spans))
+            finally:
+                for _ in spans:
+                    self._queue.task_done()
+
+
+_current_span: ContextVar[Span | None] = ContextVar('current_span', default=None)
+_exporter: SpanExporter | None = None
+
+
+def get_exporter() -> SpanExporter:
+    global _exporter
+    if _exporter is None:
+        _exporter = SpanExporter(
+            'bot_backend', path=settings.TRACING_EXPORT_PATH, endpoint=settings.TRACING_OTLP_ENDPOINT,
+        )
+    return _exporter
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """Дочірній span поточного; поза трасованим запитом - нічого не робить і повертає None."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    with activate(Span(parent.trace_id, parent.span_id, name, kind, attributes)) as child:
+        yield child
+
+
+@contextmanager
+def activate(new_span: Span, keep: Callable[[Span], bool] | None = None):
+    """Робить span поточним до виходу з блоку; keep - умова експорту закритого span-а."""
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except Exception as exc:
+        new_span.error = f'{type(exc).__name__}: {exc}'
+        raise
+    finally:
+        _current_span.reset(token)
+        new_span.end_ns = time.time_ns()
+        if keep is None or keep(new_span):
+            get_exporter().export(new_span)
+
+
+def trace_query(execute, sql, params, many, context):
+    """execute_wrapper: span на кожен SQL-запит (відбиток без літералів замість тексту з параметрами)."""
+    operation = sql.split(None, 1)[0].upper() if sql else 'SQL'
+    with span(f'SQL {operation}', SPAN_KIND_CLIENT, **{
+        'db.system': context['connection'].vendor,
+        'db.name': context['connection'].alias,
+        'db.statement': fingerprint(sql),
+    }):
+        return execute(sql, params, many, context)
+
+
+class TracingMiddleware:
+    """Span запиту (SERVER) і span в'юхи; SQL-запити трасованого запиту стають дочірніми span-ами."""
+
+    def __init__(self, get_response):
+        if not settings.TRACING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.TRACING_SAMPLE_RATE
+        get_exporter()
+
+    def start_span(self, request) -> Span | None:
+        incoming = parse_traceparent(request.headers.get(TRACEPARENT_HEADER))
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+            if not sampled:
+                return None
+        elif random.random() < self.sample_rate:
+            trace_id, parent_id = secrets.token_hex(16), None
+        else:
+            return None
+        return Span(trace_id, parent_id, f'{request.method} {request.path}', SPAN_KIND_SERVER, {
+            'http.method': request.method,
+            'http.target': request.path,
+        })
+
+    def __call__(self, request):
+        request_span = self.start_span(request)
+        if request_span is None:
+            return self.get_response(request)
+
+        # Span в'юхи відкривається й закривається тут, в одному контексті contextvars: під ASGI process_view
+        # виконується в іншому контексті, і токен, створений там, не можна скинути тут.
+        # process_view лише дає йому назву й час початку; без знайденої в'юхи span не експортується
+        view_span = request._view_span = Span(request_span.trace_id, request_span.span_id, 'view')
+        with activate(request_span), ExitStack() as stack:
+            for alias in settings.DATABASES:
+                stack.enter_context(connections[alias].execute_wrapper(trace_query))
+            with activate(view_span, keep=lambda span: 'code.function' in span.attributes):
+                response = self.get_response(request)
+            match = getattr(request, 'resolver_match', None)
+            if match is not None and match.route:
+                request_span.name = f'{request.method} {match.route}'
+                request_span.attributes['http.route'] = match.route
+            request_span.attributes['http.status_code'] = response.status_code
+            if response.status_code >= 500:
+                request_span.error = f'HTTP {response.status_code}'
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_span = getattr(request, '_view_span', None)
+        if view_span is None:
+            return None
+        # Закривається в __call__ після відповіді в'юхи (разом з обробкою middleware нижче за стеком)
+        view_name = getattr(view_func, '__name__', type(view_func).__name__)
+        actions = getattr(view_func, 'actions', None) or {}
+        action = actions.get(request.method.lower())
+        view_span.name = f'view {view_name}.{action}' if action else f'view {view_name}'
+        view_span.attributes['code.function'] = view_name
+        view_span.start_ns = time.time_ns()
+        return None
+
+
+class TracedSerializerMixin:
+    """Span-и валідації, збереження і серіалізації для серіалізаторів верхнього рівня."""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_serializer = super().many_init(*args, **kwargs)
+        # Власний list_serializer_class з Meta не підміняється
+        if type(list_serializer) is serializers.ListSerializer:
+            list_serializer.__class__ = TracedListSerializer
+        return list_serializer
+
+    def _span_name(self, method: str) -> str:
+        child = getattr(self, 'child', None)
+        name = f'{type(child).__name__}[]' if child is not None else type(self).__name__
+        return f'serializer {name}.{method}'
+
+    def is_valid(self, *, raise_exception=False):
+        with span(self._span_name('is_valid')):
+            return super().is_valid(raise_exception=raise_exception)
+
+    def save(self, **kwargs):
+        with span(self._span_name('save')):
+            return super().save(**kwargs)
+
+    @property
+    def data(self):
+        with span(self._span_name('data')):
+            return super().data
+
+
+class TracedListSerializer(TracedSerializerMixin, serializers.ListSerializer):
+    pass
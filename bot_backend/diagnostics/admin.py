@@ -0,0 +1,41 @@
+from django.contrib import admin, messages
+from django.utils.html import format_html
+
+from .models import SlowQuery
+from .slow_queries import explain_slow_query, plan_lines
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ("short_fingerprint", "calls", "mean", "max_ms", "total_ms", "plan_ms", "route", "last_seen")
+    search_fields = ("fingerprint", "route")
+    ordering = ("-total_ms",)
+    list_filter = ("last_seen", "explained_at")
+    readonly_fields = ("fingerprint", "route", "calls", "mean", "max_ms", "total_ms", "first_seen", "last_seen",
+                       "sample_sql", "sample_params", "sample_ms", "plan_text", "plan_ms", "explained_at",
+                       "explain_error")
+    exclude = ("plan",)
+    actions = ("explain_selected",)
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description="fingerprint")
+    def short_fingerprint(self, obj):
+        return obj.fingerprint if len(obj.fingerprint) <= 120 else obj.fingerprint[:117] + "..."
+
+    @admin.display(description="mean, ms")
+    def mean(self, obj):
+        return round(obj.mean_ms, 2)
+
+    @admin.display(description="plan")
+    def plan_text(self, obj):
+        if not obj.plan:
+            return "-"
+        return format_html("<pre>{}</pre>", "\n".join(plan_lines(obj.plan)))
+
+    @admin.action(description="Run EXPLAIN for selected queries")
+    def explain_selected(self, request, queryset):
+        explained = sum(explain_slow_query(query) for query in queryset)
+        level = messages.SUCCESS if explained == len(queryset) else messages.WARNING
+        self.message_user(request, f"Explained {explained} of {len(queryset)} queries.", level)
@@ -0,0 +1,42 @@
+"""
+EXPLAIN для найдорожчих (за сумарним часом) повільних запитів із SlowQuery і вивід їхніх планів.
+
+Пояснюється збережений найповільніший екземпляр з його параметрами; SELECT - з ANALYZE і BUFFERS.
+
+    python manage.py explain_slow_queries --limit 5 --search tictactoe_tictactoeproposition
+"""
+from django.core.management.base import BaseCommand
+
+from diagnostics.models import SlowQuery
+from diagnostics.slow_queries import explain_slow_query, plan_lines
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN (ANALYZE, BUFFERS) for the most expensive captured slow queries and print the plans."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--search', help="only fingerprints containing this text")
+        parser.add_argument('--min-mean-ms', type=float, default=0, help="skip queries with a lower mean time")
+        parser.add_argument('--cached', action='store_true', help="print stored plans without running EXPLAIN")
+
+    def handle(self, *args, **options):
+        queries = SlowQuery.objects.order_by('-total_ms')
+        if options['search']:
+            queries = queries.filter(fingerprint__icontains=options['search'])
+        queries = [query for query in queries if query.mean_ms >= options['min_mean_ms']][:options['limit']]
+        if not queries:
+            self.stdout.write("No slow queries captured.")
+            return
+
+        for query in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{query.calls} calls, mean {query.mean_ms:.1f} ms, max {query.max_ms:.1f} ms, "
+                f"total {query.total_ms:.0f} ms - {query.route or '-'}"
+            ))
+            self.stdout.write(query.fingerprint)
+            if not options['cached'] and not explain_slow_query(query):
+                self.stdout.write(self.style.ERROR(f"EXPLAIN failed: {query.explain_error}"))
+            elif query.plan:
+                self.stdout.write('\n'.join(plan_lines(query.plan)))
+            self.stdout.write('')
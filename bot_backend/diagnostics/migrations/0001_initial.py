@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:09
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("fingerprint_hash", models.CharField(editable=False, max_length=32, unique=True)),
+                ("fingerprint", models.TextField()),
+                ("sample_sql", models.TextField()),
+                ("sample_params", models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ("sample_ms", models.FloatField(default=0, verbose_name="sample duration, ms")),
+                ("route", models.CharField(blank=True, max_length=255)),
+                ("calls", models.PositiveBigIntegerField(default=0)),
+                ("total_ms", models.FloatField(default=0, verbose_name="total time, ms")),
+                ("max_ms", models.FloatField(default=0, verbose_name="max time, ms")),
+                ("first_seen", models.DateTimeField(auto_now_add=True)),
+                ("last_seen", models.DateTimeField(default=django.utils.timezone.now)),
+                ("plan", models.JSONField(blank=True, null=True)),
+                ("plan_ms", models.FloatField(blank=True, null=True, verbose_name="EXPLAIN ANALYZE time, ms")),
+                ("explained_at", models.DateTimeField(blank=True, null=True)),
+                ("explain_error", models.TextField(blank=True)),
+            ],
+            options={
+                "verbose_name": "slow query",
+                "verbose_name_plural": "slow queries",
+                "ordering": ["-total_ms"],
+                "indexes": [models.Index(fields=["-total_ms"], name="diagnostics_total_m_327096_idx")],
+            },
+        ),
+    ]
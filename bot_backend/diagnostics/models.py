@@ -0,0 +1,42 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class SlowQuery(models.Model):
+    """
+    Повільні SQL-запити, згруповані за відбитком (SQL без літералів).
+    Зберігається найповільніший екземпляр з параметрами та останній план EXPLAIN для нього.
+    """
+    fingerprint_hash = models.CharField(max_length=32, unique=True, editable=False)
+    fingerprint = models.TextField()
+    sample_sql = models.TextField()
+    sample_params = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    sample_ms = models.FloatField(default=0, verbose_name=_("sample duration, ms"))
+    # Маршрут останнього HTTP-запиту, в якому трапився запит
+    route = models.CharField(max_length=255, blank=True)
+    calls = models.PositiveBigIntegerField(default=0)
+    total_ms = models.FloatField(default=0, verbose_name=_("total time, ms"))
+    max_ms = models.FloatField(default=0, verbose_name=_("max time, ms"))
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(default=timezone.now)
+    plan = models.JSONField(null=True, blank=True)
+    plan_ms = models.FloatField(null=True, blank=True, verbose_name=_("EXPLAIN ANALYZE time, ms"))
+    explained_at = models.DateTimeField(null=True, blank=True)
+    explain_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = _("slow query")
+        verbose_name_plural = _("slow queries")
+        ordering = ['-total_ms']
+        indexes = [
+            models.Index(fields=['-total_ms']),
+        ]
+
+    def __str__(self):
+        return self.fingerprint[:100]
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
@@ -0,0 +1,251 @@
+"""
+Захоплення повільних SQL-запитів і їхніх планів.
+
+SlowQueryMiddleware через connection.execute_wrapper фіксує запити, довші за SLOW_QUERY_MS,
+і складає їх у пам'ять процесу, згрупувавши за відбитком (bot_backend.middleware.fingerprint).
+Фоновий потік раз на SLOW_QUERY_FLUSH_SECONDS додає накопичене в SlowQuery і для кількох
+найдорожчих відбитків без свіжого плану виконує EXPLAIN на найповільнішому екземплярі.
+
+EXPLAIN виконується на окремому з'єднанні (SLOW_QUERY_EXPLAIN_DATABASE, наприклад репліка)
+в транзакції, яка лише читає, з statement_timeout і завжди відкочується. SELECT пояснюються з
+ANALYZE і BUFFERS, тобто реально виконуються; решта запитів - лише EXPLAIN без виконання.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from bot_backend.middleware import fingerprint
+from .models import SlowQuery
+
+logger = logging.getLogger('bot_backend.db')
+
+
+def fingerprint_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def is_read_only(sql: str) -> bool:
+    """EXPLAIN ANALYZE виконує запит, тож з ANALYZE пояснюються лише SELECT."""
+    return sql.lstrip().lstrip('(').upper().startswith('SELECT')
+
+
+def json_params(params):
+    """Параметри для JSONField; те, що не серіалізується в JSON, не зберігається."""
+    try:
+        return json.loads(json.dumps(params, cls=DjangoJSONEncoder))
+    except (TypeError, ValueError):
+        return None
+
+
+def explain(sql: str, params, using: str = 'default', timeout_ms: int = 5000) -> list:
+    """План запиту у форматі EXPLAIN (FORMAT JSON). Зміни, якщо вони можливі, відкочуються."""
+    options = 'ANALYZE, BUFFERS, FORMAT JSON' if is_read_only(sql) else 'FORMAT JSON'
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            # Перехід у read-only дозволений і всередині вже відкритої транзакції (зокрема в тестах)
+            cursor.execute('SET LOCAL transaction_read_only = on')
+            cursor.execute(f'SET LOCAL statement_timeout = {int(timeout_ms)}')
+            cursor.execute(f'EXPLAIN ({options}) {sql}', params)
+            plan = cursor.fetchone()[0]
+        transaction.set_rollback(True, using=using)
+    return json.loads(plan) if isinstance(plan, str) else plan
+
+
+def plan_lines(plan: list) -> list[str]:
+    """План EXPLAIN (FORMAT JSON) у вигляді, близькому до текстового EXPLAIN."""
+    lines = []
+
+    def walk(node: dict, depth: int):
+        label = node['Node Type']
+        if 'Relation Name' in node:
+            label += f" on {node['Relation Name']}"
+            if node.get('Alias') and node['Alias'] != node['Relation Name']:
+                label += f" {node['Alias']}"
+        if 'Index Name' in node:
+            label = label.replace(' on ', f" using {node['Index Name']} on ", 1)
+        label += f" (cost={node['Startup Cost']}..{node['Total Cost']} rows={node['Plan Rows']})"
+        if 'Actual Total Time' in node:
+            label += (f" (actual time={node['Actual Startup Time']}..{node['Actual Total Time']}"
+                      f" rows={node['Actual Rows']} loops={node['Actual Loops']})")
+        indent = '  ' * depth
+        lines.append(f"{indent}{'-> ' if depth else ''}{label}")
+        for key in ('Index Cond', 'Recheck Cond', 'Hash Cond', 'Join Filter', 'Filter'):
+            if key in node:
+                lines.append(f"{indent}     {key}: {node[key]}")
+        if 'Rows Removed by Filter' in node:
+            lines.append(f"{indent}     Rows Removed by Filter: {node['Rows Removed by Filter']}")
+        if node.get('Shared Hit Blocks') or node.get('Shared Read Blocks'):
+            lines.append(f"{indent}     Buffers: shared hit={node.get('Shared Hit Blocks', 0)}"
+                         f" read={node.get('Shared Read Blocks', 0)}")
+        for child in node.get('Plans', ()):
+            walk(child, depth + 1)
+
+    for statement in plan or ():
+        walk(statement['Plan'], 0)
+        for key in ('Planning Time', 'Execution Time'):
+            if key in statement:
+                lines.append(f"{key}: {statement[key]} ms")
+    return lines
+
+
+def explain_slow_query(query, sql: str | None = None, params=None) -> bool:
+    """
+    EXPLAIN для SlowQuery і збереження плану. Без `sql` береться збережений екземпляр запиту
+    (параметри з JSON, тож типи можуть відрізнятися від оригінальних). False - EXPLAIN не вдався.
+    """
+    if sql is None:
+        sql, params = query.sample_sql, query.sample_params
+    query.explained_at = timezone.now()
+    try:
+        query.plan = explain(sql, params, settings.SLOW_QUERY_EXPLAIN_DATABASE, settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)
+    except DatabaseError as exc:
+        query.explain_error = str(exc).strip()
+        query.save(update_fields=['explained_at', 'explain_error'])
+        logger.warning("EXPLAIN failed for %s: %s", query.fingerprint, query.explain_error)
+        return False
+    query.plan_ms = query.plan[0].get('Execution Time') if query.plan else None
+    query.explain_error = ''
+    query.save(update_fields=['plan', 'plan_ms', 'explained_at', 'explain_error'])
+    return True
+
+
+class SlowQueryRecorder:
+    """Накопичує повільні запити процесу за відбитками; flush() переносить їх у БД."""
+
+    def __init__(self, max_fingerprints: int = 1000):
+        self.max_fingerprints = max_fingerprints
+        self.dropped = 0
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def capture(self, request, execute, sql, params, many, context):
+        """execute_wrapper; прив'язується до запиту через functools.partial."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            # executemany не пояснити одним EXPLAIN
+            if not many and duration_ms >= settings.SLOW_QUERY_MS:
+                match = getattr(request, 'resolver_match', None)
+                self.record(sql, params, duration_ms, f"{request.method} {match.route if match else request.path}")
+
+    def record(self, sql: str, params, duration_ms: float, route: str = '') -> None:
+        key = fingerprint(sql)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    self.dropped += 1
+                    return
+                entry = self._entries[key] = {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            entry['calls'] += 1
+            entry['total_ms'] += duration_ms
+            entry['route'] = route
+            if duration_ms >= entry['max_ms']:
+                entry.update(max_ms=duration_ms, sql=sql, params=params)
+            if self._thread is None and settings.SLOW_QUERY_FLUSH_SECONDS > 0:
+                self._thread = threading.Thread(target=self._run, name='slow-query-flusher', daemon=True)
+                self._thread.start()
+
+    def drain(self) -> dict[str, dict]:
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        return entries
+
+    def flush(self) -> int:
+        """Додає накопичене в SlowQuery і пояснює до SLOW_QUERY_EXPLAIN_LIMIT відбитків. Повертає їх кількість."""
+        entries = self.drain()
+        if not entries:
+            return 0
+        now = timezone.now()
+        hashes = {}
+        for key, entry in entries.items():
+            hashes[fingerprint_hash(key)] = entry
+            self.save(key, entry, now)
+
+        stale = now - timedelta(seconds=settings.SLOW_QUERY_EXPLAIN_MAX_AGE)
+        # Найдорожчі відбитки без плану або з застарілим планом; пояснюється щойно побачений екземпляр
+        candidates = SlowQuery.objects.filter(
+            Q(explained_at__isnull=True) | Q(explained_at__lt=stale), fingerprint_hash__in=hashes,
+        ).order_by('-total_ms')[:settings.SLOW_QUERY_EXPLAIN_LIMIT]
+        for query in candidates:
+            entry = hashes[query.fingerprint_hash]
+            explain_slow_query(query, entry['sql'], entry['params'])
+        return len(entries)
+
+    @staticmethod
+    def save(key: str, entry: dict, now) -> None:
+        digest = fingerprint_hash(key)
+        updates = {
+            'calls': F('calls') + entry['calls'],
+            'total_ms': F('total_ms') + entry['total_ms'],
+            'max_ms': Greatest(F('max_ms'), entry['max_ms']),
+            'route': entry['route'][:255],
+            'last_seen': now,
+        }
+        if SlowQuery.objects.filter(fingerprint_hash=digest).update(**updates):
+            # Екземпляр для EXPLAIN - найповільніший за весь час
+            SlowQuery.objects.filter(fingerprint_hash=digest, sample_ms__lt=entry['max_ms']).update(
+                sample_sql=entry['sql'], sample_params=json_params(entry['params']), sample_ms=entry['max_ms'],
+            )
+            return
+        try:
+            with transaction.atomic():
+                SlowQuery.objects.create(
+                    fingerprint_hash=digest, fingerprint=key, sample_sql=entry['sql'],
+                    sample_params=json_params(entry['params']), sample_ms=entry['max_ms'], route=entry['route'][:255],
+                    calls=entry['calls'], total_ms=entry['total_ms'], max_ms=entry['max_ms'], last_seen=now,
+                )
+        except IntegrityError:
+            # Інший процес щойно створив цей відбиток
+            SlowQuery.objects.filter(fingerprint_hash=digest).update(**updates)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.SLOW_QUERY_FLUSH_SECONDS)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush slow queries")
+            finally:
+                # Потік не тримає з'єднання між скиданнями
+                connections.close_all()
+
+
+recorder = SlowQueryRecorder()
+
+
+class SlowQueryMiddleware:
+    """
+    Фіксує запити до БД, довші за SLOW_QUERY_MS, у recorder.
+    Вимкнений (SLOW_QUERY_CAPTURE_ENABLED=0) - не потрапляє в ланцюжок middleware зовсім.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_CAPTURE_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        wrapper = partial(recorder.capture, request)
+        with ExitStack() as stack:
+            for alias in settings.DATABASES:
+                stack.enter_context(connections[alias].execute_wrapper(wrapper))
+            return self.get_response(request)
@@ -0,0 +1,105 @@
+import logging
+from io import StringIO
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from diagnostics.models import SlowQuery
+from diagnostics.slow_queries import SlowQueryMiddleware, plan_lines, recorder
+from tictactoe.models import TicTacToeProposition
+from user_management.models import TgUser, User
+
+
+@override_settings(SLOW_QUERY_CAPTURE_ENABLED=True, SLOW_QUERY_MS=0, SLOW_QUERY_FLUSH_SECONDS=0)
+class SlowQueryCaptureTestCase(TestCase):
+    def setUp(self):
+        # З SLOW_QUERY_MS=0 QueryStatsMiddleware логує кожен запит як повільний
+        db_logger = logging.getLogger('bot_backend.db')
+        self.addCleanup(db_logger.setLevel, db_logger.level)
+        db_logger.setLevel(logging.ERROR)
+        recorder.drain()
+        self.addCleanup(recorder.drain)
+        self.client = APIClient()
+        content_type = TgUser.get_content_type()
+        self.tguser = TgUser.objects.create(id=8_100_000_001, tg_first_name='Slow')
+        for index in range(3):
+            opponent = TgUser.objects.create(id=8_100_000_100 + index, tg_first_name=f'Opponent {index}')
+            TicTacToeProposition.objects.create(
+                player1_content_type=content_type, player1_object_id=self.tguser.id,
+                player2_content_type=content_type, player2_object_id=opponent.id,
+            )
+        self.url = reverse('api_user_management:tguser-tictactoe-propositions-list', kwargs={'tguser_pk': self.tguser.id})
+
+    def test_proposition_list_queries_are_captured_and_explained(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertGreater(recorder.flush(), 0)
+
+        # Сторінка пропозицій з OR по двох generic FK
+        query = SlowQuery.objects.get(
+            fingerprint__contains='FROM "tictactoe_tictactoeproposition"', fingerprint__regex=r' OR .* LIMIT ',
+        )
+        self.assertTrue(query.route.startswith('GET api/v1/users/tgusers/'), query.route)
+        self.assertEqual(query.calls, 1)
+        self.assertIsNotNone(query.explained_at)
+        self.assertEqual(query.explain_error, '')
+        self.assertIn('Execution Time', query.plan[0])
+        self.assertIsNotNone(query.plan_ms)
+        self.assertIn('actual time=', plan_lines(query.plan)[0])
+
+    def test_calls_are_aggregated_by_fingerprint(self):
+        sql = 'SELECT "id" FROM "user_management_tguser" WHERE "id" = %s'
+        recorder.record(sql, [self.tguser.id], 5.0, 'GET a')
+        recorder.record(sql, [self.tguser.id + 1], 15.0, 'GET b')
+        recorder.flush()
+        recorder.record(sql, [self.tguser.id], 10.0, 'GET c')
+        recorder.flush()
+
+        query = SlowQuery.objects.get()
+        self.assertEqual(query.calls, 3)
+        self.assertEqual(query.total_ms, 30.0)
+        self.assertEqual(query.max_ms, 15.0)
+        self.assertEqual(query.sample_params, [self.tguser.id + 1])
+        self.assertEqual(query.route, 'GET c')
+
+    def test_writes_are_explained_without_execution(self):
+        recorder.record('UPDATE "user_management_tguser" SET "tg_first_name" = %s WHERE "id" = %s',
+                        ['Changed', self.tguser.id], 50.0)
+        recorder.flush()
+
+        query = SlowQuery.objects.get()
+        self.assertEqual(query.plan[0]['Plan']['Node Type'], 'ModifyTable')
+        self.assertNotIn('Execution Time', query.plan[0])
+        self.tguser.refresh_from_db()
+        self.assertEqual(self.tguser.tg_first_name, 'Slow')
+
+    def test_failed_explain_is_recorded(self):
+        recorder.record('SELECT * FROM "missing_table"', None, 50.0)
+        recorder.flush()
+        query = SlowQuery.objects.get()
+        self.assertIsNone(query.plan)
+        self.assertIn('missing_table', query.explain_error)
+
+    def test_command_prints_plans(self):
+        self.client.get(self.url)
+        recorder.flush()
+        output = StringIO()
+        call_command('explain_slow_queries', search='tictactoe_tictactoeproposition', limit=2, stdout=output)
+        self.assertIn('Execution Time', output.getvalue())
+
+    def test_admin_shows_plan(self):
+        self.client.get(self.url)
+        recorder.flush()
+        query = SlowQuery.objects.filter(plan__isnull=False).first()
+        admin = User.objects.create_superuser(email='admin@example.com', password='x')
+        self.client.force_login(admin)
+        self.assertContains(self.client.get(reverse('admin:diagnostics_slowquery_changelist')), 'tictactoe')
+        response = self.client.get(reverse('admin:diagnostics_slowquery_change', args=[query.pk]))
+        self.assertContains(response, 'Execution Time')
+
+    @override_settings(SLOW_QUERY_CAPTURE_ENABLED=False)
+    def test_disabled_middleware_is_not_used(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            SlowQueryMiddleware(lambda request: None)
@@ -0,0 +1,77 @@
+"""
+Перенесення завершених ігор з гарячих таблиць Game/GameState в ArchivedGame.
+
+Гра архівується, якщо вона завершена за рушієм і останній хід старший за `before`.
+Пачка обробляється в одній транзакції: bulk_create в архів, потім видалення Game разом
+з ланцюжком GameState. API ігор (GameViewSet) читає з обох сховищ.
+"""
+from collections import defaultdict
+from itertools import pairwise
+
+from django.db import transaction
+
+from .models import ArchivedGame, Game, GameState, pack_moves
+
+
+def game_moves(states: list[GameState]) -> list[int]:
+    """Клітинки ходів з ланцюжка станів: у кожному наступному стані змінюється рівно одна клітинка."""
+    return [
+        next(index for index, (old, new) in enumerate(zip(previous.cells, state.cells)) if old != new)
+        for previous, state in pairwise(states)
+    ]
+
+
+def state_chains(games) -> dict[int, list[GameState]]:
+    """Ланцюжки GameState ігор від початкового стану до останнього (за parent_state)."""
+    children = defaultdict(dict)
+    for state in GameState.objects.filter(game__in=games).only('id', 'game_id', 'cells', 'parent_state_id',
+                                                                'created_at'):
+        children[state.game_id][state.parent_state_id] = state
+    chains = {}
+    for game_id, by_parent in children.items():
+        chain = []
+        state = by_parent.get(None)
+        while state is not None:
+            chain.append(state)
+            state = by_parent.get(state.id)
+        chains[game_id] = chain
+    return chains
+
+
+def archive_batch(games: list[Game], before, dry_run: bool = False) -> int:
+    """Архівує завершені до `before` ігри пачки. Повертає кількість заархівованих."""
+    chains = state_chains(games)
+    archived = []
+    for game in games:
+        chain = chains.get(game.id)
+        if not chain or chain[-1].created_at >= before or not game.engine_state(chain[-1].cells).game_over:
+            continue
+        archived.append(ArchivedGame(
+            id=game.id,
+            player1_content_type_id=game.player1_content_type_id,
+            player1_object_id=game.player1_object_id,
+            player2_content_type_id=game.player2_content_type_id,
+            player2_object_id=game.player2_object_id,
+            flags=ArchivedGame.pack_flags(game),
+            moves=pack_moves(game_moves(chain)),
+            last_state_id=chain[-1].id,
+            created_at=game.created_at,
+            finished_at=chain[-1].created_at,
+        ))
+    if archived and not dry_run:
+        with transaction.atomic():
+            ArchivedGame.objects.bulk_create(archived)
+            # Стани пов'язані ланцюжком parent_state - видаляються разом з іграми одним каскадом
+            Game.objects.filter(id__in=[game.id for game in archived]).delete()
+    return len(archived)
+
+
+def archive_games(before, batch_size: int = 500, dry_run: bool = False):
+    """Проходить ігри, створені до `before`, пачками за id; повертає (переглянуто, заархівовано) по кожній пачці."""
+    last_id = 0
+    while True:
+        games = list(Game.objects.filter(id__gt=last_id, created_at__lt=before).order_by('id')[:batch_size])
+        if not games:
+            return
+        last_id = games[-1].id
+        yield len(games), archive_batch(games, before, dry_run)
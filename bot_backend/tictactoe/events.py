@@ -0,0 +1,92 @@
+"""
+Внутрішньопроцесний брокер подій для SSE-стріму.
+
+Підписники - це корутини ASGI-воркера, що тримають відкритий стрім для TgUser.
+Публікація відбувається з синхронного коду (сигнали моделей після коміту транзакції),
+тому доставка в asyncio.Queue підписника йде через loop.call_soon_threadsafe.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Форматує повідомлення у форматі text/event-stream."""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """Підписка одного клієнта: обмежена черга повідомлень у циклі подій воркера."""
+
+    def __init__(self, tguser_id: int, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.tguser_id = tguser_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def put(self, message: str):
+        """Кладе повідомлення в чергу; повільний клієнт втрачає найстаріші повідомлення, а не блокує інших."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self) -> str:
+        return await self.queue.get()
+
+
+class EventBroker:
+    """Реєстр підписок за tguser_id з потокобезпечною публікацією."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, tguser_id: int) -> Subscription:
+        """Створює підписку; викликається з корутини, що працює в циклі подій."""
+        subscription = Subscription(tguser_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions[tguser_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.tguser_id)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.tguser_id]
+
+    def subscriber_count(self, tguser_id: int | None = None) -> int:
+        with self._lock:
+            if tguser_id is not None:
+                return len(self._subscriptions.get(tguser_id, ()))
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, tguser_id: int, event: str, data: dict):
+        """Надсилає подію всім підпискам TgUser. Безпечно викликати з будь-якого потоку."""
+        with self._lock:
+            subscriptions = tuple(self._subscriptions.get(tguser_id, ()))
+        if not subscriptions:
+            return
+        message = format_sse(event, data)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, message)
+            except RuntimeError:
+                # Цикл подій підписника вже закритий - прибираємо підписку
+                logger.warning("Dropping subscription of TgUser %s: event loop is closed", tguser_id)
+                self.unsubscribe(subscription)
+
+
+event_broker = EventBroker(queue_size=settings.EVENTS_QUEUE_SIZE)
@@ -0,0 +1,31 @@
+"""
+Архівація завершених ігор: Game і ланцюжки GameState -> ArchivedGame (tictactoe.archive).
+
+    python manage.py archive_games --older-than-days 7 --batch-size 500
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tictactoe.archive import archive_games
+
+
+class Command(BaseCommand):
+    help = "Move finished games older than the cutoff from Game/GameState into the compact ArchivedGame table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=float, default=7, help="archive games finished before this")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help="only count games that would be archived")
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['older_than_days'])
+        scanned = archived = 0
+        for batch_scanned, batch_archived in archive_games(before, options['batch_size'], options['dry_run']):
+            scanned += batch_scanned
+            archived += batch_archived
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Batch: {batch_archived} of {batch_scanned} games archived")
+        verb = "Would archive" if options['dry_run'] else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {archived} of {scanned} games older than {before:%Y-%m-%d %H:%M}."))
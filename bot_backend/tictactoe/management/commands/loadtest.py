@@ -0,0 +1,269 @@
+"""
+Навантажувальний тест Django API на даних seed_data.
+
+Фіксована кількість потоків (--concurrency) у замкненому циклі шле запити за сумішшю сценаріїв
+(upsert TgUser, список/створення/оновлення пропозицій) і рахує пропускну здатність,
+p50/p95/p99 затримки та кількість SQL-запитів на ендпоінт (заголовок X-DB-Query-Count).
+
+Без --url API піднімається в цьому ж процесі (ThreadedWSGIServer) з увімкненими заголовками X-DB-*;
+клієнт і сервер тоді ділять GIL, тож для абсолютних чисел краще окремий сервер (gunicorn) і --url.
+Для сервера з --url заголовки X-DB-* потребують QUERY_STATS_HEADERS=1.
+
+    python manage.py seed_data --clear
+    python manage.py loadtest --concurrency 16 --duration 30 --json loadtest.json
+"""
+import http.client
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+
+from tictactoe.management.commands.seed_data import seed_user_ids
+from tictactoe.models import TicTacToeProposition
+from user_management.models import TgUser
+
+API_PREFIX = '/api/v1/users'
+DEFAULT_MIX = 'upsert=2,list=5,create=2,update=1'
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies = []
+        self.queries = []
+        self.errors = 0
+        self.statuses = defaultdict(int)
+
+    def summary(self, elapsed: float) -> dict:
+        return {
+            'requests': len(self.latencies),
+            'errors': self.errors,
+            'throughput_rps': round(len(self.latencies) / elapsed, 2) if elapsed else None,
+            'p50_ms': _ms(percentile(self.latencies, 0.5)),
+            'p95_ms': _ms(percentile(self.latencies, 0.95)),
+            'p99_ms': _ms(percentile(self.latencies, 0.99)),
+            'queries_avg': round(sum(self.queries) / len(self.queries), 2) if self.queries else None,
+            'queries_max': max(self.queries) if self.queries else None,
+            'statuses': dict(self.statuses),
+        }
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class LoadTest:
+    """Стан прогону: сценарії, спільні для потоків дані (id пропозицій) і статистика."""
+
+    def __init__(self, base_url: str, user_ids: list[int], propositions: dict[int, list[int]],
+                 mix: dict[str, int], seed: int = 0):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip('/') + API_PREFIX
+        self.user_ids = user_ids
+        self.propositions = propositions
+        self.scenarios = list(mix)
+        self.weights = list(mix.values())
+        self.seed = seed
+        self.stats = defaultdict(EndpointStats)
+        self._lock = threading.Lock()
+
+    def request(self, connection, method, path, body=None):
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {'Accept': 'application/json'}
+        if payload is not None:
+            headers['Content-Type'] = 'application/json'
+        started = time.perf_counter()
+        connection.request(method, self.prefix + path, body=payload, headers=headers)
+        response = connection.getresponse()
+        data = response.read()
+        elapsed = time.perf_counter() - started
+        if response.will_close:
+            connection.close()
+        return response.status, response.getheader('X-DB-Query-Count'), data, elapsed
+
+    def record(self, name, status, query_count, elapsed, ok_statuses):
+        with self._lock:
+            stats = self.stats[name]
+            stats.latencies.append(elapsed)
+            stats.statuses[status] += 1
+            if status not in ok_statuses:
+                stats.errors += 1
+            if query_count is not None:
+                stats.queries.append(int(query_count))
+
+    def run_scenario(self, connection, rng, name):
+        user_id = rng.choice(self.user_ids)
+        if name == 'upsert':
+            status, queries, _, elapsed = self.request(connection, 'POST', '/tgusers/', {
+                'id': user_id, 'tg_first_name': f"Seed {user_id - self.user_ids[0]}", 'language_code': 'uk',
+            })
+            self.record('POST tgusers', status, queries, elapsed, (200, 201))
+        elif name == 'list':
+            status, queries, _, elapsed = self.request(
+                connection, 'GET', f'/tgusers/{user_id}/tictactoe-propositions/')
+            self.record('GET propositions', status, queries, elapsed, (200,))
+        elif name == 'create':
+            # Відкриті пропозиції (без player2) не конфліктують з unique_pending_proposition
+            status, queries, _, elapsed = self.request(
+                connection, 'POST', f'/tgusers/{user_id}/tictactoe-propositions/',
+                {'player1_sign': '❌', 'player2_sign': '⭕', 'player1_first': rng.choice([True, False])},
+            )
+            self.record('POST propositions', status, queries, elapsed, (201,))
+        elif name == 'update':
+            own = self.propositions.get(user_id)
+            if not own:
+                return self.run_scenario(connection, rng, 'list')
+            status, queries, _, elapsed = self.request(
+                connection, 'PATCH', f'/tgusers/{user_id}/tictactoe-propositions/{rng.choice(own)}/',
+                {'player1_first': rng.choice([True, False])},
+            )
+            self.record('PATCH propositions', status, queries, elapsed, (200,))
+        else:
+            raise ValueError(f"Unknown scenario: {name}")
+
+    def worker(self, index: int, deadline: float, budget):
+        rng = random.Random(self.seed * 1000 + index)
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            while time.perf_counter() < deadline and budget():
+                name = rng.choices(self.scenarios, self.weights)[0]
+                try:
+                    self.run_scenario(connection, rng, name)
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    with self._lock:
+                        self.stats['connection errors'].errors += 1
+        finally:
+            connection.close()
+
+    def run(self, concurrency: int, duration: float, requests: int | None) -> float:
+        remaining = [requests]
+        lock = threading.Lock()
+
+        def budget():
+            if remaining[0] is None:
+                return True
+            with lock:
+                if remaining[0] <= 0:
+                    return False
+                remaining[0] -= 1
+                return True
+
+        started = time.perf_counter()
+        deadline = started + duration
+        with ThreadPoolExecutor(concurrency) as pool:
+            for future in [pool.submit(self.worker, index, deadline, budget) for index in range(concurrency)]:
+                future.result()
+        return time.perf_counter() - started
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        mix[name.strip()] = int(weight or 1)
+    unknown = set(mix) - {'upsert', 'list', 'create', 'update'}
+    if unknown:
+        raise CommandError(f"Unknown scenarios in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+class Command(BaseCommand):
+    help = "Drive the Django API with concurrent requests against seeded data and report latency percentiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="base URL of a running API server; by default an in-process server is used")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10, help="seconds")
+        parser.add_argument('--requests', type=int, help="stop after this many requests")
+        parser.add_argument('--mix', default=DEFAULT_MIX, help=f"scenario weights (default: {DEFAULT_MIX})")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', dest='json_path', help="write the report to this file")
+
+    def handle(self, *args, **options):
+        user_ids = list(seed_user_ids().order_by('id'))
+        if not user_ids:
+            raise CommandError("No seeded users, run 'manage.py seed_data' first.")
+        # Пропозиції, які сценарій update змінює від імені їхнього ініціатора
+        propositions = defaultdict(list)
+        rows = TicTacToeProposition.objects.filter(
+            player1_content_type=TgUser.get_content_type(), player1_object_id__in=user_ids,
+            status='pending', is_active=True,
+        ).values_list('id', 'player1_object_id')
+        for proposition_id, player1_id in rows:
+            propositions[player1_id].append(proposition_id)
+
+        server = None
+        base_url = options['url']
+        if not base_url:
+            server, base_url = self.start_server()
+        try:
+            load_test = LoadTest(base_url, user_ids, propositions, parse_mix(options['mix']), options['seed'])
+            elapsed = load_test.run(options['concurrency'], options['duration'], options['requests'])
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+        overall = EndpointStats()
+        for stats in load_test.stats.values():
+            overall.latencies.extend(stats.latencies)
+            overall.errors += stats.errors
+        summary = overall.summary(elapsed)
+        report = {
+            'concurrency': options['concurrency'],
+            'elapsed_s': round(elapsed, 3),
+            **{key: summary[key] for key in ('requests', 'errors', 'throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms')},
+            'endpoints': {name: stats.summary(elapsed) for name, stats in sorted(load_test.stats.items())},
+        }
+        self.print_report(report)
+        if options['json_path']:
+            with open(options['json_path'], 'w') as file:
+                json.dump(report, file, indent=2)
+
+    def start_server(self):
+        # Вбудований сервер завжди віддає X-DB-* - звідти береться кількість SQL-запитів,
+        # а warning-и про повільні запити лише засмічували б звіт
+        settings.QUERY_STATS_HEADERS = True
+        logging.getLogger('bot_backend.db').setLevel(logging.ERROR)
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler, allow_reuse_address=False)
+        server.set_app(get_wsgi_application())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, f'http://127.0.0.1:{server.server_port}'
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"{report['requests']} requests in {report['elapsed_s']} s, concurrency {report['concurrency']}: "
+            f"{report['throughput_rps']} req/s, {report['errors']} errors; "
+            f"p50 {report['p50_ms']} ms, p95 {report['p95_ms']} ms, p99 {report['p99_ms']} ms"
+        )
+        self.stdout.write(f"{'endpoint':<22} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+                          f"{'queries':>8}")
+        for name, stats in report['endpoints'].items():
+            self.stdout.write(
+                f"{name:<22} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps'] or 0:>8} "
+                f"{stats['p50_ms'] or '-':>8} {stats['p95_ms'] or '-':>8} {stats['p99_ms'] or '-':>8} "
+                f"{stats['queries_avg'] if stats['queries_avg'] is not None else '-':>8}"
+            )
@@ -0,0 +1,65 @@
+"""
+Обслуговування помісячних розділів TicTacToeProposition і GameState (tictactoe.partitions):
+створення розділів на --ahead місяців наперед і від'єднання/видалення розділів, старших
+за PARTITION_RETENTION_MONTHS (розділи GameState - лише після того, як archive_games їх спорожнив).
+Повний запуск - окремим завданням за розкладом (наприклад, щодня);
+при старті сервісу після migrate - лише --create-only, щоб перезапуск ніколи не видаляв дані.
+
+    python manage.py manage_partitions --create-only
+    python manage.py manage_partitions --ahead 3
+    python manage.py manage_partitions --detach-only --dry-run
+"""
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tictactoe.partitions import (
+    DROP_ONLY_EMPTY, PARTITIONED_MODELS, add_months, detach_partition, ensure_partitions, expired_partitions,
+    missing_months, month_start, partition_is_empty, partition_name,
+)
+
+
+class Command(BaseCommand):
+    help = "Create monthly partitions ahead of time and detach or drop partitions older than the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=settings.PARTITION_MONTHS_AHEAD,
+                            help="create partitions for this many months after the current one")
+        parser.add_argument('--create-only', action='store_true',
+                            help="only create partitions, never detach or drop expired ones")
+        parser.add_argument('--detach-only', action='store_true',
+                            help="detach expired partitions but keep them as standalone tables")
+        parser.add_argument('--dry-run', action='store_true', help="only print what would be done")
+
+    def handle(self, *args, **options):
+        this_month = month_start(timezone.now())
+        last = add_months(this_month, options['ahead'])
+        dry_run, detach_only = options['dry_run'], options['detach_only']
+        created = removed = 0
+        for label in PARTITIONED_MODELS:
+            table = apps.get_model(label)._meta.db_table
+            if dry_run:
+                new = [partition_name(table, month) for month in missing_months(table, this_month, last)]
+            else:
+                new = ensure_partitions(table, this_month, last)
+            for name in new:
+                self.stdout.write(f"{'Would create' if dry_run else 'Created'} {name}")
+            created += len(new)
+
+            retention = settings.PARTITION_RETENTION_MONTHS.get(label, 0)
+            if options['create_only'] or not retention:
+                continue
+            for name in expired_partitions(table, add_months(this_month, -retention)):
+                if label in DROP_ONLY_EMPTY and not partition_is_empty(name):
+                    self.stdout.write(self.style.WARNING(f"Kept {name}: it still has rows of unarchived games"))
+                    continue
+                if dry_run:
+                    self.stdout.write(f"Would {'detach' if detach_only else 'drop'} {name}")
+                else:
+                    detach_partition(table, name, drop=not detach_only)
+                    self.stdout.write(f"{'Detached' if detach_only else 'Dropped'} {name}")
+                removed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"{created} partitions created, {removed} {'detached' if detach_only else 'dropped'}."
+        ))
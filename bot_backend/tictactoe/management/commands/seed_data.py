@@ -0,0 +1,149 @@
+"""
+Наповнення БД синтетичними даними для навантажувальних тестів (manage.py loadtest).
+
+Усі TgUser мають id з діапазону SEED_ID_BASE.., тож --clear прибирає лише згенероване.
+Вставка йде через bulk_create пачками, без TgUser.save() і сигналів.
+
+    python manage.py seed_data --users 1000 --propositions 5000 --games 2000 --clear
+"""
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from tictactoe.models import Game, GameState, OPPOSITE_SIGN, PossibleSign, SIGN_MARKS, TicTacToeProposition
+from user_management.models import TgStartAttempt, TgUser
+
+SEED_ID_BASE = 7_000_000_000
+SEED_ID_LIMIT = SEED_ID_BASE + 100_000_000
+BATCH_SIZE = 1000
+
+
+def seed_user_ids():
+    """Queryset id згенерованих TgUser."""
+    return TgUser.objects.filter(id__gte=SEED_ID_BASE, id__lt=SEED_ID_LIMIT).values_list('id', flat=True)
+
+
+class Command(BaseCommand):
+    help = "Seed TgUsers, propositions and games for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--propositions', type=int, default=5000)
+        parser.add_argument('--games', type=int, default=1000)
+        parser.add_argument('--open-share', type=float, default=0.2,
+                            help="share of open propositions (without player2)")
+        parser.add_argument('--seed', type=int, default=0, help="random seed for reproducible data")
+        parser.add_argument('--clear', action='store_true', help="delete previously seeded data first")
+
+    def handle(self, *args, **options):
+        if options['users'] < 2:
+            raise CommandError("At least 2 users are required.")
+        self.random = random.Random(options['seed'])
+        self.content_type = TgUser.get_content_type()
+
+        with transaction.atomic():
+            if options['clear']:
+                self.clear()
+            elif seed_user_ids().exists():
+                raise CommandError("Seeded data already exists, use --clear to recreate it.")
+            user_ids = self.create_users(options['users'])
+            propositions = self.create_propositions(user_ids, options['propositions'], options['open_share'])
+            games, states = self.create_games(user_ids, options['games'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(user_ids)} users, {propositions} propositions, {games} games with {states} states."
+        ))
+
+    def clear(self):
+        ids = seed_user_ids()
+        players = (
+            Q(player1_content_type=self.content_type, player1_object_id__in=ids)
+            | Q(player2_content_type=self.content_type, player2_object_id__in=ids)
+        )
+        # Стани ходів пов'язані ланцюжком parent_state - видаляємо разом з іграми одним каскадом
+        Game.objects.filter(players).delete()
+        TicTacToeProposition.objects.filter(players).delete()
+        TgStartAttempt.objects.filter(tg_user_id__in=ids).delete()
+        TgUser.objects.filter(id__in=ids).delete()
+
+    def create_users(self, count):
+        languages = ['uk', 'en', 'pl', None]
+        TgUser.objects.bulk_create([
+            TgUser(
+                id=SEED_ID_BASE + index,
+                tg_first_name=f"Seed {index}",
+                tg_username=f"seed_{index}" if index % 3 else None,
+                language_code=self.random.choice(languages),
+            )
+            for index in range(count)
+        ], batch_size=BATCH_SIZE)
+        return [SEED_ID_BASE + index for index in range(count)]
+
+    def random_pair(self, user_ids):
+        player1, player2 = self.random.sample(user_ids, 2)
+        sign = self.random.choice(PossibleSign.values)
+        return player1, player2, sign, OPPOSITE_SIGN[sign]
+
+    def create_propositions(self, user_ids, count, open_share):
+        # Пари pending-пропозицій унікальні (обмеження unique_pending_proposition)
+        pairs = set()
+        propositions = []
+        attempts = 0
+        while len(propositions) < count and attempts < count * 10:
+            attempts += 1
+            player1, player2, sign1, sign2 = self.random_pair(user_ids)
+            if self.random.random() < open_share:
+                player2 = None
+            elif (player1, player2) in pairs:
+                continue
+            pairs.add((player1, player2))
+            propositions.append(TicTacToeProposition(
+                player1_content_type=self.content_type,
+                player1_object_id=player1,
+                player2_content_type=self.content_type if player2 else None,
+                player2_object_id=player2,
+                player1_sign=sign1,
+                player2_sign=sign2,
+                player1_first=self.random.choice([True, False, None]),
+            ))
+        TicTacToeProposition.objects.bulk_create(propositions, batch_size=BATCH_SIZE)
+        return len(propositions)
+
+    def create_games(self, user_ids, count):
+        games = []
+        for _ in range(count):
+            player1, player2, sign1, sign2 = self.random_pair(user_ids)
+            games.append(Game(
+                player1_content_type=self.content_type,
+                player1_object_id=player1,
+                player2_content_type=self.content_type,
+                player2_object_id=player2,
+                player1_first=self.random.choice([True, False]),
+                player1_symbol=sign1,
+                player2_symbol=sign2,
+            ))
+        Game.objects.bulk_create(games, batch_size=BATCH_SIZE)
+
+        # Кожна гра отримує ланцюжок станів довжиною 0..5 ходів; шари вставляються по черзі,
+        # бо parent_state потребує id попереднього стану
+        plies = {game.id: self.random.randint(0, 5) for game in games}
+        cells = {game.id: [' '] * 9 for game in games}
+        layer = GameState.objects.bulk_create([GameState(game=game) for game in games], batch_size=BATCH_SIZE)
+        total = len(layer)
+        for ply in range(1, 6):
+            states = []
+            for parent in layer:
+                game = parent.game
+                if plies[game.id] < ply:
+                    continue
+                # Першим ходить first_symbol, далі по черзі
+                symbol = game.first_symbol if ply % 2 else OPPOSITE_SIGN[game.first_symbol]
+                board = cells[game.id]
+                board[self.random.choice([index for index, cell in enumerate(board) if cell == ' '])] = \
+                    SIGN_MARKS[symbol].value
+                states.append(GameState(game=game, cells=''.join(board), parent_state=parent))
+            layer = GameState.objects.bulk_create(states, batch_size=BATCH_SIZE)
+            total += len(layer)
+        return len(games), total
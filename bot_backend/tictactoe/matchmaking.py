@@ -0,0 +1,210 @@
+"""
+Черга підбору суперника для відкритих пропозицій (player2 = None).
+
+Учасники розкладаються по кошиках за вподобаннями (знак, хто ходить першим, мова).
+Для нового учасника сумісні кошики визначаються наперед (не більше 3 x 3 ключів),
+тож пошук пари - O(1) незалежно від кількості тих, хто чекає.
+Рядок пропозиції-господаря захоплюється через SELECT ... FOR UPDATE SKIP LOCKED,
+тому паралельні воркери ніколи не віддадуть одну пропозицію двом гравцям.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from .models import OPPOSITE_SIGN, PossibleSign, TicTacToeProposition
+from .signals import publish_propositions
+
+# Які вподобання суперника сумісні з вподобаннями учасника
+COMPATIBLE_SIGNS = {
+    None: (None, PossibleSign.CROSS, PossibleSign.NOUGHT),
+    PossibleSign.CROSS: (PossibleSign.NOUGHT, None),
+    PossibleSign.NOUGHT: (PossibleSign.CROSS, None),
+}
+COMPATIBLE_FIRST = {
+    None: (None, True, False),
+    True: (False, None),
+    False: (True, None),
+}
+
+
+class RowLocked(Exception):
+    """Рядок пропозиції-господаря зараз заблокований іншою транзакцією, але сама пропозиція ще актуальна."""
+
+
+@dataclass
+class Entry:
+    proposition_id: int
+    player_content_type_id: int
+    player_object_id: int
+    sign: str | None
+    first: bool | None
+    language: str | None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def key(self):
+        return self.sign, self.first, self.language
+
+
+def percentile(sorted_values, q: float):
+    """Перцентиль методом найближчого рангу (значення мають бути відсортовані)."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class MatchmakingQueue:
+    """FIFO-черги за ключем вподобань у пам'яті процесу."""
+
+    def __init__(self, wait_samples: int = 1000):
+        self._buckets: dict[tuple, OrderedDict[int, Entry]] = {}
+        self._entries: dict[int, Entry] = {}
+        self._wait_times = deque(maxlen=wait_samples)
+        self._matched = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, proposition_id):
+        return proposition_id in self._entries
+
+    def discard(self, proposition_id: int) -> bool:
+        """Прибирає пропозицію з черги (скасування пошуку або деактивація)."""
+        with self._lock:
+            return self._remove(proposition_id) is not None
+
+    def enter(self, entry: Entry) -> TicTacToeProposition | None:
+        """
+        Шукає пару для учасника. Повертає заповнену пропозицію суперника, якщо пару знайдено,
+        інакше ставить учасника в чергу й повертає None.
+        """
+        self.discard(entry.proposition_id)
+        skipped = set()
+        while (host := self._pop_partner(entry, skipped)) is not None:
+            try:
+                proposition = self._claim(host, entry)
+            except ValidationError:
+                # Пара неможлива (наприклад, між ними вже є pending-пропозиція) - господар лишається в черзі
+                self._push(host, front=True)
+                break
+            except RowLocked:
+                # Рядок господаря ненадовго тримає інша транзакція (наприклад, PATCH) - господар повертається
+                # на своє місце в черзі, а учасник шукає серед інших
+                self._push(host, front=True)
+                skipped.add(host.proposition_id)
+                continue
+            if proposition is not None:
+                with self._lock:
+                    self._wait_times.append(time.monotonic() - host.enqueued_at)
+                    self._matched += 1
+                return proposition
+        self._push(entry)
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._wait_times)
+            buckets = {
+                self._format_key(key): len(bucket) for key, bucket in self._buckets.items() if bucket
+            }
+            depth = len(self._entries)
+            matched = self._matched
+        return {
+            'depth': depth,
+            'buckets': buckets,
+            'matched': matched,
+            'wait_seconds': {
+                'p50': percentile(waits, 0.5),
+                'p90': percentile(waits, 0.9),
+                'p99': percentile(waits, 0.99),
+            },
+        }
+
+    @staticmethod
+    def _format_key(key) -> str:
+        sign, first, language = key
+        return f"sign={sign or '*'},first={'*' if first is None else first},language={language or '*'}"
+
+    def _push(self, entry: Entry, front: bool = False):
+        with self._lock:
+            bucket = self._buckets.setdefault(entry.key, OrderedDict())
+            bucket[entry.proposition_id] = entry
+            if front:
+                bucket.move_to_end(entry.proposition_id, last=False)
+            self._entries[entry.proposition_id] = entry
+
+    def _remove(self, proposition_id: int) -> Entry | None:
+        entry = self._entries.pop(proposition_id, None)
+        if entry is not None:
+            self._buckets[entry.key].pop(proposition_id, None)
+        return entry
+
+    def _pop_partner(self, entry: Entry, skipped=frozenset()) -> Entry | None:
+        """Забирає з черги найстарішого сумісного учасника іншого гравця (крім пропозицій `skipped`)."""
+        with self._lock:
+            best = None
+            for sign in COMPATIBLE_SIGNS[entry.sign]:
+                for first in COMPATIBLE_FIRST[entry.first]:
+                    bucket = self._buckets.get((sign, first, entry.language))
+                    if not bucket:
+                        continue
+                    head = next(iter(bucket.values()))
+                    if self._same_player(head, entry) or head.proposition_id in skipped:
+                        # Власні пропозиції не парувати - беремо наступну в кошику, якщо є
+                        head = next((e for e in bucket.values()
+                                     if not self._same_player(e, entry) and e.proposition_id not in skipped), None)
+                        if head is None:
+                            continue
+                    if best is None or head.enqueued_at < best.enqueued_at:
+                        best = head
+            if best is not None:
+                self._remove(best.proposition_id)
+            return best
+
+    @staticmethod
+    def _same_player(a: Entry, b: Entry) -> bool:
+        return (a.player_content_type_id, a.player_object_id) == (b.player_content_type_id, b.player_object_id)
+
+    @staticmethod
+    def _claim(host: Entry, entry: Entry) -> TicTacToeProposition | None:
+        """
+        Атомарно заповнює пропозицію господаря другим гравцем і деактивує пропозицію учасника.
+        Повертає None, якщо пропозиція господаря вже неактуальна; RowLocked - якщо її рядок заблоковано.
+        """
+        open_host = Q(pk=host.proposition_id, is_active=True, player2_object_id__isnull=True)
+        with transaction.atomic():
+            proposition = TicTacToeProposition.objects.select_for_update(skip_locked=True).filter(open_host).first()
+            if proposition is None:
+                # SKIP LOCKED не відрізняє заблокований рядок від відсутнього; звичайний SELECT блокування не чекає
+                if TicTacToeProposition.objects.filter(open_host).exists():
+                    raise RowLocked(host.proposition_id)
+                return None
+            if proposition.is_expired:
+                return None
+            player1_sign = host.sign or (OPPOSITE_SIGN[entry.sign] if entry.sign else PossibleSign.CROSS)
+            if host.first is not None:
+                player1_first = host.first
+            else:
+                player1_first = True if entry.first is None else not entry.first
+            proposition.player2_content_type_id = entry.player_content_type_id
+            proposition.player2_object_id = entry.player_object_id
+            proposition.player1_sign = player1_sign
+            proposition.player2_sign = OPPOSITE_SIGN[player1_sign]
+            proposition.player1_first = player1_first
+            proposition.status = 'pending'
+            proposition.save()
+            TicTacToeProposition.objects.filter(pk=entry.proposition_id).deactivate()
+            # Bulk-деактивація не надсилає post_save - учасник дізнається про неї з окремої події
+            transaction.on_commit(lambda: publish_propositions([entry.proposition_id]))
+            return proposition
+
+
+matchmaking_queue = MatchmakingQueue()
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tictactoe", "0002_alter_tictactoeproposition_player1_object_id_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tictactoeproposition",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name="updated at",
+            ),
+            preserve_default=False,
+        ),
+    ]
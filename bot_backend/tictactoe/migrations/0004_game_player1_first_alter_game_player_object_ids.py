@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tictactoe", "0003_tictactoeproposition_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="game",
+            name="player1_first",
+            field=models.BooleanField(default=True, verbose_name="player1 goes first"),
+        ),
+        migrations.AlterField(
+            model_name="game",
+            name="player1_object_id",
+            field=models.PositiveBigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name="game",
+            name="player2_object_id",
+            field=models.PositiveBigIntegerField(),
+        ),
+    ]
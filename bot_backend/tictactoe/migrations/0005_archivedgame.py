@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("tictactoe", "0004_game_player1_first_alter_game_player_object_ids"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedGame",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("player1_object_id", models.PositiveBigIntegerField()),
+                ("player2_object_id", models.PositiveBigIntegerField()),
+                ("flags", models.PositiveSmallIntegerField()),
+                ("moves", models.BinaryField(max_length=5)),
+                ("last_state_id", models.PositiveBigIntegerField()),
+                ("created_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField()),
+                ("player1_content_type", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="contenttypes.contenttype")),
+                ("player2_content_type", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="contenttypes.contenttype")),
+            ],
+            options={
+                "verbose_name": "archived game",
+                "verbose_name_plural": "archived games",
+                "indexes": [models.Index(fields=["player1_object_id"], name="tictactoe_a_player1_dbfa0b_idx"), models.Index(fields=["player2_object_id"], name="tictactoe_a_player2_24ee77_idx"), models.Index(fields=["created_at"], name="tictactoe_a_created_0cc1e2_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,174 @@
+"""
+TicTacToeProposition і GameState -> таблиці, секціоновані помісячно за created_at (tictactoe.partitions).
+
+Таблиця перейменовується, на її місці створюється секціонована з тими самими стовпцями й CHECK,
+розділами від місяця найстарішого рядка до PARTITION_MONTHS_AHEAD наперед і default, дані копіюються.
+Індекси й зовнішні ключі відтворюються з тими самими назвами, з обмеженнями Postgres для секціонованих таблиць:
+- первинний ключ (id, created_at), id видає послідовність <таблиця>_id_seq;
+- унікальні індекси (unique_pending_proposition, parent_state_id) стають звичайними: глобальна унікальність
+  без ключа секціонування неможлива, її забезпечує застосунок (див. TicTacToeProposition.save і GameMoveSerializer);
+  у стані Django unique_pending_proposition теж стає звичайним індексом;
+- зовнішній ключ GameState.parent_state на саму таблицю неможливий (у БД немає унікального id) - лише в ORM.
+"""
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# Копії tictactoe.partitions на момент міграції: зміни модуля не мають змінювати вже застосовану міграцію
+PARTITION_KEY = 'created_at'
+
+TABLES = ('tictactoe_tictactoeproposition', 'tictactoe_gamestate')
+
+# Для відкату: що в несекціонованій таблиці було унікальним і посилалося на саму таблицю
+UNIQUE_INDEXES = {'unique_pending_proposition', 'tictactoe_gamestate_parent_state_id_key'}
+SELF_FOREIGN_KEYS = {
+    'tictactoe_gamestate': [(
+        'tictactoe_gamestate_parent_state_id_d59a23e6_fk_tictactoe',
+        'FOREIGN KEY (parent_state_id) REFERENCES tictactoe_gamestate(id) DEFERRABLE INITIALLY DEFERRED',
+    )],
+}
+
+
+def month_start(moment):
+    if isinstance(moment, datetime) and moment.tzinfo is not None:
+        moment = moment.astimezone(dt_timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def create_month_partitions(cursor, quote, table, first, last):
+    """Розділи <таблиця>_pYYYY_MM з `first` по `last` включно у щойно створеній (порожній) таблиці."""
+    month = first
+    while month <= last:
+        following = add_months(month, 1)
+        cursor.execute(
+            f"CREATE TABLE {quote(f'{table}_p{month:%Y_%m}')} PARTITION OF {quote(table)} "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00:00+00') TO ('{following:%Y-%m-%d} 00:00:00+00')"
+        )
+        month = following
+
+
+def table_definitions(cursor, table):
+    """Індекси (крім первинного ключа) і зовнішні ключі на інші таблиці."""
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s",
+        [table],
+    )
+    indexes = [(name, definition) for name, definition in cursor.fetchall() if name != f'{table}_pkey']
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f' AND confrelid <> conrelid",
+        [table],
+    )
+    return indexes, cursor.fetchall()
+
+
+def partition_tables(apps, schema_editor):
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    this_month = month_start(timezone.now())
+    with connection.cursor() as cursor:
+        for table in TABLES:
+            indexes, foreign_keys = table_definitions(cursor, table)
+            cursor.execute(f"SELECT min({quote(PARTITION_KEY)}), max(id) FROM {quote(table)}")
+            oldest, max_id = cursor.fetchone()
+            old, sequence = f'{table}_unpartitioned', f'{table}_id_seq'
+
+            cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+            cursor.execute(
+                f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING CONSTRAINTS) "
+                f"PARTITION BY RANGE ({quote(PARTITION_KEY)})"
+            )
+            cursor.execute(f"CREATE TABLE {quote(table + '_default')} PARTITION OF {quote(table)} DEFAULT")
+            create_month_partitions(cursor, quote, table, month_start(oldest) if oldest else this_month,
+                                    add_months(this_month, settings.PARTITION_MONTHS_AHEAD))
+            cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+            cursor.execute(f"DROP TABLE {quote(old)}")
+
+            cursor.execute(f"CREATE SEQUENCE {quote(sequence)} OWNED BY {quote(table)}.id")
+            cursor.execute(f"ALTER TABLE {quote(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+            cursor.execute("SELECT setval(%s, %s, %s)", [sequence, max_id or 1, max_id is not None])
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(table + '_pkey')} "
+                f"PRIMARY KEY (id, {quote(PARTITION_KEY)})"
+            )
+            for name, definition in indexes:
+                cursor.execute(definition.replace('CREATE UNIQUE INDEX', 'CREATE INDEX', 1))
+            for name, definition in foreign_keys:
+                cursor.execute(f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}")
+
+
+def unpartition_tables(apps, schema_editor):
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for table in TABLES:
+            indexes, foreign_keys = table_definitions(cursor, table)
+            cursor.execute(f"SELECT max(id) FROM {quote(table)}")
+            max_id = cursor.fetchone()[0]
+            old = f'{table}_partitioned'
+
+            cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+            cursor.execute(f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING CONSTRAINTS)")
+            cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+            # Разом з розділами і послідовністю id
+            cursor.execute(f"DROP TABLE {quote(old)}")
+
+            cursor.execute(f"ALTER TABLE {quote(table)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY")
+            cursor.execute("SELECT setval(pg_get_serial_sequence(%s, 'id'), %s, %s)",
+                           [table, max_id or 1, max_id is not None])
+            cursor.execute(f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(table + '_pkey')} PRIMARY KEY (id)")
+            for name, definition in indexes:
+                if name in UNIQUE_INDEXES:
+                    definition = definition.replace('CREATE INDEX', 'CREATE UNIQUE INDEX', 1)
+                cursor.execute(definition)
+            for name, definition in foreign_keys + SELF_FOREIGN_KEYS.get(table, []):
+                cursor.execute(f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tictactoe", "0005_archivedgame"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(partition_tables, unpartition_tables),
+            ],
+            state_operations=[
+                # Індекс з тією ж назвою лишається в БД, але вже не унікальний (див. TicTacToeProposition.Meta)
+                migrations.RemoveConstraint(
+                    model_name="tictactoeproposition",
+                    name="unique_pending_proposition",
+                ),
+                migrations.AddIndex(
+                    model_name="tictactoeproposition",
+                    index=models.Index(
+                        condition=models.Q(("status", "pending")),
+                        fields=["player1_content_type", "player1_object_id", "player2_content_type",
+                                "player2_object_id"],
+                        name="unique_pending_proposition",
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="gamestate",
+                    name="parent_state",
+                    field=models.OneToOneField(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=models.deletion.CASCADE,
+                        related_name="child_state",
+                        to="tictactoe.gamestate",
+                    ),
+                ),
+            ],
+        ),
+    ]
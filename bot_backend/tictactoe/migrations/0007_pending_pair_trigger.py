@@ -0,0 +1,63 @@
+"""
+unique_pending_proposition на рівні БД для секціонованої таблиці TicTacToeProposition.
+
+Унікальний індекс без created_at у секціонованій таблиці неможливий (див. 0006), тож тригер перед INSERT/UPDATE
+pending-рядка бере те саме advisory-блокування пари гравців, що й TicTacToeProposition.lock_pending_pair,
+і відмовляє з unique_violation (IntegrityError), якщо в пари вже є інша pending-пропозиція.
+Так захищені й шляхи повз save(): QuerySet.set_status, масові дії адмінки, сирий SQL.
+"""
+from django.db import migrations
+
+# Копія tictactoe.models.PENDING_PAIR_LOCK на момент міграції
+PENDING_PAIR_LOCK = 0x7474
+
+PAIR_COLUMNS = ('player1_content_type_id', 'player1_object_id', 'player2_content_type_id', 'player2_object_id')
+
+CREATE_TRIGGER = f"""
+CREATE FUNCTION tictactoe_check_pending_pair() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtextextended(
+        concat_ws(':', {', '.join(f'NEW.{column}' for column in PAIR_COLUMNS)}), {PENDING_PAIR_LOCK}
+    ));
+    IF EXISTS (
+        SELECT 1 FROM tictactoe_tictactoeproposition
+        WHERE status = 'pending' AND id <> NEW.id
+          AND {' AND '.join(f'{column} = NEW.{column}' for column in PAIR_COLUMNS)}
+    ) THEN
+        RAISE EXCEPTION 'A pending proposition for these players already exists.'
+            USING ERRCODE = 'unique_violation', CONSTRAINT = 'unique_pending_proposition';
+    END IF;
+    RETURN NEW;
+END
+$$;
+
+CREATE TRIGGER tictactoe_pending_pair_insert
+    BEFORE INSERT ON tictactoe_tictactoeproposition
+    FOR EACH ROW WHEN (NEW.status = 'pending')
+    EXECUTE FUNCTION tictactoe_check_pending_pair();
+
+CREATE TRIGGER tictactoe_pending_pair_update
+    BEFORE UPDATE ON tictactoe_tictactoeproposition
+    FOR EACH ROW WHEN (
+        NEW.status = 'pending'
+        AND (OLD.status, {', '.join(f'OLD.{column}' for column in PAIR_COLUMNS)})
+            IS DISTINCT FROM (NEW.status, {', '.join(f'NEW.{column}' for column in PAIR_COLUMNS)})
+    )
+    EXECUTE FUNCTION tictactoe_check_pending_pair();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER tictactoe_pending_pair_update ON tictactoe_tictactoeproposition;
+DROP TRIGGER tictactoe_pending_pair_insert ON tictactoe_tictactoeproposition;
+DROP FUNCTION tictactoe_check_pending_pair();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tictactoe", "0006_partition_propositions_and_game_states"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+    ]
@@ -1,13 +1,15 @@
+from contextlib import nullcontext
 from datetime import timedelta
 
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import connections, models, router, transaction
 from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from tic_tac_toe_3x3.logic.models import GameState as EngineState, Grid, Mark
 
 
 def get_data_expired(timestamp=None, period: timedelta = timedelta(days=7)):
@@ -22,7 +24,67 @@ class PossibleSign(models.TextChoices):
     NOUGHT = '⭕', _('Nought')
 
 
+OPPOSITE_SIGN = {
+    PossibleSign.CROSS: PossibleSign.NOUGHT,
+    PossibleSign.NOUGHT: PossibleSign.CROSS,
+}
+
+# Відповідність знаків гравців позначкам рушія tic_tac_toe_3x3 у GameState.cells
+SIGN_MARKS = {
+    PossibleSign.CROSS: Mark.CROSS,
+    PossibleSign.NOUGHT: Mark.NAUGHT,
+}
+MARK_SIGNS = {mark: sign for sign, mark in SIGN_MARKS.items()}
+
+# Набори для валідації обчислюються один раз, а не на кожне збереження
+VALID_SIGNS = frozenset(PossibleSign.values)
+PLAYER_MODELS = frozenset({('user_management', 'user'), ('user_management', 'tguser')})
+
+# Зерно hashtextextended для 64-бітних ключів pg_advisory_xact_lock пар гравців pending-пропозицій
+# (те саме значення використовує тригер з міграції 0007)
+PENDING_PAIR_LOCK = 0x7474
+
+PROPOSITION_STATUSES = [
+    ('pending', 'Pending'),
+    ('accepted', 'Accepted'),
+    ('rejected', 'Rejected'),
+    ('incomplete', 'Incomplete')
+]
+
+
+class TicTacToePropositionQuerySet(models.QuerySet):
+    def deactivate(self):
+        """
+        Soft-delete одним UPDATE (без завантаження рядків і full_clean).
+        Статус не змінюється, тож unique_pending_proposition порушитися не може.
+        """
+        return self.update(is_active=False, updated_at=timezone.now())
+
+    def set_status(self, status):
+        """
+        Зміна статусу одним UPDATE. Оновлюються лише рядки, для яких перехід не порушує правил clean().
+        Прийняття (accepted) йде окремим потоком - див. TicTacToePropositionAcceptSerializer.
+
+        Як і масові дії адмінки чи сирий SQL, оминає save(): ні validate_pending_pair, ні lock_pending_pair
+        тут не викликаються. Другу pending-пропозицію тієї ж пари відхиляє тригер БД (міграція 0007) -
+        весь UPDATE падає з IntegrityError.
+        """
+        if status not in ('pending', 'rejected', 'incomplete'):
+            raise ValueError(f"Status '{status}' cannot be set with a bulk update.")
+        queryset = self.filter(accepted_at__isnull=True)
+        if status == 'pending':
+            queryset = queryset.filter(
+                player2_object_id__isnull=False,
+                player1_first__isnull=False,
+                player1_sign__isnull=False,
+                player2_sign__isnull=False,
+            )
+        return queryset.update(status=status, updated_at=timezone.now())
+
+
 class TicTacToeProposition(models.Model):
+    # Таблиця секціонована помісячно за created_at (tictactoe.partitions)
+
     # Поля для player1 (ініціатор запрошення, обов’язкове)
     player1_content_type = models.ForeignKey(
         ContentType,
@@ -69,17 +131,15 @@ class TicTacToeProposition(models.Model):
     # Час створення пропозиції
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("created at"))
 
+    # Час останньої зміни пропозиції (версія рядка для ETag)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("updated at"))
+
     # Час прийняття пропозиції (null, якщо ще не прийнято)
     accepted_at = models.DateTimeField(null=True, blank=True, verbose_name=_("accepted at"))
 
     status = models.CharField(
         max_length=20,
-        choices=[
-            ('pending', 'Pending'),
-            ('accepted', 'Accepted'),
-            ('rejected', 'Rejected'),
-            ('incomplete', 'Incomplete')
-        ],
+        choices=PROPOSITION_STATUSES,
         default='pending'
     )
 
@@ -92,6 +152,13 @@ class TicTacToeProposition(models.Model):
 
     is_active = models.BooleanField(default=True, verbose_name=_("is active"))
 
+    objects = TicTacToePropositionQuerySet.as_manager()
+
+    # Поля, від яких залежить unique_pending_proposition
+    CONSTRAINT_FIELDS = frozenset({
+        'player1_content_type_id', 'player1_object_id', 'player2_content_type_id', 'player2_object_id', 'status',
+    })
+
     class Meta:
         verbose_name = _("TicTacToe proposition")
         verbose_name_plural = _("TicTacToe propositions")
@@ -101,14 +168,15 @@ class TicTacToeProposition(models.Model):
             models.Index(fields=['created_at']),
             models.Index(fields=['accepted_at']),
             models.Index(fields=['expires_at']),
-        ]
-        # Унікальність пропозиції: не можна створити дві однакові пропозиції з однаковими player1 і player2, якщо статус "pending"
-        constraints = [
-            models.UniqueConstraint(
+            # Унікальність пропозиції: не можна створити дві однакові пропозиції з однаковими player1 і player2,
+            # якщо статус "pending". Таблиця секціонована (міграція 0006), а унікальний індекс мусив би містити
+            # created_at, тож у БД це звичайний індекс для пошуку дубліката, а унікальність тримає save()
+            # (validate_pending_pair під lock_pending_pair)
+            models.Index(
                 fields=['player1_content_type', 'player1_object_id', 'player2_content_type', 'player2_object_id'],
                 condition=models.Q(status='pending'),
                 name='unique_pending_proposition'
-            )
+            ),
         ]
 
     def __str__(self):
@@ -120,29 +188,39 @@ class TicTacToeProposition(models.Model):
     def is_expired(self):
         return self.expires_at < timezone.now() if self.expires_at else False
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Значення з БД - щоб при збереженні валідувати лише змінені поля
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_changed_fields(self):
+        """Повертає attname змінених полів або None, якщо об'єкт новий (тоді валідуються всі поля)."""
+        loaded = getattr(self, '_loaded_values', None)
+        if self._state.adding or loaded is None:
+            return None
+        return {
+            field.attname for field in self._meta.concrete_fields
+            if field.attname in loaded and getattr(self, field.attname) != loaded[field.attname]
+        }
+
     def clean(self):
         """Валідація моделі."""
-        # Перевірка, що player1 не дорівнює player2
-        if (
-                self.player2_content_type
-                and self.player1_content_type == self.player2_content_type
-                and self.player1_object_id == self.player2_object_id
-        ):
-            raise ValidationError(_("Player 1 and Player 2 cannot be the same."))
+        self.clean_players()
 
         # Перевірка, що знаки гравців різні, якщо обидва вказані
         if self.player1_sign and self.player2_sign and self.player1_sign == self.player2_sign:
             raise ValidationError(_("Player 1 and Player 2 must have different signs."))
 
         # Перевірка, що знаки коректні, якщо вказані
-        valid_signs = [choice[0] for choice in self._meta.get_field('player1_sign').choices]
-        if self.player1_sign and self.player1_sign not in valid_signs:
+        if self.player1_sign and self.player1_sign not in VALID_SIGNS:
             raise ValidationError(_("Invalid sign selected for Player 1."))
-        if self.player2_sign and self.player2_sign not in valid_signs:
+        if self.player2_sign and self.player2_sign not in VALID_SIGNS:
             raise ValidationError(_("Invalid sign selected for Player 2."))
 
         # Перевірка, що accepted_at встановлено лише якщо є player2
-        if self.accepted_at and not self.player2:
+        if self.accepted_at and self.player2_object_id is None:
             raise ValidationError(_("Accepted timestamp cannot be set without Player 2."))
 
         # Перевірка, що expires_at не раніше created_at
@@ -151,7 +229,7 @@ class TicTacToeProposition(models.Model):
 
         # Валідація status
         if self.status == 'accepted' and (
-                not self.player2 or
+                self.player2_object_id is None or
                 not self.player2_sign or
                 not self.player1_sign or
                 self.player1_first is None
@@ -162,14 +240,104 @@ class TicTacToeProposition(models.Model):
         if self.status == 'rejected' and self.accepted_at:
             raise ValidationError(_("Rejected status cannot have accepted_at set."))
 
+    def clean_players(self):
+        """Перевірка гравців без запитів до БД: ContentType береться з кешу ContentTypeManager."""
+        for content_type_id in (self.player1_content_type_id, self.player2_content_type_id):
+            if content_type_id is None:
+                continue
+            content_type = ContentType.objects.get_for_id(content_type_id)
+            if (content_type.app_label, content_type.model) not in PLAYER_MODELS:
+                raise ValidationError(_("Invalid player type."))
+
+        # Перевірка, що player1 не дорівнює player2
+        if (
+                self.player2_content_type_id is not None
+                and self.player1_content_type_id == self.player2_content_type_id
+                and self.player1_object_id == self.player2_object_id
+        ):
+            raise ValidationError(_("Player 1 and Player 2 cannot be the same."))
+
+    def validate_for_save(self, fields=None):
+        """
+        Конвеєр валідації для save(): fields - attname полів, що змінились (None - всі поля).
+        Незмінені поля не перевіряються, FK на ContentType перевіряються через кеш у clean_players(),
+        існування player2 перевіряється лише при його зміні,
+        а запит на unique_pending_proposition робиться лише коли він може бути порушений.
+        """
+        exclude = {'player1_content_type', 'player2_content_type'}
+        if fields is not None:
+            exclude |= {field.name for field in self._meta.concrete_fields if field.attname not in fields}
+        errors = {}
+        try:
+            self.clean_fields(exclude=exclude)
+        except ValidationError as e:
+            errors = e.update_error_dict(errors)
+        try:
+            self.clean()
+            # player2 (GenericForeignKey) резолвиться лише якщо змінився, і кешується на об'єкті
+            player2_changed = fields is None or {'player2_content_type_id', 'player2_object_id'} & fields
+            if player2_changed and self.player2_content_type_id is not None and self.player2 is None:
+                raise ValidationError(_("Player 2 does not exist."))
+        except ValidationError as e:
+            errors = e.update_error_dict(errors)
+        if self.status == 'pending' and (fields is None or self.CONSTRAINT_FIELDS & fields):
+            try:
+                self.validate_pending_pair()
+            except ValidationError as e:
+                errors = e.update_error_dict(errors)
+        if errors:
+            raise ValidationError(errors)
+
+    def validate_pending_pair(self):
+        """Інша pending-пропозиція тих самих гравців (індекс unique_pending_proposition)."""
+        duplicates = type(self).objects.filter(
+            status='pending',
+            player1_content_type_id=self.player1_content_type_id, player1_object_id=self.player1_object_id,
+            player2_content_type_id=self.player2_content_type_id, player2_object_id=self.player2_object_id,
+        )
+        if not self._state.adding:
+            duplicates = duplicates.exclude(pk=self.pk)
+        if duplicates.exists():
+            raise ValidationError(_("A pending proposition for these players already exists."), code='unique')
+
+    def lock_pending_pair(self, using='default'):
+        """
+        У секціонованій таблиці unique_pending_proposition - звичайний індекс (унікальний індекс мусив би містити
+        created_at), тож одночасні пропозиції тієї ж пари серіалізуються advisory-блокуванням до кінця транзакції.
+        Ключ - 64-бітний hashtextextended пари, обчислений так само, як у тригері з міграції 0007.
+        """
+        pair = (f"{self.player1_content_type_id}:{self.player1_object_id}:"
+                f"{self.player2_content_type_id}:{self.player2_object_id}")
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtextextended(%s, %s))", [pair, PENDING_PAIR_LOCK])
+
     def save(self, *args, **kwargs):
         """Автоматична валідація перед збереженням та встановлення статусу 'incomplete' якщо пропозиція має незаповнені поля."""
-        if self.player2 is None or self.player1_first is None or self.player1_sign is None or self.player2_sign is None:
+        if (
+                self.player2_object_id is None or self.player1_first is None
+                or self.player1_sign is None or self.player2_sign is None
+        ):
             self.status = 'incomplete'
         elif self.status == 'accepted' and not self.accepted_at:
             self.accepted_at = timezone.now()
-        self.full_clean()
-        super().save(*args, **kwargs)
+
+        changed = self.get_changed_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and changed is not None:
+            # Автоматично змінені status/accepted_at теж мають потрапити в UPDATE
+            update_fields = set(update_fields) | {name for name in ('status', 'accepted_at') if name in changed}
+            update_fields.add('updated_at')
+            kwargs['update_fields'] = update_fields
+            changed &= {self._meta.get_field(name).attname for name in update_fields}
+        # Перевірка unique_pending_proposition і запис - в одній транзакції під блокуванням пари гравців
+        pending_pair = self.status == 'pending' and (changed is None or bool(self.CONSTRAINT_FIELDS & changed))
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using) if pending_pair else nullcontext():
+            if pending_pair:
+                self.lock_pending_pair(using)
+            self.validate_for_save(changed)
+            super().save(*args, **kwargs)
+        self._loaded_values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
 
 
 class Game(models.Model):
@@ -179,7 +347,7 @@ class Game(models.Model):
         related_name='player1_games',
         limit_choices_to={'model__in': ('user_management.user', 'user_management.tguser')},
     )
-    player1_object_id = models.PositiveIntegerField()
+    player1_object_id = models.PositiveBigIntegerField()
     player1 = GenericForeignKey('player1_content_type', 'player1_object_id')
 
     # Поля для player2 (другий гравець)
@@ -189,8 +357,10 @@ class Game(models.Model):
         related_name='player2_games',
         limit_choices_to={'model__in': ('user_management.user', 'user_management.tguser')},
     )
-    player2_object_id = models.PositiveIntegerField()
+    player2_object_id = models.PositiveBigIntegerField()
     player2 = GenericForeignKey('player2_content_type', 'player2_object_id')
+    # Хто ходить першим: True - player1, False - player2
+    player1_first = models.BooleanField(default=True, verbose_name=_("player1 goes first"))
     player1_symbol = models.CharField(
         max_length=1,
         choices=[('❌', 'Cross'), ('⭕', 'Nought')],
@@ -229,18 +399,145 @@ class Game(models.Model):
             raise ValidationError(_("Player 1 and Player 2 must have different symbols."))
 
         # Перевірка, що символи є коректними Unicode-символами для гри
-        valid_symbols = [choice[0] for choice in self._meta.get_field('player1_symbol').choices]
-        if self.player1_symbol not in valid_symbols or self.player2_symbol not in valid_symbols:
+        if self.player1_symbol not in VALID_SIGNS or self.player2_symbol not in VALID_SIGNS:
             raise ValidationError(_("Invalid symbol selected for player."))
 
+    @property
+    def first_symbol(self):
+        return self.player1_symbol if self.player1_first else self.player2_symbol
+
+    def symbol_of(self, content_type_id, object_id):
+        """Знак гравця в цій грі або None, якщо він не бере в ній участі."""
+        if (self.player1_content_type_id, self.player1_object_id) == (content_type_id, object_id):
+            return self.player1_symbol
+        if (self.player2_content_type_id, self.player2_object_id) == (content_type_id, object_id):
+            return self.player2_symbol
+        return None
+
+    def engine_state(self, cells):
+        """Стан дошки в термінах рушія: хто ходить, чи завершена гра, переможець."""
+        return EngineState(Grid(cells), SIGN_MARKS[self.first_symbol])
+
+    def progress(self, state):
+        """Гра разом із поточним GameState і підсумком за рушієм (для GameProgressSerializer)."""
+        engine_state = self.engine_state(state.cells)
+        return {
+            'game': self,
+            'state': state,
+            'ply': engine_state.grid.x_count + engine_state.grid.o_count,
+            'next_symbol': None if engine_state.game_over else MARK_SIGNS[engine_state.current_mark],
+            'winner': MARK_SIGNS.get(engine_state.winner),
+            'winning_cells': engine_state.winning_cells,
+            'finished': engine_state.game_over,
+        }
+
 
 class GameState(models.Model):
+    # Таблиця секціонована помісячно за created_at (tictactoe.partitions)
     game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='game_state')
     cells = models.CharField(
         max_length=9,
         default=" " * 9,
         validators=[RegexValidator(regex=r"^[\sX0]{9}$", message=_("Must contain 9 cells of: X, 0(null), or space"))]
     )
+    # У секціонованій таблиці id не унікальний сам по собі: ні FK на себе, ні унікальності parent_state в БД -
+    # їх тримає ORM (каскад) і блокування рядка гри при ході
     parent_state = models.OneToOneField("self", null=True, blank=True, on_delete=models.CASCADE,
-                                        related_name='child_state')
+                                        related_name='child_state', db_constraint=False)
     created_at = models.DateTimeField(auto_now_add=True)
+
+
+# Порожній напівбайт у ArchivedGame.moves: доповнення непарної кількості ходів
+_NO_MOVE = 0xF
+
+
+def pack_moves(cells: list[int]) -> bytes:
+    """Послідовність клітинок ходів (0-8) по два ходи на байт: до 9 ходів - не більше 5 байтів."""
+    nibbles = list(cells) + [_NO_MOVE] * (len(cells) % 2)
+    return bytes(high << 4 | low for high, low in zip(nibbles[::2], nibbles[1::2]))
+
+
+def unpack_moves(data: bytes) -> list[int]:
+    cells = []
+    for byte in bytes(data):
+        for nibble in (byte >> 4, byte & 0xF):
+            if nibble != _NO_MOVE:
+                cells.append(nibble)
+    return cells
+
+
+class ArchivedGame(models.Model):
+    """
+    Завершена гра в компактному вигляді (manage.py archive_games): гравці, знаки й ходи в кількох байтах
+    замість ланцюжка GameState. id збігається з id вихідної Game, тож посилання на гру лишаються дійсними.
+    """
+    FLAG_PLAYER1_FIRST = 1
+    FLAG_PLAYER1_CROSS = 2
+
+    id = models.BigIntegerField(primary_key=True)
+    player1_content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='+')
+    player1_object_id = models.PositiveBigIntegerField()
+    player1 = GenericForeignKey('player1_content_type', 'player1_object_id')
+    player2_content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='+')
+    player2_object_id = models.PositiveBigIntegerField()
+    player2 = GenericForeignKey('player2_content_type', 'player2_object_id')
+    # Біти FLAG_*: хто ходив першим і чий знак хрестик
+    flags = models.PositiveSmallIntegerField()
+    moves = models.BinaryField(max_length=5)
+    # id останнього GameState - API і далі віддає його як state.id
+    last_state_id = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _("archived game")
+        verbose_name_plural = _("archived games")
+        indexes = [
+            models.Index(fields=['player1_object_id']),
+            models.Index(fields=['player2_object_id']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"Archived game {self.id}"
+
+    @classmethod
+    def pack_flags(cls, game: Game) -> int:
+        return ((cls.FLAG_PLAYER1_FIRST if game.player1_first else 0)
+                | (cls.FLAG_PLAYER1_CROSS if game.player1_symbol == PossibleSign.CROSS else 0))
+
+    @property
+    def player1_first(self) -> bool:
+        return bool(self.flags & self.FLAG_PLAYER1_FIRST)
+
+    @property
+    def player1_symbol(self) -> str:
+        return PossibleSign.CROSS if self.flags & self.FLAG_PLAYER1_CROSS else PossibleSign.NOUGHT
+
+    @property
+    def player2_symbol(self) -> str:
+        return OPPOSITE_SIGN[self.player1_symbol]
+
+    # Той самий підсумок за рушієм, що й для Game: потрібні лише знаки й черговість
+    first_symbol = Game.first_symbol
+    symbol_of = Game.symbol_of
+    engine_state = Game.engine_state
+    progress = Game.progress
+
+    @property
+    def move_cells(self) -> list[int]:
+        return unpack_moves(self.moves)
+
+    @property
+    def cells(self) -> str:
+        """Дошка після останнього ходу."""
+        cells = [' '] * 9
+        mark = SIGN_MARKS[self.first_symbol]
+        for cell in self.move_cells:
+            cells[cell] = mark.value
+            mark = mark.other
+        return ''.join(cells)
+
+    def last_state(self) -> GameState:
+        """Останній стан як незбережений GameState (без parent_state) для GameProgressSerializer."""
+        return GameState(id=self.last_state_id, game_id=self.id, cells=self.cells, created_at=self.finished_at)
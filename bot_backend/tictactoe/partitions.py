@@ -0,0 +1,130 @@
+"""
+Помісячне секціонування (PARTITION BY RANGE (created_at)) таблиць TicTacToeProposition і GameState.
+
+Розділ місяця - `<таблиця>_pYYYY_MM` з межами [1-ше число 00:00 UTC, 1-ше число наступного місяця),
+рядки поза створеними розділами потрапляють у `<таблиця>_default`. manage.py manage_partitions
+створює розділи наперед (рядки відповідного місяця з default переносяться в новий розділ)
+і від'єднує/видаляє розділи, старші за PARTITION_RETENTION_MONTHS, - видалення даних
+за місяць стає операцією над метаданими замість масового DELETE.
+
+Первинний ключ секціонованої таблиці мусить містити ключ секціонування, тож у БД він (id, created_at);
+id, як і раніше, видає послідовність. Глобальних унікальних індексів Postgres не має - див. міграцію 0006.
+"""
+import re
+from datetime import date, datetime, timezone
+
+from django.db import connection as default_connection, transaction
+
+PARTITION_KEY = 'created_at'
+PARTITIONED_MODELS = ('tictactoe.TicTacToeProposition', 'tictactoe.GameState')
+# Розділи цих моделей видаляються лише порожніми: стани завершених ігор переносить в архів archive_games,
+# а решта - ланцюжки parent_state незавершених ігор, які можуть тягнутися через межу місяця
+# (db_constraint=False - після видалення розділу посилання просто повисли б)
+DROP_ONLY_EMPTY = ('tictactoe.GameState',)
+
+_MONTH_SUFFIX = re.compile(r'_p(\d{4})_(\d{2})$')
+
+
+def month_start(moment: datetime | date) -> date:
+    if isinstance(moment, datetime) and moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f'{table}_p{month:%Y_%m}'
+
+
+def default_partition_name(table: str) -> str:
+    return f'{table}_default'
+
+
+def _bound(month: date) -> str:
+    return f"'{month:%Y-%m-%d} 00:00:00+00'"
+
+
+def partitions(table: str, connection=default_connection) -> dict[date, str]:
+    """Приєднані місячні розділи таблиці: {перше число місяця: назва}."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s AND parent.relnamespace = to_regnamespace(current_schema())
+            """,
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = {}
+    for name in names:
+        match = _MONTH_SUFFIX.search(name)
+        if match:
+            months[date(int(match[1]), int(match[2]), 1)] = name
+    return dict(sorted(months.items()))
+
+
+def create_partition(table: str, month: date, connection=default_connection) -> str:
+    """
+    Розділ місяця. Якщо в default уже є рядки цього місяця, default на час створення від'єднується
+    і рядки переносяться в новий розділ - інакше Postgres відмовить у створенні розділу.
+    """
+    quote = connection.ops.quote_name
+    name, default = partition_name(table, month), default_partition_name(table)
+    bounds = f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(add_months(month, 1))})"
+    in_month = f"{quote(PARTITION_KEY)} >= {_bound(month)} AND {quote(PARTITION_KEY)} < {_bound(add_months(month, 1))}"
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {quote(default)} WHERE {in_month})")
+        if not cursor.fetchone()[0]:
+            cursor.execute(f"CREATE TABLE {quote(name)} PARTITION OF {quote(table)} {bounds}")
+            return name
+        cursor.execute(f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(default)}")
+        cursor.execute(f"CREATE TABLE {quote(name)} PARTITION OF {quote(table)} {bounds}")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {quote(default)} WHERE {in_month} RETURNING *) "
+            f"INSERT INTO {quote(table)} SELECT * FROM moved"
+        )
+        cursor.execute(f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(default)} DEFAULT")
+    return name
+
+
+def missing_months(table: str, first: date, last: date, connection=default_connection) -> list[date]:
+    """Місяці з `first` по `last` включно, для яких ще немає розділу."""
+    existing = partitions(table, connection)
+    months = []
+    month = month_start(first)
+    while month <= last:
+        if month not in existing:
+            months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def ensure_partitions(table: str, first: date, last: date, connection=default_connection) -> list[str]:
+    """Створює відсутні розділи місяців з `first` по `last` включно; повертає назви створених."""
+    return [create_partition(table, month, connection) for month in missing_months(table, first, last, connection)]
+
+
+def expired_partitions(table: str, keep_since: date, connection=default_connection) -> list[str]:
+    """Розділи місяців, що закінчилися до `keep_since`."""
+    return [name for month, name in partitions(table, connection).items() if month < keep_since]
+
+
+def partition_is_empty(name: str, connection=default_connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT NOT EXISTS (SELECT 1 FROM {connection.ops.quote_name(name)})")
+        return cursor.fetchone()[0]
+
+
+def detach_partition(table: str, name: str, drop: bool = True, connection=default_connection) -> None:
+    """Від'єднує розділ; без drop він лишається окремою таблицею (наприклад, для pg_dump перед видаленням)."""
+    quote = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}")
+        if drop:
+            cursor.execute(f"DROP TABLE {quote(name)}")
@@ -1,13 +1,15 @@
 from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
 from rest_framework import serializers
+from tic_tac_toe_3x3.logic.exceptions import InvalidMove
 
+from bot_backend.tracing import TracedSerializerMixin
 from user_management.models import TgUser
 from user_management.serializers import PlayerSerializer
-from .models import TicTacToeProposition
+from .models import TicTacToeProposition, Game, GameState, PossibleSign, OPPOSITE_SIGN, SIGN_MARKS
 
 
-class TicTacToePropositionSerializer(serializers.ModelSerializer):
+class TicTacToePropositionSerializer(TracedSerializerMixin, serializers.ModelSerializer):
     deep_links = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -121,6 +123,162 @@ class TicTacToePropositionPostSerializer(TicTacToePropositionSerializer):
         return proposition
 
 
+class TicTacToePropositionAcceptSerializer(TracedSerializerMixin, serializers.Serializer):
+    """
+    Прийняття пропозиції TgUser-ом (player2 або будь-хто для відкритої пропозиції).
+    Незаповнені ініціатором поля можна задати тут, решта отримує значення за замовчуванням.
+    В одній транзакції пропозиція стає accepted, створюються Game і початковий GameState.
+    """
+    player1_first = serializers.BooleanField(
+        required=False,
+        help_text="Who goes first if player1 did not choose (default: player1).",
+    )
+    player2_sign = serializers.ChoiceField(
+        choices=PossibleSign.choices,
+        required=False,
+        help_text="Sign of the accepting player if player1 did not choose.",
+    )
+
+    def validate(self, data):
+        proposition = self.instance
+        player = self.context['player']
+        player_content_type = TgUser.get_content_type()
+
+        if proposition.status not in ('pending', 'incomplete'):
+            raise serializers.ValidationError(f"Proposition with status '{proposition.status}' cannot be accepted.")
+        if proposition.is_expired:
+            raise serializers.ValidationError("Proposition is expired.")
+        if (proposition.player1_content_type_id, proposition.player1_object_id) == (player_content_type.id, player.id):
+            raise serializers.ValidationError("Player 1 cannot accept own proposition.")
+
+        if proposition.player1_first is not None:
+            if 'player1_first' in data and data['player1_first'] != proposition.player1_first:
+                raise serializers.ValidationError({'player1_first': "Already set by player 1."})
+            data['player1_first'] = proposition.player1_first
+        else:
+            data.setdefault('player1_first', True)
+
+        player2_sign = proposition.player2_sign
+        if player2_sign is None:
+            player2_sign = data.get('player2_sign') or (
+                OPPOSITE_SIGN[proposition.player1_sign] if proposition.player1_sign else PossibleSign.NOUGHT
+            )
+        elif data.get('player2_sign', player2_sign) != player2_sign:
+            raise serializers.ValidationError({'player2_sign': "Already set by player 1."})
+        player1_sign = proposition.player1_sign or OPPOSITE_SIGN[player2_sign]
+        if player1_sign == player2_sign:
+            raise serializers.ValidationError({'player2_sign': "Player 1 and Player 2 must have different signs."})
+        data['player1_sign'] = player1_sign
+        data['player2_sign'] = player2_sign
+        return data
+
+    def update(self, proposition, validated_data):
+        """Викликати всередині transaction.atomic() із заблокованим (select_for_update) рядком пропозиції."""
+        player = self.context['player']
+        # Присвоєння через GenericForeignKey кешує об'єкт - повторного запиту за player2 не буде
+        proposition.player2 = player
+        proposition.player1_first = validated_data['player1_first']
+        proposition.player1_sign = validated_data['player1_sign']
+        proposition.player2_sign = validated_data['player2_sign']
+        proposition.status = 'accepted'
+        proposition.accepted_at = timezone.now()
+        proposition.save(update_fields=[
+            'player2_content_type', 'player2_object_id', 'player1_first', 'player1_sign', 'player2_sign',
+            'status', 'accepted_at', 'updated_at',
+        ])
+
+        game = Game.objects.create(
+            player1=proposition.player1,
+            player2=player,
+            player1_first=proposition.player1_first,
+            player1_symbol=proposition.player1_sign,
+            player2_symbol=proposition.player2_sign,
+        )
+        state = GameState.objects.create(game=game)
+        self.game, self.state = game, state
+        return proposition
+
+
+class GameStateSerializer(TracedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = GameState
+        fields = ['id', 'cells', 'parent_state', 'created_at']
+        read_only_fields = fields
+
+
+class GameSerializer(TracedSerializerMixin, serializers.ModelSerializer):
+    player1 = PlayerSerializer(read_only=True)
+    player2 = PlayerSerializer(read_only=True)
+
+    class Meta:
+        model = Game
+        fields = ['id', 'player1', 'player2', 'player1_first', 'player1_symbol', 'player2_symbol', 'created_at']
+        read_only_fields = fields
+
+
+class GameProgressSerializer(TracedSerializerMixin, serializers.Serializer):
+    """Гра, її поточний стан і підсумок (див. Game.progress)."""
+    game = GameSerializer(read_only=True)
+    state = GameStateSerializer(read_only=True)
+    ply = serializers.IntegerField(read_only=True, help_text="Number of moves made.")
+    next_symbol = serializers.ChoiceField(choices=PossibleSign.choices, read_only=True, allow_null=True)
+    winner = serializers.ChoiceField(choices=PossibleSign.choices, read_only=True, allow_null=True)
+    winning_cells = serializers.ListField(child=serializers.IntegerField(), read_only=True)
+    finished = serializers.BooleanField(read_only=True)
+
+
+class GameHistorySerializer(TracedSerializerMixin, serializers.Serializer):
+    """Гра в історії TgUser: з гарячих таблиць або з архіву (ArchivedGame)."""
+    game = GameSerializer(read_only=True)
+    moves = serializers.ListField(child=serializers.IntegerField(), read_only=True,
+                                 help_text="Cells of the moves in order, 0-8 row by row.")
+    ply = serializers.IntegerField(read_only=True, help_text="Number of moves made.")
+    winner = serializers.ChoiceField(choices=PossibleSign.choices, read_only=True, allow_null=True)
+    finished = serializers.BooleanField(read_only=True)
+    archived = serializers.BooleanField(read_only=True)
+
+
+class GameMoveSerializer(TracedSerializerMixin, serializers.Serializer):
+    """
+    Хід гравця. Перевірка ходу - рушієм tic_tac_toe_3x3.
+    Контекст: game (заблокований select_for_update рядок), state (останній GameState), player_content_type_id,
+    player_object_id. Викликати всередині transaction.atomic().
+    """
+    cell = serializers.IntegerField(min_value=0, max_value=8, help_text="Cell index 0-8, row by row.")
+    ply = serializers.IntegerField(
+        required=False,
+        min_value=0,
+        max_value=8,
+        help_text="Number of moves the client saw on the board. The move is rejected if the board has changed.",
+    )
+
+    def validate(self, data):
+        game = self.context['game']
+        state = self.context['state']
+        symbol = game.symbol_of(self.context['player_content_type_id'], self.context['player_object_id'])
+        engine_state = game.engine_state(state.cells)
+
+        if engine_state.game_over:
+            raise serializers.ValidationError("Game is over.")
+        if 'ply' in data and data['ply'] != engine_state.grid.x_count + engine_state.grid.o_count:
+            raise serializers.ValidationError({'ply': "Board has changed since this move was offered."})
+        if symbol is None or SIGN_MARKS[symbol] != engine_state.current_mark:
+            raise serializers.ValidationError("It is not your turn.")
+        try:
+            move = engine_state.make_move_to(data['cell'])
+        except InvalidMove:
+            raise serializers.ValidationError({'cell': "Cell is not empty."})
+        data['cells'] = move.after_state.grid.cells
+        return data
+
+    def create(self, validated_data):
+        return GameState.objects.create(
+            game=self.context['game'],
+            cells=validated_data['cells'],
+            parent_state=self.context['state'],
+        )
+
+
 class CommaSeparatedChoiceListField(serializers.ListField):
     """
         Кастомне поле для обробки comma-separated значень у query-параметрах.
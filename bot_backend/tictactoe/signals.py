@@ -0,0 +1,73 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from user_management.models import TgUser
+from .events import event_broker
+from .models import TicTacToeProposition, GameState
+
+
+def tguser_ids(obj) -> set[int]:
+    """Повертає id гравців-TgUser (player1/player2) пропозиції або гри."""
+    content_type_id = TgUser.get_content_type().id
+    ids = set()
+    if obj.player1_content_type_id == content_type_id:
+        ids.add(obj.player1_object_id)
+    if obj.player2_content_type_id == content_type_id and obj.player2_object_id is not None:
+        ids.add(obj.player2_object_id)
+    return ids
+
+
+def publish_proposition(proposition: TicTacToeProposition):
+    """Публікує поточний стан пропозиції обом гравцям."""
+    data = {
+        'id': proposition.id,
+        'status': proposition.status,
+        'is_active': proposition.is_active,
+        'player1_first': proposition.player1_first,
+        'player1_sign': proposition.player1_sign,
+        'player2_sign': proposition.player2_sign,
+        'accepted_at': proposition.accepted_at,
+        'updated_at': proposition.updated_at,
+    }
+    for tguser_id in tguser_ids(proposition):
+        event_broker.publish(tguser_id, 'proposition', data)
+
+
+def publish_propositions(proposition_ids):
+    """
+    Bulk-оновлення (QuerySet.deactivate/set_status) не надсилають post_save.
+    Рядки перечитуються лише якщо в процесі є підписники.
+    """
+    if not event_broker.subscriber_count():
+        return
+    for proposition in TicTacToeProposition.objects.filter(pk__in=proposition_ids):
+        publish_proposition(proposition)
+
+
+def publish_move(state: GameState):
+    """
+    Публікує новий стан дошки обом гравцям гри.
+    Гра (гравці) читається лише якщо в процесі є підписники; при створенні стану з об'єктом гри вона вже в кеші.
+    """
+    if not event_broker.subscriber_count():
+        return
+    data = {
+        'game_id': state.game_id,
+        'state_id': state.id,
+        'cells': state.cells,
+    }
+    for tguser_id in tguser_ids(state.game):
+        event_broker.publish(tguser_id, 'move', data)
+
+
+@receiver(post_save, sender=TicTacToeProposition, dispatch_uid='tictactoe_publish_proposition')
+def proposition_saved(sender, instance, **kwargs):
+    # Подія йде тільки після коміту - підписники не побачать змін, які потім відкотяться
+    transaction.on_commit(lambda: publish_proposition(instance))
+
+
+@receiver(post_save, sender=GameState, dispatch_uid='tictactoe_publish_move')
+def game_state_saved(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: publish_move(instance))
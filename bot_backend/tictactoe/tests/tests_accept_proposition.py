@@ -0,0 +1,81 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tictactoe.models import TicTacToeProposition, Game, GameState, PossibleSign
+from user_management.models import TgUser
+
+
+class AcceptPropositionTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.content_type = TgUser.get_content_type()
+        self.tguser1 = TgUser.objects.create(id=5_000_000_001, tg_first_name='Inviter')
+        self.tguser2 = TgUser.objects.create(id=5_000_000_002, tg_first_name='Invitee')
+        self.proposition = TicTacToeProposition.objects.create(
+            player1_content_type=self.content_type,
+            player1_object_id=self.tguser1.id,
+            player2_content_type=self.content_type,
+            player2_object_id=self.tguser2.id,
+            player1_sign=PossibleSign.CROSS,
+        )
+
+    def url(self, tguser, proposition=None):
+        return reverse(
+            'api_user_management:tguser-tictactoe-propositions-accept',
+            kwargs={'tguser_pk': tguser.id, 'pk': (proposition or self.proposition).id},
+        )
+
+    def test_accept_creates_game_and_state(self):
+        response = self.client.post(self.url(self.tguser2), {'player1_first': False}, format='json')
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['proposition']['status'], 'accepted')
+        self.assertIsNotNone(data['proposition']['accepted_at'])
+        self.assertEqual(data['proposition']['player2_sign'], PossibleSign.NOUGHT)
+        self.assertEqual(data['game']['player1']['id'], self.tguser1.id)
+        self.assertEqual(data['game']['player2']['id'], self.tguser2.id)
+        self.assertFalse(data['game']['player1_first'])
+        self.assertEqual(data['game']['player1_symbol'], PossibleSign.CROSS)
+        self.assertEqual(data['state']['cells'], ' ' * 9)
+
+        game = Game.objects.get(pk=data['game']['id'])
+        self.assertEqual(GameState.objects.get(game=game).id, data['state']['id'])
+        self.proposition.refresh_from_db()
+        self.assertEqual(self.proposition.status, 'accepted')
+
+    def test_accept_open_proposition_by_any_tguser(self):
+        open_proposition = TicTacToeProposition.objects.create(
+            player1_content_type=self.content_type,
+            player1_object_id=self.tguser1.id,
+        )
+        response = self.client.post(self.url(self.tguser2, open_proposition), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['proposition']['player2']['id'], self.tguser2.id)
+        self.assertTrue(response.json()['game']['player1_first'])
+
+    def test_accept_twice_or_by_inviter_fails(self):
+        # Ініціатор не бачить чужої (не відкритої) пропозиції як player2
+        self.assertEqual(self.client.post(self.url(self.tguser1), format='json').status_code, 404)
+        self.assertEqual(self.client.post(self.url(self.tguser2), format='json').status_code, 201)
+        self.assertEqual(self.client.post(self.url(self.tguser2), format='json').status_code, 400)
+        self.assertEqual(Game.objects.count(), 1)
+
+    def test_accept_conflicting_sign_fails(self):
+        response = self.client.post(self.url(self.tguser2), {'player2_sign': PossibleSign.CROSS}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Game.objects.exists())
+
+    def test_inviter_cannot_accept_open_proposition(self):
+        open_proposition = TicTacToeProposition.objects.create(
+            player1_content_type=self.content_type,
+            player1_object_id=self.tguser1.id,
+        )
+        response = self.client.post(self.url(self.tguser1, open_proposition), format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_accept_statement_count(self):
+        """TgUser, SELECT ... FOR UPDATE, UPDATE, player1, INSERT Game, INSERT GameState + savepoint/release."""
+        with self.assertNumQueries(8):
+            response = self.client.post(self.url(self.tguser2), format='json')
+        self.assertEqual(response.status_code, 201)
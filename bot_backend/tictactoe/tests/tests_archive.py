@@ -0,0 +1,106 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tictactoe.models import ArchivedGame, Game, GameState, PossibleSign, SIGN_MARKS, pack_moves, unpack_moves
+from user_management.models import TgUser
+
+
+class PackMovesTestCase(SimpleTestCase):
+    def test_round_trip(self):
+        for moves in ([], [4], [4, 0], [0, 1, 2, 3, 4, 5, 6, 7, 8], [8, 7, 6]):
+            with self.subTest(moves):
+                self.assertEqual(unpack_moves(pack_moves(moves)), moves)
+        self.assertEqual(len(pack_moves(list(range(9)))), 5)
+
+
+class ArchiveGamesTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tguser1 = TgUser.objects.create(id=6_100_000_001, tg_first_name='Cross')
+        self.tguser2 = TgUser.objects.create(id=6_100_000_002, tg_first_name='Nought')
+        # Перемога другого гравця (хрестики, ходить першим) по діагоналі 2-4-6
+        self.finished = self.play([4, 0, 2, 1, 6], player1_first=False)
+        self.unfinished = self.play([4, 0])
+        self.recent = self.play([0, 3, 1, 4, 2], age=timedelta(hours=1))
+
+    def play(self, moves, player1_first=True, age=timedelta(days=30)):
+        game = Game.objects.create(
+            player1=self.tguser1, player2=self.tguser2, player1_first=player1_first,
+            player1_symbol=PossibleSign.NOUGHT, player2_symbol=PossibleSign.CROSS,
+        )
+        state = GameState.objects.create(game=game)
+        cells = [' '] * 9
+        mark = SIGN_MARKS[game.first_symbol]
+        for cell in moves:
+            cells[cell] = mark.value
+            mark = mark.other
+            state = GameState.objects.create(game=game, cells=''.join(cells), parent_state=state)
+        past = timezone.now() - age
+        Game.objects.filter(id=game.id).update(created_at=past)
+        GameState.objects.filter(game=game).update(created_at=past)
+        return game
+
+    def detail(self, game):
+        url = reverse('api_user_management:tguser-games-detail', kwargs={'tguser_pk': self.tguser1.id, 'pk': game.id})
+        return self.client.get(url)
+
+    def history(self):
+        return self.client.get(reverse('api_user_management:tguser-games-list', kwargs={'tguser_pk': self.tguser1.id}))
+
+    def test_finished_games_are_archived(self):
+        before = self.detail(self.finished).json()
+        history_before = self.history().json()
+
+        output = StringIO()
+        call_command('archive_games', older_than_days=1, batch_size=2, stdout=output)
+        self.assertIn('Archived 1 of 2 games', output.getvalue())
+
+        self.assertFalse(Game.objects.filter(id=self.finished.id).exists())
+        self.assertFalse(GameState.objects.filter(game_id=self.finished.id).exists())
+        self.assertEqual(GameState.objects.filter(game=self.unfinished).count(), 3)
+        archived = ArchivedGame.objects.get()
+        self.assertEqual(archived.id, self.finished.id)
+        self.assertEqual(len(archived.moves), 3)
+
+        # Для клієнтів гра виглядає так само, крім посилання на попередній стан
+        after = self.detail(self.finished).json()
+        before['state'].pop('parent_state')
+        self.assertIsNone(after['state'].pop('parent_state'))
+        self.assertEqual(after, before)
+        self.assertEqual(before['winner'], PossibleSign.CROSS)
+
+        history = self.history().json()
+        self.assertEqual(history['count'], 3)
+        for item in history_before['results']:
+            item['archived'] = item['game']['id'] == self.finished.id
+        self.assertEqual(history['results'], history_before['results'])
+
+    def test_history_lists_both_stores_newest_first(self):
+        call_command('archive_games', older_than_days=1, stdout=StringIO())
+        results = self.history().json()['results']
+        self.assertEqual([item['game']['id'] for item in results],
+                         [self.recent.id, self.unfinished.id, self.finished.id])
+        self.assertEqual([item['archived'] for item in results], [False, False, True])
+        self.assertEqual(results[2]['moves'], [4, 0, 2, 1, 6])
+        self.assertEqual(results[1]['moves'], [4, 0])
+        self.assertTrue(results[2]['finished'])
+
+    def test_dry_run_and_moves_on_archived_game(self):
+        call_command('archive_games', older_than_days=1, dry_run=True, stdout=StringIO())
+        self.assertFalse(ArchivedGame.objects.exists())
+
+        call_command('archive_games', older_than_days=1, stdout=StringIO())
+        url = reverse('api_user_management:tguser-games-move', kwargs={'tguser_pk': self.tguser1.id,
+                                                                      'pk': self.finished.id})
+        response = self.client.post(url, {'cell': 0}, format='json')
+        self.assertEqual(response.status_code, 400)
+        outsider = TgUser.objects.create(id=6_100_000_003, tg_first_name='Outsider')
+        url = reverse('api_user_management:tguser-games-detail', kwargs={'tguser_pk': outsider.id,
+                                                                        'pk': self.finished.id})
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,22 @@
+from django.test import TestCase
+
+from benchmarks import suite
+
+
+class BenchmarkSuiteTestCase(TestCase):
+    def test_benchmarks_run(self):
+        # Кожен бенчмарк готується й виконується без помилок (db=True - на тестовій БД цього TestCase)
+        for name, (setup, _) in suite.BENCHMARKS.items():
+            with self.subTest(name):
+                setup()()
+
+    def test_compare_flags_regressions_above_threshold(self):
+        baseline = {'benchmarks': {'a': {'median_us': 100.0}, 'b': {'median_us': 100.0}}}
+        current = {'benchmarks': {'a': {'median_us': 109.0}, 'b': {'median_us': 125.0}, 'c': {'median_us': 1.0}}}
+        rows = {row['name']: row for row in suite.compare(baseline, current, threshold=0.1)}
+        self.assertFalse(rows['a']['regression'])
+        self.assertTrue(rows['b']['regression'])
+        self.assertEqual(rows['b']['change'], 0.25)
+        # Нового бенчмарку немає в базовій лінії - це не регресія
+        self.assertFalse(rows['c']['regression'])
+        self.assertIsNone(rows['c']['change'])
@@ -0,0 +1,168 @@
+import asyncio
+import http.client
+import socket
+import threading
+import time
+from unittest import mock
+
+import uvicorn
+from django.contrib.contenttypes.models import ContentType
+from django.core.asgi import get_asgi_application
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from tictactoe.events import EventBroker, event_broker
+from tictactoe.models import TicTacToeProposition, Game, GameState, PossibleSign
+from tictactoe.signals import publish_move
+from user_management.models import TgUser, User
+
+
+class EventBrokerTestCase(TestCase):
+    async def test_publish_from_other_thread(self):
+        broker = EventBroker(queue_size=10)
+        subscription = broker.subscribe(1)
+        thread = threading.Thread(target=broker.publish, args=(1, 'proposition', {'id': 5}))
+        thread.start()
+        thread.join()
+        message = await asyncio.wait_for(subscription.get(), timeout=1)
+        self.assertEqual(message, 'event: proposition\ndata: {"id": 5}\n\n')
+        broker.unsubscribe(subscription)
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    async def test_slow_subscriber_drops_oldest(self):
+        broker = EventBroker(queue_size=2)
+        subscription = broker.subscribe(1)
+        for i in range(3):
+            broker.publish(1, 'move', {'i': i})
+        await asyncio.sleep(0)
+        self.assertEqual(subscription.dropped, 1)
+        self.assertIn('"i": 1', await subscription.get())
+
+
+class EventSignalsTestCase(TestCase):
+    def setUp(self):
+        self.tguser1 = TgUser.objects.create(id=111, tg_first_name='One')
+        self.tguser2 = TgUser.objects.create(id=222, tg_first_name='Two')
+        self.content_type = TgUser.get_content_type()
+
+    def test_proposition_event_after_commit(self):
+        with mock.patch.object(event_broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                proposition = TicTacToeProposition.objects.create(
+                    player1_content_type=self.content_type,
+                    player1_object_id=self.tguser1.id,
+                    player2_content_type=self.content_type,
+                    player2_object_id=self.tguser2.id,
+                )
+                publish.assert_not_called()
+        self.assertEqual({c.args[0] for c in publish.call_args_list}, {111, 222})
+        event, data = publish.call_args.args[1:]
+        self.assertEqual(event, 'proposition')
+        self.assertEqual(data['id'], proposition.id)
+        self.assertEqual(data['status'], 'incomplete')
+
+    def test_move_event_after_commit(self):
+        game = Game.objects.create(
+            player1_content_type=self.content_type,
+            player1_object_id=self.tguser1.id,
+            player2_content_type=self.content_type,
+            player2_object_id=self.tguser2.id,
+            player1_symbol=PossibleSign.CROSS,
+            player2_symbol=PossibleSign.NOUGHT,
+        )
+        with mock.patch.object(event_broker, 'subscriber_count', return_value=1), \
+                mock.patch.object(event_broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                state = GameState.objects.create(game=game, cells="X        ")
+        self.assertEqual(publish.call_count, 2)
+        self.assertEqual(publish.call_args.args[1:], ('move', {'game_id': game.id, 'state_id': state.id, 'cells': "X        "}))
+
+
+    def test_move_without_subscribers_skips_game_query(self):
+        game = Game.objects.create(
+            player1_content_type=self.content_type,
+            player1_object_id=self.tguser1.id,
+            player2_content_type=self.content_type,
+            player2_object_id=self.tguser2.id,
+            player1_symbol=PossibleSign.CROSS,
+            player2_symbol=PossibleSign.NOUGHT,
+        )
+        state = GameState.objects.create(game=game, cells="X        ")
+        state = GameState.objects.get(pk=state.pk)
+        with mock.patch.object(event_broker, 'publish') as publish, self.assertNumQueries(0):
+            publish_move(state)
+        publish.assert_not_called()
+
+
+class EventStreamViewTestCase(TestCase):
+    def setUp(self):
+        self.tguser = TgUser.objects.create(id=333, tg_first_name='Three')
+
+    async def test_stream_receives_published_event(self):
+        url = reverse('api_user_management:tguser-events', kwargs={'tguser_pk': self.tguser.id})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = aiter(response.streaming_content)
+        self.assertEqual(await anext(content), b'retry: 3000\n\n')
+        event_broker.publish(self.tguser.id, 'proposition', {'id': 1})
+        self.assertEqual(await asyncio.wait_for(anext(content), timeout=1), b'event: proposition\ndata: {"id": 1}\n\n')
+        await content.aclose()
+
+    async def test_stream_unknown_tguser(self):
+        url = reverse('api_user_management:tguser-events', kwargs={'tguser_pk': 404})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_stream_refused_under_wsgi(self):
+        """Під WSGI нескінченний стрім зайняв би потік назавжди, так і не віддавши жодного байта."""
+        url = reverse('api_user_management:tguser-events', kwargs={'tguser_pk': self.tguser.id})
+        self.assertEqual(self.client.get(url).status_code, 501)
+
+
+class EventStreamAsgiServerTestCase(TransactionTestCase):
+    """
+    Стрім через справжній ASGI-сервер (uvicorn): події доходять до клієнта, поки з'єднання відкрите.
+    Сервер у своєму потоці бачить лише закомічені дані - звідси TransactionTestCase.
+    """
+
+    def setUp(self):
+        self.tguser = TgUser.objects.create(id=444, tg_first_name='Four')
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        self.port = sock.getsockname()[1]
+        config = uvicorn.Config(get_asgi_application(), lifespan='off', log_level='warning',
+                                timeout_graceful_shutdown=1)
+        self.server = uvicorn.Server(config)
+        thread = threading.Thread(target=self.server.run, kwargs={'sockets': [sock]}, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(setattr, self.server, 'should_exit', True)
+        deadline = time.monotonic() + 5
+        while not self.server.started and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def tearDown(self):
+        # flush після тесту перестворює ContentType з новими id - кешовані треба скинути
+        TgUser._content_type = User._content_type = None
+        ContentType.objects.clear_cache()
+
+    def read_message(self, response) -> bytes:
+        message = b''
+        while not message.endswith(b'\n\n'):
+            chunk = response.read1(1024)
+            if not chunk:
+                break
+            message += chunk
+        return message
+
+    def test_first_event_over_asgi_connection(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=5)
+        self.addCleanup(connection.close)
+        connection.request('GET', reverse('api_user_management:tguser-events', kwargs={'tguser_pk': self.tguser.id}))
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Content-Type'), 'text/event-stream')
+        self.assertEqual(self.read_message(response), b'retry: 3000\n\n')
+        event_broker.publish(self.tguser.id, 'proposition', {'id': 1})
+        self.assertEqual(self.read_message(response), b'event: proposition\ndata: {"id": 1}\n\n')
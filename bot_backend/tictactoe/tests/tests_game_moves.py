@@ -0,0 +1,84 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tictactoe.models import Game, GameState, PossibleSign
+from user_management.models import TgUser
+
+
+class GameMoveTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.content_type = TgUser.get_content_type()
+        self.tguser1 = TgUser.objects.create(id=6_000_000_001, tg_first_name='Cross')
+        self.tguser2 = TgUser.objects.create(id=6_000_000_002, tg_first_name='Nought')
+        self.outsider = TgUser.objects.create(id=6_000_000_003, tg_first_name='Outsider')
+        self.game = Game.objects.create(
+            player1=self.tguser1,
+            player2=self.tguser2,
+            player1_first=True,
+            player1_symbol=PossibleSign.CROSS,
+            player2_symbol=PossibleSign.NOUGHT,
+        )
+        GameState.objects.create(game=self.game)
+
+    def move(self, tguser, cell, **data):
+        url = reverse('api_user_management:tguser-games-move', kwargs={'tguser_pk': tguser.id, 'pk': self.game.id})
+        return self.client.post(url, {'cell': cell, **data}, format='json')
+
+    def test_retrieve_initial_state(self):
+        url = reverse('api_user_management:tguser-games-detail', kwargs={'tguser_pk': self.tguser2.id, 'pk': self.game.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['state']['cells'], ' ' * 9)
+        self.assertEqual(data['ply'], 0)
+        self.assertEqual(data['next_symbol'], PossibleSign.CROSS)
+        self.assertFalse(data['finished'])
+
+    def test_moves_alternate_and_chain_states(self):
+        response = self.move(self.tguser1, 4)
+        self.assertEqual(response.status_code, 201)
+        first = response.json()
+        self.assertEqual(first['state']['cells'], '    X    ')
+        self.assertEqual(first['ply'], 1)
+        self.assertEqual(first['next_symbol'], PossibleSign.NOUGHT)
+
+        response = self.move(self.tguser2, 0, ply=1)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['state']['cells'], '0   X    ')
+        self.assertEqual(response.json()['state']['parent_state'], first['state']['id'])
+
+    def test_rejects_wrong_turn_occupied_cell_and_stale_ply(self):
+        self.assertEqual(self.move(self.tguser2, 0).status_code, 400)
+        self.assertEqual(self.move(self.tguser1, 0).status_code, 201)
+        self.assertIn('cell', self.move(self.tguser2, 0).json())
+        self.assertIn('ply', self.move(self.tguser2, 1, ply=0).json())
+        self.assertEqual(GameState.objects.filter(game=self.game).count(), 2)
+
+    def test_winning_move_finishes_game(self):
+        for tguser, cell in ((self.tguser1, 0), (self.tguser2, 3), (self.tguser1, 1), (self.tguser2, 4)):
+            self.assertEqual(self.move(tguser, cell).status_code, 201)
+        data = self.move(self.tguser1, 2).json()
+        self.assertTrue(data['finished'])
+        self.assertEqual(data['winner'], PossibleSign.CROSS)
+        self.assertEqual(data['winning_cells'], [0, 1, 2])
+        self.assertIsNone(data['next_symbol'])
+        self.assertEqual(self.move(self.tguser2, 5).status_code, 400)
+
+    def test_outsider_gets_404(self):
+        self.assertEqual(self.move(self.outsider, 0).status_code, 404)
+
+    def test_game_without_states(self):
+        GameState.objects.filter(game=self.game).delete()
+        url = reverse('api_user_management:tguser-games-detail', kwargs={'tguser_pk': self.tguser1.id, 'pk': self.game.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['state']['cells'], ' ' * 9)
+        self.assertEqual(response.json()['ply'], 0)
+
+        response = self.move(self.tguser1, 4)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['state']['cells'], '    X    ')
+        initial = GameState.objects.get(game=self.game, parent_state__isnull=True)
+        self.assertEqual(response.json()['state']['parent_state'], initial.id)
@@ -0,0 +1,49 @@
+import datetime
+import json
+from decimal import Decimal
+from io import BytesIO
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from bot_backend.renderers import ORJSONParser, ORJSONRenderer
+from tictactoe.models import TicTacToeProposition, PossibleSign
+from user_management.models import TgUser
+
+
+class ORJSONRendererTestCase(TestCase):
+    def test_output_matches_drf_renderer(self):
+        data = {
+            'sign': PossibleSign.CROSS,
+            'created_at': datetime.datetime(2025, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'date': datetime.date(2025, 5, 1),
+            'amount': Decimal('1.50'),
+            'nested': [{'id': 1, 'text': 'Привіт'}],
+            1: 'non-string key',
+        }
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_parser(self):
+        self.assertEqual(ORJSONParser().parse(BytesIO('{"sign": "⭕"}'.encode())), {'sign': '⭕'})
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"sign":'))
+
+    def test_proposition_list_is_rendered(self):
+        content_type = TgUser.get_content_type()
+        tguser = TgUser.objects.create(id=7_000_000_001, tg_first_name='Json')
+        TicTacToeProposition.objects.create(
+            player1_content_type=content_type,
+            player1_object_id=tguser.id,
+            player1_sign=PossibleSign.NOUGHT,
+            expires_at=timezone.now() + datetime.timedelta(days=1),
+        )
+        response = APIClient().get(
+            reverse('api_user_management:tguser-tictactoe-propositions-list', kwargs={'tguser_pk': tguser.id}),
+            HTTP_ACCEPT='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['player1_sign'], PossibleSign.NOUGHT)
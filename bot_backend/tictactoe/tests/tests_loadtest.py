@@ -0,0 +1,61 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import LiveServerTestCase, TestCase, override_settings
+
+from tictactoe.management.commands.seed_data import SEED_ID_BASE, seed_user_ids
+from tictactoe.models import Game, GameState, TicTacToeProposition
+from user_management.models import TgUser
+
+
+class SeedDataTestCase(TestCase):
+    def seed(self, **options):
+        call_command('seed_data', users=20, propositions=30, games=10, stdout=StringIO(), **options)
+
+    def test_seeds_users_propositions_and_games(self):
+        self.seed()
+        self.assertEqual(seed_user_ids().count(), 20)
+        self.assertEqual(TicTacToeProposition.objects.count(), 30)
+        self.assertEqual(Game.objects.count(), 10)
+        for state in GameState.objects.filter(parent_state__isnull=False).select_related('parent_state'):
+            # Кожен наступний стан - рівно на один хід більше за попередній
+            self.assertEqual(state.cells.count(' '), state.parent_state.cells.count(' ') - 1)
+
+    def test_existing_seed_requires_clear(self):
+        TgUser.objects.create(id=1, tg_first_name='Real user')
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.seed(clear=True, seed=1)
+        self.assertEqual(seed_user_ids().count(), 20)
+        self.assertEqual(Game.objects.count(), 10)
+        self.assertTrue(TgUser.objects.filter(id=1).exists())
+        self.assertFalse(TgUser.objects.filter(id=SEED_ID_BASE + 20).exists())
+
+
+@override_settings(QUERY_STATS_HEADERS=True)
+class LoadTestCommandTestCase(LiveServerTestCase):
+    def test_reports_latency_and_query_counts_per_endpoint(self):
+        call_command('seed_data', users=10, propositions=20, games=0, stdout=StringIO())
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'report.json'
+            output = StringIO()
+            call_command('loadtest', url=self.live_server_url, requests=40, concurrency=4,
+                         mix='upsert=2,list=3,create=1,update=1', json_path=str(path), stdout=output)
+            report = json.loads(path.read_text())
+
+        self.assertIn('req/s', output.getvalue())
+        self.assertEqual(report['requests'], 40)
+        self.assertEqual(report['errors'], 0)
+        self.assertLessEqual(report['p50_ms'], report['p99_ms'])
+        listing = report['endpoints']['GET propositions']
+        self.assertGreater(listing['requests'], 0)
+        self.assertGreater(listing['queries_avg'], 0)
+        self.assertIn('POST propositions', report['endpoints'])
+        # Upsert існуючих (засіяних) користувачів оновлює їх, а не падає на перевірці унікальності id
+        upsert = report['endpoints']['POST tgusers']
+        self.assertGreater(upsert['requests'], 0)
+        self.assertEqual(upsert['errors'], 0)
@@ -0,0 +1,155 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from tictactoe.events import event_broker
+from tictactoe.matchmaking import Entry, MatchmakingQueue, matchmaking_queue, percentile
+from tictactoe.models import TicTacToeProposition, PossibleSign
+from user_management.models import TgUser
+
+
+class MatchmakingQueueTestCase(TestCase):
+    def setUp(self):
+        self.queue = MatchmakingQueue()
+        self.content_type = TgUser.get_content_type()
+        self.tgusers = [TgUser.objects.create(id=i, tg_first_name=f'User{i}', language_code='uk') for i in (1, 2, 3)]
+
+    def make_entry(self, tguser, sign=None, first=None, language='uk'):
+        proposition = TicTacToeProposition.objects.create(
+            player1_content_type=self.content_type,
+            player1_object_id=tguser.id,
+            player1_sign=sign,
+            player1_first=first,
+        )
+        return Entry(
+            proposition_id=proposition.id,
+            player_content_type_id=self.content_type.id,
+            player_object_id=tguser.id,
+            sign=sign,
+            first=first,
+            language=language,
+        )
+
+    def test_pair_complementary_preferences(self):
+        host = self.make_entry(self.tgusers[0], sign=PossibleSign.NOUGHT, first=True)
+        self.assertIsNone(self.queue.enter(host))
+        self.assertEqual(len(self.queue), 1)
+
+        matched = self.queue.enter(self.make_entry(self.tgusers[1]))
+        self.assertEqual(matched.id, host.proposition_id)
+        self.assertEqual(len(self.queue), 0)
+        matched.refresh_from_db()
+        self.assertEqual(matched.player2, self.tgusers[1])
+        self.assertEqual(matched.player1_sign, PossibleSign.NOUGHT)
+        self.assertEqual(matched.player2_sign, PossibleSign.CROSS)
+        self.assertTrue(matched.player1_first)
+        self.assertEqual(matched.status, 'pending')
+        self.assertEqual(self.queue.stats()['matched'], 1)
+
+    def test_claim_publishes_both_propositions(self):
+        host = self.make_entry(self.tgusers[0])
+        entrant = self.make_entry(self.tgusers[1])
+        self.queue.enter(host)
+        with mock.patch.object(event_broker, 'subscriber_count', return_value=1), \
+                mock.patch.object(event_broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.queue.enter(entrant)
+        events = {(c.args[0], c.args[2]['id'], c.args[2]['is_active']) for c in publish.call_args_list}
+        self.assertEqual(events, {
+            (1, host.proposition_id, True),
+            (2, host.proposition_id, True),
+            (2, entrant.proposition_id, False),
+        })
+
+    def test_incompatible_preferences_wait(self):
+        self.queue.enter(self.make_entry(self.tgusers[0], sign=PossibleSign.CROSS))
+        self.assertIsNone(self.queue.enter(self.make_entry(self.tgusers[1], sign=PossibleSign.CROSS)))
+        self.assertIsNone(self.queue.enter(self.make_entry(self.tgusers[2], language='en')))
+        self.assertEqual(self.queue.stats()['depth'], 3)
+
+    def test_fifo_and_own_propositions_skipped(self):
+        first = self.make_entry(self.tgusers[0])
+        second = self.make_entry(self.tgusers[1])
+        self.queue.enter(first)
+        self.queue.enter(second)
+        # Другий учасник вже міг би спаруватися з першим, тому лишається тільки один
+        self.assertEqual(len(self.queue), 0)
+        own = self.make_entry(self.tgusers[2])
+        self.assertIsNone(self.queue.enter(own))
+        self.assertIsNone(self.queue.enter(self.make_entry(self.tgusers[2])))
+        self.assertEqual(len(self.queue), 2)
+
+    def test_stale_host_is_dropped(self):
+        host = self.make_entry(self.tgusers[0])
+        self.queue.enter(host)
+        TicTacToeProposition.objects.filter(pk=host.proposition_id).update(is_active=False)
+        self.assertIsNone(self.queue.enter(self.make_entry(self.tgusers[1])))
+        self.assertEqual(len(self.queue), 1)
+
+    def test_locked_host_stays_in_queue(self):
+        host = self.make_entry(self.tgusers[0])
+        self.queue.enter(host)
+        # SKIP LOCKED пропускає рядок, який саме тримає інша транзакція
+        with mock.patch.object(TicTacToeProposition.objects, 'select_for_update',
+                               return_value=TicTacToeProposition.objects.none()):
+            self.assertIsNone(self.queue.enter(self.make_entry(self.tgusers[1])))
+        self.assertIn(host.proposition_id, self.queue)
+        self.assertEqual(len(self.queue), 2)
+        matched = self.queue.enter(self.make_entry(self.tgusers[2]))
+        self.assertEqual(matched.id, host.proposition_id)
+
+    def test_percentile(self):
+        self.assertIsNone(percentile([], 0.5))
+        self.assertEqual(percentile([1, 2, 3, 4], 0.5), 2)
+        self.assertEqual(percentile([1, 2, 3, 4], 0.99), 4)
+
+
+class MatchmakingApiTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.content_type = TgUser.get_content_type()
+        self.tguser1 = TgUser.objects.create(id=10, tg_first_name='Host')
+        self.tguser2 = TgUser.objects.create(id=20, tg_first_name='Guest')
+        self.proposition1 = TicTacToeProposition.objects.create(
+            player1_content_type=self.content_type, player1_object_id=self.tguser1.id)
+        self.proposition2 = TicTacToeProposition.objects.create(
+            player1_content_type=self.content_type, player1_object_id=self.tguser2.id)
+
+    def tearDown(self):
+        matchmaking_queue.discard(self.proposition1.id)
+        matchmaking_queue.discard(self.proposition2.id)
+
+    def url(self, tguser, proposition):
+        return reverse(
+            'api_user_management:tguser-tictactoe-propositions-matchmaking',
+            kwargs={'tguser_pk': tguser.id, 'pk': proposition.id},
+        )
+
+    def test_matchmaking_pairs_two_users(self):
+        response = self.client.post(self.url(self.tguser1, self.proposition1))
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.json()['queued'])
+
+        response = self.client.post(self.url(self.tguser2, self.proposition2))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], self.proposition1.id)
+        self.assertEqual(response.json()['player2']['id'], self.tguser2.id)
+        self.proposition2.refresh_from_db()
+        self.assertFalse(self.proposition2.is_active)
+
+        stats_url = reverse(
+            'api_user_management:tguser-tictactoe-propositions-matchmaking-stats',
+            kwargs={'tguser_pk': self.tguser1.id},
+        )
+        stats = self.client.get(stats_url).json()
+        self.assertEqual(stats['depth'], 0)
+        self.assertIsNotNone(stats['wait_seconds']['p50'])
+
+    def test_matchmaking_cancel(self):
+        self.client.post(self.url(self.tguser1, self.proposition1))
+        self.assertIn(self.proposition1.id, matchmaking_queue)
+        response = self.client.delete(self.url(self.tguser1, self.proposition1))
+        self.assertEqual(response.status_code, 204)
+        self.assertNotIn(self.proposition1.id, matchmaking_queue)
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from bot_backend.metrics import Counter, Histogram, db_pool_metrics
+from tictactoe.models import TicTacToeProposition
+from user_management.models import TgUser
+
+
+class MetricTypesTestCase(TestCase):
+    def test_histogram_exposition(self):
+        histogram = Histogram('test_seconds', 'Test.', ['view'], buckets=(0.1, 1))
+        histogram.observe(0.05, view='a')
+        histogram.observe(0.5, view='a')
+        histogram.observe(5, view='a')
+        lines = histogram.collect()
+        self.assertIn('# TYPE test_seconds histogram', lines)
+        self.assertIn('test_seconds_bucket{view="a",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{view="a",le="1.0"} 2', lines)
+        self.assertIn('test_seconds_bucket{view="a",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_count{view="a"} 3', lines)
+
+    def test_label_values_are_escaped(self):
+        counter = Counter('test_total', 'Test.', ['path'])
+        counter.inc(path='a"b\\c')
+        self.assertIn('test_total{path="a\\"b\\\\c"} 1.0', counter.collect())
+
+
+    def test_each_pool_statistic_has_its_own_type(self):
+        pool = SimpleNamespace(get_stats=lambda: {'pool_size': 4, 'pool_available': 3, 'requests_num': 17})
+        databases = {'default': {'CONN_MAX_AGE': 0, 'OPTIONS': {'pool': True}}, 'replica': {'CONN_MAX_AGE': 60}}
+        with mock.patch('bot_backend.metrics.settings', SimpleNamespace(DATABASES=databases)), \
+                mock.patch('bot_backend.metrics.connections', {'default': SimpleNamespace(pool=pool)}):
+            lines = db_pool_metrics()
+        self.assertIn('django_db_conn_max_age_seconds{alias="replica"} 60', lines)
+        for stat, kind in (('pool_size', 'gauge'), ('pool_available', 'gauge'), ('requests_num', 'counter')):
+            type_line = lines.index(f'# TYPE django_db_pool_{stat} {kind}')
+            self.assertTrue(lines[type_line - 1].startswith(f'# HELP django_db_pool_{stat} '))
+        self.assertIn('django_db_pool_requests_num{alias="default"} 17', lines)
+        self.assertFalse(any(line.startswith('# HELP django_db_pool ') for line in lines))
+
+
+class MetricsEndpointTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tguser = TgUser.objects.create(id=8_100_000_001, tg_first_name='Metrics')
+        TicTacToeProposition.objects.create(
+            player1_content_type=TgUser.get_content_type(),
+            player1_object_id=self.tguser.id,
+        )
+
+    def test_request_latency_and_etag_hits_are_exported(self):
+        url = reverse('api_user_management:tguser-tictactoe-propositions-list', kwargs={'tguser_pk': self.tguser.id})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        view = 'api_user_management:tguser-tictactoe-propositions-list'
+        self.assertIn(
+            f'django_http_request_duration_seconds_count{{method="GET",view="{view}",action="list",status="304"}}',
+            body,
+        )
+        self.assertIn(f'django_http_conditional_requests_total{{view="{view}",result="hit"}}', body)
+        self.assertIn(f'django_http_request_db_queries_count{{view="{view}"}}', body)
+        self.assertIn('django_db_conn_max_age_seconds{alias="default"} 0', body)
+
+    def test_only_allowed_addresses_get_metrics(self):
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.1.2.3').status_code, 403)
+        with override_settings(METRICS_ALLOWED_IPS=['10.1.0.0/16']):
+            self.assertEqual(self.client.get(url, REMOTE_ADDR='10.1.2.3').status_code, 200)
+            self.assertEqual(self.client.get(url).status_code, 403)
+        with override_settings(METRICS_ALLOWED_IPS=[]):
+            self.assertEqual(self.client.get(url).status_code, 404)
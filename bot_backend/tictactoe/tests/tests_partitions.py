@@ -0,0 +1,138 @@
+from datetime import date, datetime, timezone
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+
+from tictactoe.models import Game, GameState, PossibleSign, TicTacToeProposition
+from tictactoe.partitions import create_partition, default_partition_name, partition_name, partitions
+from user_management.models import TgUser
+
+TABLE = TicTacToeProposition._meta.db_table
+
+
+class PartitionsTestCase(TestCase):
+    def setUp(self):
+        self.tguser1 = TgUser.objects.create(id=7_100_000_001, tg_first_name='Inviter')
+        self.tguser2 = TgUser.objects.create(id=7_100_000_002, tg_first_name='Invitee')
+
+    def propose(self, created_at=None, **fields):
+        proposition = TicTacToeProposition.objects.create(
+            player1_content_type=TgUser.get_content_type(), player1_object_id=self.tguser1.id, **fields,
+        )
+        if created_at is not None:
+            TicTacToeProposition.objects.filter(pk=proposition.pk).update(created_at=created_at)
+        return proposition
+
+    def rows_in(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {connection.ops.quote_name(table)}")
+            return cursor.fetchone()[0]
+
+    def test_rows_outside_partitions_move_from_default(self):
+        proposition = self.propose(datetime(2020, 1, 15, tzinfo=timezone.utc))
+        self.assertEqual(self.rows_in(default_partition_name(TABLE)), 1)
+
+        name = create_partition(TABLE, date(2020, 1, 1))
+        self.assertEqual(name, partition_name(TABLE, date(2020, 1, 1)))
+        self.assertEqual(self.rows_in(name), 1)
+        self.assertEqual(self.rows_in(default_partition_name(TABLE)), 0)
+        self.assertEqual(TicTacToeProposition.objects.get(pk=proposition.pk).created_at.year, 2020)
+
+    @override_settings(PARTITION_RETENTION_MONTHS={'tictactoe.TicTacToeProposition': 12})
+    def test_expired_partitions_are_dropped(self):
+        old = self.propose(datetime(2020, 1, 15, tzinfo=timezone.utc))
+        create_partition(TABLE, date(2020, 1, 1))
+        recent = self.propose()
+        # Відкладені перевірки FK у транзакції тесту не дали б видалити розділ зі щойно вставленими рядками
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+        output = StringIO()
+        call_command('manage_partitions', ahead=2, stdout=output)
+        self.assertIn(f"Dropped {partition_name(TABLE, date(2020, 1, 1))}", output.getvalue())
+        self.assertNotIn(date(2020, 1, 1), partitions(TABLE))
+        self.assertGreaterEqual(len(partitions(TABLE)), 3)
+        self.assertFalse(TicTacToeProposition.objects.filter(pk=old.pk).exists())
+        self.assertTrue(TicTacToeProposition.objects.filter(pk=recent.pk).exists())
+
+    @override_settings(PARTITION_RETENTION_MONTHS={'tictactoe.TicTacToeProposition': 12})
+    def test_detach_only_keeps_table(self):
+        self.propose(datetime(2020, 1, 15, tzinfo=timezone.utc))
+        name = create_partition(TABLE, date(2020, 1, 1))
+
+        call_command('manage_partitions', dry_run=True, stdout=StringIO())
+        self.assertIn(date(2020, 1, 1), partitions(TABLE))
+        call_command('manage_partitions', detach_only=True, stdout=StringIO())
+        self.assertNotIn(date(2020, 1, 1), partitions(TABLE))
+        self.assertFalse(TicTacToeProposition.objects.exists())
+        self.assertEqual(self.rows_in(name), 1)
+
+    @override_settings(PARTITION_RETENTION_MONTHS={'tictactoe.TicTacToeProposition': 12})
+    def test_create_only_never_removes_partitions(self):
+        self.propose(datetime(2020, 1, 15, tzinfo=timezone.utc))
+        create_partition(TABLE, date(2020, 1, 1))
+
+        output = StringIO()
+        call_command('manage_partitions', create_only=True, stdout=output)
+        self.assertIn('0 dropped', output.getvalue())
+        self.assertIn(date(2020, 1, 1), partitions(TABLE))
+        self.assertEqual(TicTacToeProposition.objects.count(), 1)
+
+    def test_nothing_is_dropped_by_default(self):
+        self.propose(datetime(2020, 1, 15, tzinfo=timezone.utc))
+        create_partition(TABLE, date(2020, 1, 1))
+        call_command('manage_partitions', stdout=StringIO())
+        self.assertIn(date(2020, 1, 1), partitions(TABLE))
+
+    @override_settings(PARTITION_RETENTION_MONTHS={'tictactoe.GameState': 12})
+    def test_game_state_partitions_are_dropped_only_when_archived(self):
+        table = GameState._meta.db_table
+        game = Game.objects.create(
+            player1=self.tguser1, player2=self.tguser2, player1_first=True,
+            player1_symbol=PossibleSign.CROSS, player2_symbol=PossibleSign.NOUGHT,
+        )
+        # Незавершена гра через межу місяця: parent_state другого стану - в розділі січня
+        first = GameState.objects.create(game=game)
+        second = GameState.objects.create(game=game, cells="X        ", parent_state=first)
+        GameState.objects.filter(pk=first.pk).update(created_at=datetime(2020, 1, 31, 23, 59, tzinfo=timezone.utc))
+        GameState.objects.filter(pk=second.pk).update(created_at=datetime(2020, 2, 1, tzinfo=timezone.utc))
+        january, february = create_partition(table, date(2020, 1, 1)), create_partition(table, date(2020, 2, 1))
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+        output = StringIO()
+        call_command('manage_partitions', stdout=output)
+        self.assertIn(f"Kept {january}", output.getvalue())
+        self.assertIn(f"Kept {february}", output.getvalue())
+        self.assertEqual(GameState.objects.get(pk=second.pk).parent_state, first)
+
+        # Так стани прибирає archive_games, коли гра завершиться
+        GameState.objects.filter(game=game).delete()
+        output = StringIO()
+        call_command('manage_partitions', stdout=output)
+        self.assertIn(f"Dropped {january}", output.getvalue())
+        self.assertIn(f"Dropped {february}", output.getvalue())
+        self.assertFalse({date(2020, 1, 1), date(2020, 2, 1)} & set(partitions(table)))
+
+    def test_pending_pair_is_still_unique(self):
+        fields = dict(player2_content_type=TgUser.get_content_type(), player2_object_id=self.tguser2.id,
+                      player1_first=True, player1_sign=PossibleSign.CROSS, player2_sign=PossibleSign.NOUGHT)
+        self.propose(**fields)
+        with self.assertRaises(ValidationError):
+            self.propose(**fields)
+
+    def test_bulk_status_change_cannot_duplicate_pending_pair(self):
+        fields = dict(player2_content_type=TgUser.get_content_type(), player2_object_id=self.tguser2.id,
+                      player1_first=True, player1_sign=PossibleSign.CROSS, player2_sign=PossibleSign.NOUGHT)
+        pending = self.propose(**fields)
+        rejected = self.propose(status='rejected', **fields)
+        # set_status оминає save(), тож дублікат відхиляє тригер БД
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TicTacToeProposition.objects.filter(pk=rejected.pk).set_status('pending')
+        self.assertEqual(TicTacToeProposition.objects.filter(status='pending').get(), pending)
+
+        TicTacToeProposition.objects.filter(pk=pending.pk).set_status('rejected')
+        self.assertEqual(TicTacToeProposition.objects.filter(pk=rejected.pk).set_status('pending'), 1)
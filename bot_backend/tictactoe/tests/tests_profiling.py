@@ -0,0 +1,63 @@
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from bot_backend.profiling import ProfilingMiddleware, StackSampler
+
+
+def slow_view(request):
+    time.sleep(0.1)
+    return HttpResponse('slow')
+
+
+def fast_view(request):
+    return HttpResponse('fast')
+
+
+class StackSamplerTestCase(SimpleTestCase):
+    def test_samples_only_after_threshold(self):
+        sampler = StackSampler(interval=0.005)
+        profile = sampler.start(threshold=0.05)
+        time.sleep(0.02)
+        self.assertEqual(profile.samples, 0)
+        time.sleep(0.1)
+        sampler.stop(profile)
+        self.assertGreater(profile.samples, 0)
+        stack = profile.stacks.most_common(1)[0][0]
+        self.assertTrue(stack.endswith('StackSamplerTestCase.test_samples_only_after_threshold'), stack)
+
+
+class ProfilingMiddlewareTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.factory = RequestFactory()
+
+    def profiles(self):
+        return list(Path(self.directory.name).glob('*.collapsed'))
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_middleware_is_not_used(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(fast_view)
+
+    def test_slow_request_is_profiled(self):
+        with override_settings(PROFILING_ENABLED=True, PROFILE_THRESHOLD_MS=30, PROFILE_SAMPLE_RATE=0,
+                               PROFILE_INTERVAL_MS=5, PROFILE_DIR=self.directory.name):
+            middleware = ProfilingMiddleware(slow_view)
+            with self.assertLogs('bot_backend.profiling', 'INFO'):
+                middleware(self.factory.get('/slow/'))
+            middleware = ProfilingMiddleware(fast_view)
+            middleware(self.factory.get('/fast/'))
+
+        profiles = self.profiles()
+        self.assertEqual(len(profiles), 1)
+        self.assertIn('slow', profiles[0].name)
+        line = profiles[0].read_text().splitlines()[0]
+        stack, count = line.rsplit(' ', 1)
+        self.assertIn('slow_view', stack)
+        self.assertGreater(int(count), 0)
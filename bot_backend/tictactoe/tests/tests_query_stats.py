@@ -0,0 +1,51 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from bot_backend.middleware import fingerprint
+from tictactoe.models import TicTacToeProposition
+from user_management.models import TgUser
+
+
+class FingerprintTestCase(TestCase):
+    def test_literals_are_normalised(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 42 AND name = 'x''y'  AND k IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE id = ? AND name = ? AND k IN (...)",
+        )
+
+
+@override_settings(QUERY_STATS_HEADERS=True)
+class QueryStatsMiddlewareTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.content_type = TgUser.get_content_type()
+        self.tguser = TgUser.objects.create(id=8_000_000_001, tg_first_name='Stats')
+        for index in range(3):
+            opponent = TgUser.objects.create(id=8_000_000_100 + index, tg_first_name=f'Opponent {index}')
+            TicTacToeProposition.objects.create(
+                player1_content_type=self.content_type,
+                player1_object_id=self.tguser.id,
+                player2_content_type=self.content_type,
+                player2_object_id=opponent.id,
+            )
+        self.url = reverse('api_user_management:tguser-tictactoe-propositions-list', kwargs={'tguser_pk': self.tguser.id})
+
+    def test_headers_report_queries(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response['X-DB-Query-Count']), 0)
+        self.assertGreaterEqual(float(response['X-DB-Time-Ms']), float(response['X-DB-Slowest-Ms']))
+        # Гравці з GenericForeignKey завантажуються по одному - це видно як повтори
+        self.assertGreater(int(response['X-DB-Duplicate-Queries']), 0)
+
+    @override_settings(QUERY_COUNT_THRESHOLD=1)
+    def test_threshold_logs_repeated_sql(self):
+        with self.assertLogs('bot_backend.db', level='WARNING') as logs:
+            self.client.get(self.url)
+        self.assertTrue(any('Too many queries' in line and 'user_management_tguser' in line for line in logs.output))
+
+    @override_settings(QUERY_STATS_HEADERS=False, DEBUG=False)
+    def test_no_headers_in_production(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('X-DB-Query-Count', response)
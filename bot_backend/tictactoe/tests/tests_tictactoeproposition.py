@@ -134,3 +134,59 @@ class TicTacToePropositionTestCase(TestCase):
             status="accepted",
         )
         self.assertEqual(proposition.status, "incomplete")
+
+
+class TicTacToePropositionSavePathTestCase(TestCase):
+    def setUp(self):
+        self.tg_user1 = TgUser.objects.create(id=111, tg_username="tguser1")
+        self.tg_user2 = TgUser.objects.create(id=222, tg_username="tguser2")
+        self.proposition = TicTacToeProposition.objects.create(
+            player1_content_type=self.tg_user1.get_content_type(),
+            player1_object_id=self.tg_user1.id,
+            player2_content_type=self.tg_user2.get_content_type(),
+            player2_object_id=self.tg_user2.id,
+            player1_first=True,
+            player1_sign=PossibleSign.CROSS,
+            player2_sign=PossibleSign.NOUGHT,
+        )
+        self.proposition = TicTacToeProposition.objects.get(pk=self.proposition.pk)
+
+    def test_update_fields_save_is_single_update(self):
+        """Зміна поля, що не впливає на гравців і унікальність, не робить запитів окрім UPDATE."""
+        self.proposition.player1_first = False
+        with self.assertNumQueries(1):
+            self.proposition.save(update_fields=['player1_first'])
+        self.proposition.refresh_from_db()
+        self.assertFalse(self.proposition.player1_first)
+
+    def test_update_fields_still_validated(self):
+        self.proposition.player2_sign = PossibleSign.CROSS
+        with self.assertRaises(ValidationError):
+            self.proposition.save(update_fields=['player2_sign'])
+
+    def test_auto_status_added_to_update_fields(self):
+        self.proposition.player1_sign = None
+        self.proposition.save(update_fields=['player1_sign'])
+        self.proposition.refresh_from_db()
+        self.assertEqual(self.proposition.status, 'incomplete')
+
+    def test_missing_player2_rejected(self):
+        self.proposition.player2_object_id = 999
+        with self.assertRaises(ValidationError):
+            self.proposition.save()
+
+    def test_deactivate_is_single_update(self):
+        updated_at = self.proposition.updated_at
+        with self.assertNumQueries(1):
+            self.assertEqual(TicTacToeProposition.objects.filter(pk=self.proposition.pk).deactivate(), 1)
+        self.proposition.refresh_from_db()
+        self.assertFalse(self.proposition.is_active)
+        self.assertGreater(self.proposition.updated_at, updated_at)
+
+    def test_set_status(self):
+        queryset = TicTacToeProposition.objects.filter(pk=self.proposition.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(queryset.set_status('rejected'), 1)
+        self.assertEqual(queryset.get().status, 'rejected')
+        with self.assertRaises(ValueError):
+            queryset.set_status('accepted')
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from bot_backend import tracing
+from tictactoe.models import TicTacToeProposition
+from user_management.models import TgUser
+
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+PARENT_ID = '00f067aa0ba902b7'
+
+
+class TraceparentTestCase(SimpleTestCase):
+    def test_parse(self):
+        self.assertEqual(tracing.parse_traceparent(f'00-{TRACE_ID}-{PARENT_ID}-01'), (TRACE_ID, PARENT_ID, True))
+        self.assertEqual(tracing.parse_traceparent(f'00-{TRACE_ID}-{PARENT_ID}-00'), (TRACE_ID, PARENT_ID, False))
+        self.assertIsNone(tracing.parse_traceparent(None))
+        self.assertIsNone(tracing.parse_traceparent(f'00-{"0" * 32}-{PARENT_ID}-01'))
+        self.assertIsNone(tracing.parse_traceparent('garbage'))
+
+
+@override_settings(TRACING_ENABLED=True, TRACING_SAMPLE_RATE=0)
+class TracingMiddlewareTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'spans.jsonl'
+        self.exporter = tracing.SpanExporter('test', path=str(self.path), flush_interval=0.01)
+        patcher = mock.patch.object(tracing, '_exporter', self.exporter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = APIClient()
+        self.tguser = TgUser.objects.create(id=8_200_000_001, tg_first_name='Tracing')
+        TicTacToeProposition.objects.create(
+            player1_content_type=TgUser.get_content_type(),
+            player1_object_id=self.tguser.id,
+        )
+        self.url = reverse('api_user_management:tguser-tictactoe-propositions-list', kwargs={'tguser_pk': self.tguser.id})
+
+    def spans(self) -> list[dict]:
+        self.assertTrue(self.exporter.flush(timeout=5))
+        if not self.path.exists():
+            return []
+        return [
+            span
+            for line in self.path.read_text().splitlines()
+            for resource in json.loads(line)['resourceSpans']
+            for scope in resource['scopeSpans']
+            for span in scope['spans']
+        ]
+
+    def test_incoming_trace_is_continued_down_to_sql(self):
+        response = self.client.get(self.url, HTTP_TRACEPARENT=f'00-{TRACE_ID}-{PARENT_ID}-01')
+        self.assertEqual(response.status_code, 200)
+
+        spans = self.spans()
+        self.assertEqual({span['traceId'] for span in spans}, {TRACE_ID})
+        by_id = {span['spanId']: span for span in spans}
+        request_span = next(span for span in spans if span['kind'] == tracing.SPAN_KIND_SERVER)
+        self.assertEqual(request_span['parentSpanId'], PARENT_ID)
+        self.assertIn('tictactoe-propositions', request_span['name'])
+
+        view_span = next(span for span in spans if span['name'].startswith('view '))
+        self.assertTrue(view_span['name'].endswith('.list'))
+        self.assertEqual(view_span['parentSpanId'], request_span['spanId'])
+        self.assertIn('serializer TicTacToePropositionGetSerializer[].data', {span['name'] for span in spans})
+
+        sql_spans = [span for span in spans if span['name'].startswith('SQL ')]
+        self.assertTrue(sql_spans)
+        for span in sql_spans:
+            # Кожен SQL-запит вкладений у span в'юхи (напряму або через серіалізатор)
+            parent = by_id[span['parentSpanId']]
+            while parent['spanId'] != view_span['spanId']:
+                parent = by_id[parent['parentSpanId']]
+            statement = next(attr['value']['stringValue'] for attr in span['attributes'] if attr['key'] == 'db.statement')
+            self.assertNotIn(str(self.tguser.id), statement)
+
+    @override_settings(TRACING_SAMPLE_RATE=1)
+    async def test_traced_request_under_asgi(self):
+        # Під ASGI process_view і __call__ синхронного middleware виконуються в різних контекстах contextvars
+        response = await AsyncClient().get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+        spans = await asyncio.to_thread(self.spans)
+        request_span = next(span for span in spans if span['kind'] == tracing.SPAN_KIND_SERVER)
+        view_span = next(span for span in spans if span['name'].startswith('view '))
+        self.assertTrue(view_span['name'].endswith('.list'))
+        self.assertEqual(view_span['parentSpanId'], request_span['spanId'])
+        self.assertEqual({span['traceId'] for span in spans}, {request_span['traceId']})
+        by_id = {span['spanId']: span for span in spans}
+        sql_spans = [span for span in spans if span['name'].startswith('SQL ')]
+        self.assertTrue(sql_spans)
+        for span in sql_spans:
+            parent = by_id[span['parentSpanId']]
+            while parent['spanId'] != view_span['spanId']:
+                parent = by_id[parent['parentSpanId']]
+
+    def test_unsampled_and_missing_context_are_not_traced(self):
+        self.client.get(self.url, HTTP_TRACEPARENT=f'00-{TRACE_ID}-{PARENT_ID}-00')
+        self.client.get(self.url)
+        self.assertEqual(self.spans(), [])
@@ -1,15 +1,81 @@
+import asyncio
+import hashlib
+
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Case, OuterRef, Q, Subquery, TextField, Value, When
+from django.db.models.functions import Cast, Concat
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
 from drf_spectacular.utils import extend_schema
-from rest_framework import viewsets, status
-from rest_framework.exceptions import NotFound
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 
-from user_management.models import TgUser
-from .models import TicTacToeProposition
+from bot_backend.metrics import CONDITIONAL_REQUESTS
+from user_management.models import TgUser, User
+from .archive import game_moves, state_chains
+from .events import event_broker
+from .matchmaking import Entry, matchmaking_queue
+from .models import ArchivedGame, Game, GameState, TicTacToeProposition
 from .serializers import TicTacToePropositionGetSerializer, TicTacToePropositionFilterSerializer, \
-    TicTacToePropositionPostSerializer
+    TicTacToePropositionPostSerializer, TicTacToePropositionAcceptSerializer, GameSerializer, GameStateSerializer, \
+    GameProgressSerializer, GameMoveSerializer, GameHistorySerializer
+from .signals import publish_propositions
+
+
+def make_etag(rows) -> str:
+    """
+    Будує сильний ETag з версій рядків, що формують відповідь: (id, updated_at, *версії вкладених об'єктів).
+    Версії вкладених гравців - див. proposition_versions().
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for pk, updated_at, *versions in rows:
+        digest.update(f"{pk}:{updated_at.isoformat()}:{':'.join(map(str, versions))};".encode())
+    return quote_etag(digest.hexdigest())
+
+
+def player_version(field: str):
+    """
+    Версія гравця `field` (player1/player2) для ETag: TgUser.updated_at, а для User, в якого немає updated_at, -
+    самі поля з UserSerializer. Рахується підзапитом в тому ж SELECT, що й версії пропозицій.
+    """
+    object_id = OuterRef(f'{field}_object_id')
+    tguser = TgUser.objects.filter(pk=object_id).values('updated_at')[:1]
+    user = User.objects.filter(pk=object_id).annotate(
+        version=Concat('email', Value('|'), 'username', Value('|'), 'first_name', Value('|'), 'last_name'),
+    ).values('version')[:1]
+    return Case(
+        When(**{f'{field}_content_type': TgUser.get_content_type()}, then=Cast(Subquery(tguser), TextField())),
+        When(**{f'{field}_content_type': User.get_content_type()}, then=Subquery(user)),
+        default=Value(''),
+        output_field=TextField(),
+    )
+
+
+def proposition_versions(queryset):
+    """(id, updated_at, версія player1, версія player2) пропозицій для make_etag."""
+    return queryset.values_list('id', 'updated_at', player_version('player1'), player_version('player2'))
+
+
+def etag_matches(request, etag: str) -> bool:
+    """Перевіряє, чи збігається ETag з заголовком If-None-Match запиту."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    matches = '*' in etags or etag in etags
+    CONDITIONAL_REQUESTS.inc(view=request.resolver_match.view_name, result='hit' if matches else 'miss')
+    return matches
+
+
+def not_modified(etag: str) -> Response:
+    """Відповідь 304 без тіла - клієнт використовує збережену копію."""
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
 
 
 class TicTacToePropositionViewSet(viewsets.ModelViewSet):
@@ -21,18 +87,44 @@ class TicTacToePropositionViewSet(viewsets.ModelViewSet):
 
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        """
+        Список пропозицій з підтримкою умовного GET.
+        ETag рахується одним запитом по версіях відфільтрованих рядків і їхніх гравців ще до серіалізації.
+        """
+        etag = make_etag(proposition_versions(self.get_queryset()))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response = super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
 
-    def get_queryset(self):
+    def retrieve(self, request, *args, **kwargs):
+        """Повертає пропозицію; якщо версія не змінилась (If-None-Match) - 304 без серіалізації."""
+        row = proposition_versions(self.get_user_propositions().filter(pk=self.kwargs.get('pk'))).first()
+        if row is None:
+            raise NotFound("Proposition not found or not active for this user.")
+        etag = make_etag([row])
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, headers={'ETag': etag})
+
+    def get_user_propositions(self):
+        """Базовий запит для активних пропозицій, де TgUser є player1 або player2."""
         tguser_id = self.kwargs.get('tguser_pk')
         content_type = ContentType.objects.get_for_model(TgUser)
-
-        # Базовий запит для активних пропозицій, де TgUser є player1 або player2
-        queryset = TicTacToeProposition.objects.filter(
+        return TicTacToeProposition.objects.filter(
             Q(player1_content_type=content_type, player1_object_id=tguser_id) |
             Q(player2_content_type=content_type, player2_object_id=tguser_id),
             is_active=True
         )
+
+    def get_queryset(self):
+        tguser_id = self.kwargs.get('tguser_pk')
+        content_type = ContentType.objects.get_for_model(TgUser)
+
+        queryset = self.get_user_propositions()
         filter_serializer = TicTacToePropositionFilterSerializer(data=self.request.query_params)
         is_valid_result = filter_serializer.is_valid(raise_exception=True)
         filters = filter_serializer.validated_data
@@ -53,21 +145,15 @@ class TicTacToePropositionViewSet(viewsets.ModelViewSet):
             else:
                 queryset = queryset.filter(expires_at__gte=timezone.now())
 
-        queryset = queryset.select_related('player1_content_type', 'player2_content_type')
+        # Стабільний порядок потрібен і для пагінації, і для сильного ETag списку
+        queryset = queryset.select_related('player1_content_type', 'player2_content_type').order_by('-created_at', '-id')
         return queryset
 
     def get_object(self):
-        tguser_id = self.kwargs.get('tguser_pk')
         proposition_id = self.kwargs.get('pk')
-        content_type = ContentType.objects.get_for_model(TgUser)
 
         try:
-            proposition = TicTacToeProposition.objects.get(
-                Q(player1_content_type=content_type, player1_object_id=tguser_id) |
-                Q(player2_content_type=content_type, player2_object_id=tguser_id),
-                pk=proposition_id,
-                is_active=True
-            )
+            proposition = self.get_user_propositions().get(pk=proposition_id)
         except TicTacToeProposition.DoesNotExist:
             raise NotFound("Proposition not found or not active for this user.")
         return proposition
@@ -106,10 +192,11 @@ class TicTacToePropositionViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     def destroy(self, request, tguser_pk=None, pk=None):
-        """Деактивує пропозицію (is_active = False)."""
-        proposition = self.get_object()
-        proposition.is_active = False
-        proposition.save()
+        """Деактивує пропозицію (is_active = False) одним UPDATE."""
+        if not self.get_user_propositions().filter(pk=pk).deactivate():
+            raise NotFound("Proposition not found or not active for this user.")
+        matchmaking_queue.discard(int(pk))
+        transaction.on_commit(lambda: publish_propositions([pk]))
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def update(self, request, tguser_pk=None, pk=None, partial=False):
@@ -119,3 +206,209 @@ class TicTacToePropositionViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
         return Response(serializer.data)
+
+    @extend_schema(
+        request=TicTacToePropositionAcceptSerializer,
+        description=(
+            "Accept the proposition by the TgUser (player2 or anyone for an open proposition) "
+            "and start the game: returns the accepted proposition, the new game and its initial state."
+        ),
+    )
+    @action(detail=True, methods=['post'])
+    def accept(self, request, tguser_pk=None, pk=None):
+        """Приймає пропозицію та створює Game і початковий GameState в одній транзакції."""
+        try:
+            player = TgUser.objects.get(id=tguser_pk)
+        except TgUser.DoesNotExist:
+            raise NotFound("TgUser not found.")
+        content_type = ContentType.objects.get_for_model(TgUser)
+
+        with transaction.atomic():
+            try:
+                proposition = TicTacToeProposition.objects.select_for_update().get(
+                    Q(player2_content_type=content_type, player2_object_id=tguser_pk) |
+                    Q(player2_object_id__isnull=True),
+                    pk=pk,
+                    is_active=True,
+                )
+            except TicTacToeProposition.DoesNotExist:
+                raise NotFound("Proposition not found or not active for this user.")
+            serializer = TicTacToePropositionAcceptSerializer(proposition, data=request.data, context={'player': player})
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+        matchmaking_queue.discard(proposition.id)
+        context = {'request': request}
+        return Response(
+            {
+                'proposition': TicTacToePropositionGetSerializer(proposition, context=context).data,
+                'game': GameSerializer(serializer.game, context=context).data,
+                'state': GameStateSerializer(serializer.state, context=context).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        request=None,
+        description=(
+            "POST - put an open proposition (without player2) of the TgUser into the matchmaking queue. "
+            "Returns the filled proposition of the partner if a pair is found at once, otherwise 202. "
+            "DELETE - remove the proposition from the queue."
+        ),
+    )
+    @action(detail=True, methods=['post', 'delete'], url_path='matchmaking')
+    def matchmaking(self, request, tguser_pk=None, pk=None):
+        """Підбір суперника для відкритої пропозиції TgUser."""
+        proposition = self.get_object()
+        if request.method == 'DELETE':
+            matchmaking_queue.discard(proposition.id)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        content_type = ContentType.objects.get_for_model(TgUser)
+        if (
+                proposition.player1_content_type_id != content_type.id
+                or proposition.player1_object_id != int(tguser_pk)
+                or proposition.player2_object_id is not None
+        ):
+            raise ValidationError("Only open propositions created by this user can be matched.")
+        if proposition.is_expired:
+            raise ValidationError("Proposition is expired.")
+
+        language = TgUser.objects.filter(id=tguser_pk).values_list('language_code', flat=True).first()
+        matched = matchmaking_queue.enter(Entry(
+            proposition_id=proposition.id,
+            player_content_type_id=content_type.id,
+            player_object_id=proposition.player1_object_id,
+            sign=proposition.player1_sign,
+            first=proposition.player1_first,
+            language=language,
+        ))
+        if matched is None:
+            return Response({'queued': True, 'depth': len(matchmaking_queue)}, status=status.HTTP_202_ACCEPTED)
+        return Response(self.get_serializer(matched).data)
+
+    @extend_schema(request=None, description="Matchmaking queue depth and wait-time percentiles (seconds).")
+    @action(detail=False, methods=['get'], url_path='matchmaking-stats')
+    def matchmaking_stats(self, request, tguser_pk=None):
+        return Response(matchmaking_queue.stats())
+
+
+class GameViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Ігри TgUser: поточний стан дошки, ходи та історія.
+    Завершені ігри з часом переносяться в ArchivedGame (manage.py archive_games); читання - з обох сховищ.
+    """
+    serializer_class = GameProgressSerializer
+
+    def player_filter(self):
+        content_type = TgUser.get_content_type()
+        tguser_id = self.kwargs.get('tguser_pk')
+        return (
+            Q(player1_content_type=content_type, player1_object_id=tguser_id) |
+            Q(player2_content_type=content_type, player2_object_id=tguser_id)
+        )
+
+    def get_queryset(self):
+        return Game.objects.filter(self.player_filter())
+
+    def get_archived_queryset(self):
+        return ArchivedGame.objects.filter(self.player_filter())
+
+    def get_object(self):
+        pk = self.kwargs.get('pk')
+        game = self.get_queryset().filter(pk=pk).first() or self.get_archived_queryset().filter(pk=pk).first()
+        if game is None:
+            raise NotFound("Game not found for this user.")
+        return game
+
+    @extend_schema(responses={200: GameHistorySerializer(many=True)},
+                   description="Games of the TgUser, newest first, from both live and archived games.")
+    def list(self, request, tguser_pk=None):
+        """Історія ігор: одна сторінка з об'єднання id обох сховищ, далі - по запиту на сховище."""
+        rows = self.get_queryset().values('id', 'created_at').annotate(archived=Value(False)).union(
+            self.get_archived_queryset().values('id', 'created_at').annotate(archived=Value(True)),
+        ).order_by('-created_at', '-id')
+        page = self.paginate_queryset(rows)
+        live_ids = [row['id'] for row in page if not row['archived']]
+        archived_ids = [row['id'] for row in page if row['archived']]
+
+        games = {}
+        chains = state_chains(live_ids)
+        for game in Game.objects.filter(id__in=live_ids).prefetch_related('player1', 'player2'):
+            chain = chains.get(game.id) or [GameState(game=game)]
+            games[game.id] = {**game.progress(chain[-1]), 'moves': game_moves(chain), 'archived': False}
+        for game in ArchivedGame.objects.filter(id__in=archived_ids).prefetch_related('player1', 'player2'):
+            games[game.id] = {**game.progress(game.last_state()), 'moves': game.move_cells, 'archived': True}
+
+        serializer = GameHistorySerializer([games[row['id']] for row in page], many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def retrieve(self, request, tguser_pk=None, pk=None):
+        """Повертає гру з останнім GameState, номером ходу та підсумком."""
+        game = self.get_object()
+        if isinstance(game, ArchivedGame):
+            state = game.last_state()
+        else:
+            # Гра без жодного GameState (наприклад, створена поза API) - порожня дошка, як і в історії ігор
+            state = game.game_state.order_by('-id').first() or GameState(game=game)
+        return Response(self.get_serializer(game.progress(state)).data)
+
+    @extend_schema(
+        request=GameMoveSerializer,
+        responses={201: GameProgressSerializer},
+        description="Make a move in the game: returns the game with the new state.",
+    )
+    @action(detail=True, methods=['post'])
+    def move(self, request, tguser_pk=None, pk=None):
+        """Робить хід: рядок гри блокується, щоб ходи однієї гри застосовувались по черзі."""
+        with transaction.atomic():
+            game = self.get_queryset().select_for_update().filter(pk=pk).first()
+            if game is None:
+                if self.get_archived_queryset().filter(pk=pk).exists():
+                    raise ValidationError(["Game is over."])
+                raise NotFound("Game not found for this user.")
+            # Початковий стан створюється під блокуванням рядка гри - від нього ланцюжиться перший хід
+            state = game.game_state.order_by('-id').first() or GameState.objects.create(game=game)
+            serializer = GameMoveSerializer(data=request.data, context={
+                'game': game,
+                'state': state,
+                'player_content_type_id': TgUser.get_content_type().id,
+                'player_object_id': int(tguser_pk),
+            })
+            serializer.is_valid(raise_exception=True)
+            state = serializer.save()
+        return Response(self.get_serializer(game.progress(state)).data, status=status.HTTP_201_CREATED)
+
+
+async def tguser_events_stream(request, tguser_pk):
+    """
+    SSE-стрім для TgUser: зміни його пропозицій (event: proposition) та нові ходи в його іграх (event: move).
+    Кожен підписник - це лише черга й корутина в ASGI-воркері, тому замість опитування клієнт тримає одне з'єднання.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    if not isinstance(request, ASGIRequest):
+        # Під WSGI StreamingHttpResponse спершу збирає асинхронний ітератор у список - нескінченний стрім
+        # не віддав би клієнту жодного байта і назавжди зайняв би потік воркера
+        return JsonResponse({'detail': 'Event stream requires an ASGI server (uvicorn bot_backend.asgi).'},
+                            status=501)
+    if not await TgUser.objects.filter(id=tguser_pk).aexists():
+        return JsonResponse({'detail': 'TgUser not found.'}, status=404)
+
+    async def stream():
+        subscription = event_broker.subscribe(tguser_pk)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.get(), timeout=settings.EVENTS_KEEPALIVE_SECONDS)
+                except TimeoutError:
+                    # Коментар SSE не дає проксі закрити "тихе" з'єднання
+                    yield ": keep-alive\n\n"
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
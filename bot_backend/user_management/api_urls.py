@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework_nested import routers
 
-from tictactoe.views import TicTacToePropositionViewSet
+from tictactoe.views import GameViewSet, TicTacToePropositionViewSet, tguser_events_stream
 from .views import TgUserViewSet
 
 app_name = "api_user_management"
@@ -11,8 +11,10 @@ router.register("tgusers", TgUserViewSet, basename="tgusers")
 
 tgusers_router = routers.NestedSimpleRouter(router, "tgusers", lookup="tguser")
 tgusers_router.register("tictactoe-propositions", TicTacToePropositionViewSet, basename="tguser-tictactoe-propositions")
+tgusers_router.register("games", GameViewSet, basename="tguser-games")
 
 urlpatterns = [
     path("", include(router.urls)),
     path("", include(tgusers_router.urls)),
+    path("tgusers/<int:tguser_pk>/events/", tguser_events_stream, name="tguser-events"),
 ]
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from bot_backend.tracing import TracedSerializerMixin
 from user_management.models import User, TgUser
 
 
@@ -9,7 +10,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'email', 'username', 'first_name', 'last_name']
 
 
-class TgUserSerializer(serializers.ModelSerializer):
+class TgUserSerializer(TracedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = TgUser
         fields = ['id', 'tg_first_name', 'tg_last_name', 'tg_username', 'is_bot', 'language_code',
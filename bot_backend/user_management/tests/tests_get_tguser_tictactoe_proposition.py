@@ -75,3 +75,66 @@ class TicTacToePropositionViewSetTestCase(TestCase):
         self.assertEqual(len(response_expired_false.data["results"]), 1)
         self.assertEqual(response_expired_false.data["results"][0]['id'], self.proposition.id)
 
+
+    def test_list_etag_not_modified(self):
+        url = reverse('api_user_management:tguser-tictactoe-propositions-list', kwargs={'tguser_pk': self.tguser.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('"'))
+        response_cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response_cached.status_code, 304)
+        self.assertEqual(response_cached['ETag'], etag)
+        self.assertEqual(response_cached.content, b'')
+
+    def test_list_etag_changes_after_update(self):
+        url = reverse('api_user_management:tguser-tictactoe-propositions-list', kwargs={'tguser_pk': self.tguser.id})
+        etag = self.client.get(url)['ETag']
+        self.proposition.player1_first = True
+        self.proposition.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_etag_changes_after_player_update(self):
+        """Відповідь містить профілі гравців - їх зміна теж має змінити ETag."""
+        url = reverse('api_user_management:tguser-tictactoe-propositions-list', kwargs={'tguser_pk': self.tguser.id})
+        etag = self.client.get(url)['ETag']
+        self.tguser.tg_first_name = 'Johnny'
+        self.tguser.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        players = [item[key] for item in response.json()['results'] for key in ('player1', 'player2')]
+        self.assertIn('Johnny', [player['tg_first_name'] for player in players if player and 'tg_first_name' in player])
+
+        etag = response['ETag']
+        self.user.first_name = 'Web'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_retrieve_etag_not_modified(self):
+        url = reverse(
+            'api_user_management:tguser-tictactoe-propositions-detail',
+            kwargs={'tguser_pk': self.tguser.id, 'pk': self.proposition.id},
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], self.proposition.id)
+        with self.assertNumQueries(1):
+            response_cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response_cached.status_code, 304)
+        response_stale = self.client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response_stale.status_code, 200)
+
+    def test_destroy_deactivates_proposition(self):
+        url = reverse(
+            'api_user_management:tguser-tictactoe-propositions-detail',
+            kwargs={'tguser_pk': self.tguser.id, 'pk': self.proposition.id},
+        )
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, 204)
+        self.proposition.refresh_from_db()
+        self.assertFalse(self.proposition.is_active)
+        self.assertEqual(self.client.delete(url).status_code, 404)
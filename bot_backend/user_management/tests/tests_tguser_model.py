@@ -1,6 +1,8 @@
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-from user_management.models import TgUser
+from user_management.models import TgStartAttempt, TgUser
 
 
 class TgUserModelTestCase(TestCase):
@@ -50,3 +52,32 @@ class TgUserModelTestCase(TestCase):
         content_type = self.tg_user1.get_content_type()
         self.assertEqual(content_type.model, 'tguser')
         self.assertEqual(content_type.app_label, 'user_management')
+
+
+class TgUserUpsertTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('api_user_management:tgusers-list')
+        self.data = {'id': 555000111, 'tg_first_name': 'Upsert', 'tg_username': 'upsert', 'language_code': 'uk'}
+
+    def test_post_creates_then_updates_existing_tguser(self):
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(TgStartAttempt.objects.filter(tg_user_id=self.data['id']).count(), 1)
+
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(TgStartAttempt.objects.filter(tg_user_id=self.data['id']).count(), 2)
+
+        response = self.client.post(self.url, {**self.data, 'tg_first_name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['tg_first_name'], 'Renamed')
+        tguser = TgUser.objects.get(id=self.data['id'])
+        self.assertEqual((tguser.tg_first_name, tguser.language_code), ('Renamed', 'uk'))
+
+    def test_invalid_data_is_rejected(self):
+        self.assertEqual(self.client.post(self.url, {**self.data, 'id': 'abc'}, format='json').status_code, 400)
+        TgUser.objects.create(id=self.data['id'], tg_first_name='Existing')
+        response = self.client.post(self.url, {**self.data, 'language_code': 'x' * 100}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(TgUser.objects.get(id=self.data['id']).tg_first_name, 'Existing')
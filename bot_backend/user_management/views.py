@@ -1,4 +1,3 @@
-from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
 from rest_framework import viewsets, status
 from rest_framework.response import Response
@@ -28,40 +27,41 @@ class TgUserViewSet(viewsets.ModelViewSet):
         - If exists, update fields that differ from the request data and create a new TgStartAttempt.
         - If does not exist, create a new TgUser (TgStartAttempt created via TgUser.save()).
         """
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        validated_data = serializer.validated_data
-
-        # Отримуємо id_ із запиту
-        id_ = validated_data.get('pk') or validated_data.get('id')
-
+        # Отримуємо id_ із запиту; невалідний id відхилить серіалізатор
+        id_ = request.data.get('id')
         try:
-            with transaction.atomic():
-                # Шукаємо існуючого користувача за id_
-                existing_user = TgUser.objects.get(id=id_)
-
-                # Оновлюємо поля, які відрізняються
-                update_fields = []
-                for field, value in validated_data.items():
-                    current_value = getattr(existing_user, field)
-                    if current_value != value:
-                        setattr(existing_user, field, value)
-                        update_fields.append(field)
-
-                # Зберігаємо зміни, якщо є що оновлювати
-                if update_fields:
-                    existing_user.save(update_fields=update_fields)
+            existing_user = TgUser.objects.filter(id=int(id_)).first() if id_ is not None else None
+        except (TypeError, ValueError):
+            existing_user = None
 
-                # Створюємо новий TgStartAttempt
-                TgStartAttempt.objects.create(tg_user=existing_user)
-                # Серіалізуємо оновлений об’єкт для відповіді
-                serializer = self.get_serializer(existing_user)
-                headers = self.get_success_headers(serializer.data)
-                return Response(serializer.data, status=status.HTTP_200_OK, headers=headers)
-
-        except ObjectDoesNotExist:
+        if existing_user is None:
             # Якщо користувача немає, створюємо нового
             # Метод save() моделі TgUser автоматично створить TgStartAttempt
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
             self.perform_create(serializer)
             headers = self.get_success_headers(serializer.data)
             return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+        # Серіалізатор з instance: перевірка унікальності id не спрацьовує на самого користувача
+        serializer = self.get_serializer(existing_user, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            # Оновлюємо поля, які відрізняються
+            update_fields = []
+            for field, value in serializer.validated_data.items():
+                current_value = getattr(existing_user, field)
+                if current_value != value:
+                    setattr(existing_user, field, value)
+                    update_fields.append(field)
+
+            # Зберігаємо зміни, якщо є що оновлювати
+            if update_fields:
+                existing_user.save(update_fields=update_fields)
+
+            # Створюємо новий TgStartAttempt
+            TgStartAttempt.objects.create(tg_user=existing_user)
+        # Серіалізуємо оновлений об’єкт для відповіді
+        serializer = self.get_serializer(existing_user)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers=headers)
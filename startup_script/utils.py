@@ -72,7 +72,7 @@ def run_django_commands(
         text_commands: dict[str, str] | None = None,  # Список команд для виконання: key - команда, value - опис
         description: list[str] | None = None,  # Опис команд для відображення в консолі, необовʼязково
 ):
-    """Виконання Django-команд: makemigrations, migrate, runserver."""
+    """Виконання Django-команд: makemigrations, migrate і запуск ASGI-сервера (uvicorn)."""
     manage_py = BASE_DIR / manage_py
     if not manage_py.exists():
         print(f"Помилка: Файл {manage_py} не знайдено. Переконайтеся, що ви в корені Django-проєкту.")
@@ -84,7 +84,11 @@ def run_django_commands(
         commands = {
             command_begin + ("makemigrations",): "Створення міграцій",
             command_begin + ("migrate",): "Застосування міграцій",
-            command_begin + ("runserver", "0.0.0.0:8000",): "Запуск сервера: 0.0.0.0:8000",
+            command_begin + ("manage_partitions", "--create-only"): "Створення розділів таблиць наперед",
+            # ASGI, а не runserver (WSGI): SSE-стрім подій тримає з'єднання відкритим
+            (sys.executable, "-m", "uvicorn", "bot_backend.asgi:application", "--app-dir", str(manage_py.parent),
+             "--host", "0.0.0.0", "--port", "8000", "--reload", "--reload-dir", str(manage_py.parent)):
+                "Запуск ASGI-сервера: 0.0.0.0:8000",
         }
     else:
         for cmd in text_commands:
@@ -93,9 +97,9 @@ def run_django_commands(
     last_command = None
     for cmd, desc in commands.items():
         command_line = " ".join(cmd)
-        if "runserver" in command_line:
+        if "runserver" in command_line or "uvicorn" in command_line:
             last_command = cmd
-            if (port := re.search(r":(\d+)", command_line)) and is_port_in_use(int(port.group(1))):
+            if (port := re.search(r"(?::|--port )(\d+)", command_line)) and is_port_in_use(int(port.group(1))):
                 print(f"\nПомилка: Порт {port.group(1)} вже зайнятий. Сервер не запустився.")
                 sys.exit(1)
             continue
@@ -112,7 +116,7 @@ def run_django_commands(
             process = subprocess.Popen(last_command, text=True, stdout=sys.stdout, stderr=sys.stderr)
             time.sleep(1)
             if process.poll() is not None:
-                print(f"Помилка: Django-сервер не запустився (код завершення: {process.returncode}).")
+                print(f"Помилка: сервер не запустився (код завершення: {process.returncode}).")
                 sys.exit(1)
             print(f"Команду {commands[last_command]} запущено у фоновому режимі (PID: {process.pid}).")
         except Exception as e:
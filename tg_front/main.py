@@ -4,25 +4,114 @@ import sys
 
 from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 
 from settings import settings
+from src import metrics
+from src.api_requests import backend_client, profile_cache
+from src.board import board_messages
+from src.profiling import HandlerProfiler
+from src.scheduler import UpdateScheduler
+from src.tracing import SpanExporter, UpdateTracer
+from src.send_queue import SendQueue
 from src.tic_tac_toe_bot import dp
 
-from src.utils import add_aiohttp_client_session, close_aiohttp_client_session
+from src.utils import add_aiohttp_client_session, backend_stats, close_aiohttp_client_session
+from src.webhook import run_webhook
 
 # Bot token can be obtained via https://t.me/BotFather
 TOKEN = settings.BOT_TOKEN
 dp.startup.register(add_aiohttp_client_session)
 dp.shutdown.register(close_aiohttp_client_session)
 
+if settings.TRACING_ENABLED:
+    span_exporter = SpanExporter(
+        "tg_front", path=settings.TRACING_EXPORT_PATH, endpoint=settings.TRACING_OTLP_ENDPOINT,
+    )
+    # Реєструється до планувальника, щоб span оновлення включав очікування в черзі чату
+    UpdateTracer(span_exporter, sample_rate=settings.TRACING_SAMPLE_RATE).setup(dp)
 
-async def main() -> None:
+    async def start_span_exporter() -> None:
+        span_exporter.start()
+
+    dp.startup.register(start_span_exporter)
+    dp.shutdown.register(span_exporter.close)
+
+update_scheduler = UpdateScheduler(limit=settings.UPDATE_CONCURRENCY)
+update_scheduler.setup(dp)
+
+if settings.PROFILING_ENABLED:
+    HandlerProfiler(
+        threshold=settings.PROFILE_THRESHOLD,
+        sample_rate=settings.PROFILE_SAMPLE_RATE,
+        interval=settings.PROFILE_INTERVAL,
+        directory=settings.PROFILE_DIR,
+    ).setup(dp)
+
+send_queue = SendQueue(
+    global_rate=settings.SEND_GLOBAL_RATE,
+    chat_rate=settings.SEND_CHAT_RATE,
+    group_rate=settings.SEND_GROUP_RATE,
+    burst=settings.SEND_BURST,
+    max_retries=settings.SEND_MAX_RETRIES,
+)
+
+
+async def log_stats() -> None:
+    logger = logging.getLogger(__name__)
+    logger.info("Update scheduler stats: %s", update_scheduler.stats())
+    logger.info("Send queue stats: %s", send_queue.stats())
+    logger.info("Backend client stats: %s", backend_client.stats())
+
+
+dp.shutdown.register(log_stats)
+
+metrics_registry = metrics.MetricsRegistry()
+metrics_registry.register(metrics.scheduler_collector(update_scheduler))
+metrics_registry.register(metrics.backend_collector(backend_stats, backend_client))
+metrics_registry.register(metrics.send_queue_collector(send_queue))
+metrics_registry.register(metrics.cache_collector("profile", profile_cache))
+metrics_registry.register(metrics.board_collector(board_messages))
+
+
+async def start_metrics_server(dispatcher) -> None:
+    if settings.METRICS_PORT:
+        dispatcher["metrics_runner"] = await metrics_registry.start_server(settings.METRICS_HOST, settings.METRICS_PORT)
+
+
+async def stop_metrics_server(dispatcher) -> None:
+    runner = dispatcher.workflow_data.get("metrics_runner")
+    if runner is not None:
+        await runner.cleanup()
+
+
+dp.startup.register(start_metrics_server)
+dp.shutdown.register(stop_metrics_server)
+
+
+def create_bot() -> Bot:
     # Initialize Bot instance with default bot properties which will be passed to all API calls
-    bot = Bot(token=TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    session = None
+    if settings.TELEGRAM_API_URL:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(settings.TELEGRAM_API_URL))
+    bot = Bot(token=TOKEN, session=session, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    # Усі вихідні запити проходять через ліміти Telegram
+    bot.session.middleware(send_queue)
+    return bot
+
+
+async def main() -> None:
+    bot = create_bot()
 
     # And the run events dispatching
-    await dp.start_polling(bot)
+    if settings.BOT_MODE == "webhook":
+        await run_webhook(dp, bot, settings)
+    else:
+        # Якщо раніше працював webhook, getUpdates без його видалення повертатиме помилку
+        await bot.delete_webhook()
+        await dp.start_polling(bot)
 
 
 if __name__ == "__main__":
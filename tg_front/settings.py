@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -7,6 +9,47 @@ class Settings(BaseSettings):
     BOT_NAME: str
     BOT_USERNAME: str
 
+    # Отримання оновлень: long polling або webhook
+    BOT_MODE: Literal["polling", "webhook"] = "polling"
+    # Публічна адреса, на яку Telegram надсилатиме оновлення (https://example.com)
+    WEBHOOK_BASE_URL: str = ""
+    WEBHOOK_PATH: str = "/webhook"
+    # Значення X-Telegram-Bot-Api-Secret-Token; якщо порожнє - генерується при старті
+    WEBHOOK_SECRET: str = ""
+    WEBHOOK_HOST: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8080
+    # Скільки прийнятих через webhook оновлень можуть чекати на обробку, далі - 503
+    WEBHOOK_QUEUE_SIZE: int = 1000
+    # Скільки оновлень обробляються одночасно; оновлення одного чату - завжди по черзі
+    UPDATE_CONCURRENCY: int = 64
+    # Ліміти вихідних повідомлень (повідомлень за секунду), сплеск і повтори після 429
+    SEND_GLOBAL_RATE: float = 30
+    SEND_CHAT_RATE: float = 1
+    SEND_GROUP_RATE: float = 20 / 60
+    SEND_BURST: int = 1
+    SEND_MAX_RETRIES: int = 3
+    # Ключ підпису callback_data кнопок; якщо порожній - виводиться з BOT_TOKEN
+    CALLBACK_SECRET: str = ""
+    # Альтернативний сервер Bot API (наприклад, локальна заглушка tools.fake_bot_api)
+    TELEGRAM_API_URL: str | None = None
+    # Вибірковий профайлер хендлерів: стеки хендлерів, довших за поріг (секунди), і випадкової частки
+    # викликів пишуться у PROFILE_DIR у форматі collapsed stacks
+    PROFILING_ENABLED: bool = False
+    PROFILE_THRESHOLD: float = 0.5
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL: float = 0.005
+    PROFILE_DIR: str = "profiles"
+    # Трасування оновлень: частка оновлень у вибірці, OTLP/JSON у файл і/або на колектор (http://collector:4318);
+    # контекст передається в Django API заголовком traceparent
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 1.0
+    TRACING_EXPORT_PATH: str = ""
+    TRACING_OTLP_ENDPOINT: str = ""
+    # Ендпоінт /metrics у форматі Prometheus; порт 0 вимикає сервер метрик.
+    # Без автентифікації, тож за замовчуванням лише локально; для Prometheus в іншому контейнері - METRICS_HOST=0.0.0.0
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 9100
+
     # Database
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
@@ -17,6 +60,28 @@ class Settings(BaseSettings):
     # Django API
     DJANGO_HOST: str
     DJANGO_PORT: int
+    # Повна адреса API (http://host:port/api/v1/) замість типової для docker, наприклад tools.fake_backend
+    BACKEND_API_URL: str = ""
+
+    # HTTP-клієнт до Django API: ліміти з'єднань, keep-alive, таймаути (секунди) і кеш DNS
+    BACKEND_CONNECTION_LIMIT: int = 100
+    BACKEND_CONNECTION_LIMIT_PER_HOST: int = 30
+    BACKEND_KEEPALIVE_TIMEOUT: float = 30
+    BACKEND_DNS_CACHE_TTL: int = 300
+    BACKEND_TIMEOUT_TOTAL: float = 10
+    BACKEND_TIMEOUT_CONNECT: float = 2
+
+    # Повтори ідемпотентних запитів до Django API (затримка в секундах, з джитером)
+    BACKEND_RETRY_ATTEMPTS: int = Field(3, ge=1)
+    BACKEND_RETRY_BASE_DELAY: float = 0.1
+    BACKEND_RETRY_MAX_DELAY: float = 1
+    # Запобіжник: скільки збоїв поспіль відкривають його і через скільки секунд пробувати знову
+    BACKEND_BREAKER_THRESHOLD: int = 5
+    BACKEND_BREAKER_RESET_TIMEOUT: float = 10
+
+    # Кеш профілів TgUser (секунди / кількість записів)
+    PROFILE_CACHE_TTL: float = 300
+    PROFILE_CACHE_SIZE: int = 10_000
 
     @property
     def db_url(self):
@@ -25,6 +90,8 @@ class Settings(BaseSettings):
 
     @property
     def api_url(self):
+        if self.BACKEND_API_URL:
+            return self.BACKEND_API_URL.rstrip("/") + "/"
         return f"http://host.docker.internal:{self.DJANGO_PORT}/api/v1/"
 
 
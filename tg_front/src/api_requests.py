@@ -1,16 +1,58 @@
+import logging
+
 from aiogram import Bot
-from .shemas import UserShema
+from .cache import TTLCache
+from .resilience import BackendError, CircuitBreaker, ResilientClient, RetryPolicy
+from .shemas import GameProgressShema, UserShema
+from .single_flight import SingleFlight
+from .utils import json_loads
 from settings import settings
 
+logger = logging.getLogger(__name__)
+
+# Останні синхронізовані з бекендом профілі за Telegram user id
+profile_cache = TTLCache(maxsize=settings.PROFILE_CACHE_SIZE, ttl=settings.PROFILE_CACHE_TTL)
+
+# Одночасні однакові запити до бекенду для одного користувача йдуть одним запитом
+backend_flight = SingleFlight()
+
+# Повтори ідемпотентних запитів і запобіжник, що відмовляє одразу, поки бекенд лежить
+backend_client = ResilientClient(
+    retry=RetryPolicy(
+        attempts=settings.BACKEND_RETRY_ATTEMPTS,
+        base_delay=settings.BACKEND_RETRY_BASE_DELAY,
+        max_delay=settings.BACKEND_RETRY_MAX_DELAY,
+    ),
+    breaker=CircuitBreaker(
+        failure_threshold=settings.BACKEND_BREAKER_THRESHOLD,
+        reset_timeout=settings.BACKEND_BREAKER_RESET_TIMEOUT,
+    ),
+    loads=json_loads,
+)
+
+
+async def _get_tguser(url: str, bot: Bot) -> tuple[int, bytes]:
+    # Сире тіло: get_cached_tguser розбирає його одразу в UserShema
+    return await backend_client.request_raw(bot.http_session, "GET", url)
+
+
+async def _create_tguser(url: str, payload: dict, bot: Bot) -> dict:
+    _, result = await backend_client.request(bot.http_session, "POST", url, json=payload)
+    return result
+
+
+async def _get_tguser_raw(user: UserShema, bot: Bot, api_url: str) -> tuple[int, bytes]:
+    url = f"{api_url}users/tgusers/{user.id}/"
+    return await backend_flight.do(("get_tguser", url), _get_tguser, url, bot)
+
 
 async def get_tguser(
         user: UserShema,
         bot: Bot,
         api_url: str = settings.api_url,
 ) -> dict:
-    url = f"{api_url}users/tgusers/{user.id}/?format=json"
-    async with bot.http_session.get(url,) as response:
-        return await response.json()
+    _, body = await _get_tguser_raw(user, bot, api_url)
+    return json_loads(body)
 
 
 async def create_tguser(
@@ -18,7 +60,94 @@ async def create_tguser(
         bot: Bot,
         api_url: str = settings.api_url,
 ) -> dict:
-    url = f"{api_url}users/tgusers/?format=json"
-    async with bot.http_session.post(url, json=user.model_dump()) as response:
-        result = await response.json()
-        return result
+    url = f"{api_url}users/tgusers/"
+    # Ключ включає дані профілю: об'єднуються лише запити з однаковим тілом
+    return await backend_flight.do(
+        ("create_tguser", url, user.model_dump_json()), _create_tguser, url, user.model_dump(), bot
+    )
+
+
+async def get_cached_tguser(
+        user: UserShema,
+        bot: Bot,
+        api_url: str = settings.api_url,
+) -> UserShema | None:
+    """
+    Повертає профіль з кешу, а при промаху - з бекенду (і кешує його).
+    Якщо бекенд недоступний - повертає прострочений запис кешу, а без нього кидає BackendError.
+    None - користувача в базі немає.
+    """
+    cached = profile_cache.get(user.id)
+    if cached is not None:
+        return cached
+    try:
+        status, body = await _get_tguser_raw(user, bot, api_url)
+    except BackendError:
+        stale = profile_cache.get_stale(user.id)
+        if stale is None:
+            raise
+        logger.warning("Backend unavailable, serving cached profile of user %s", user.id)
+        return stale
+    if status != 200:
+        return None
+    # Розбір JSON і валідація за один прохід у pydantic-core, без проміжного dict
+    user_from_db = UserShema.model_validate_json(body).normalized()
+    profile_cache.set(user.id, user_from_db)
+    return user_from_db
+
+
+async def sync_tguser(
+        user: UserShema,
+        bot: Bot,
+        api_url: str = settings.api_url,
+) -> UserShema:
+    """
+    Оновлює профіль у бекенді лише якщо він змінився з останньої синхронізації або запис у кеші застарів.
+    Якщо бекенд недоступний - синхронізація відкладається до наступного повідомлення.
+    """
+    # У кеші профілі з бекенду й з aiogram в одному вигляді - інакше порівняння бачило б різницю в None/False
+    user = user.normalized()
+    cached = profile_cache.get(user.id)
+    if cached == user:
+        return cached
+    try:
+        result = await create_tguser(user, bot, api_url)
+    except BackendError:
+        logger.warning("Backend unavailable, profile of user %s is not synced", user.id)
+        return profile_cache.get_stale(user.id) or user
+    if result and "id" in result:
+        profile_cache.set(user.id, user)
+    return user
+
+
+async def get_game(
+        tguser_id: int,
+        game_id: int,
+        bot: Bot,
+        api_url: str = settings.api_url,
+) -> GameProgressShema | None:
+    """Поточний стан гри; None - гри немає або користувач у ній не грає."""
+    url = f"{api_url}users/tgusers/{tguser_id}/games/{game_id}/"
+    status, body = await backend_client.request_raw(bot.http_session, "GET", url)
+    if status != 200:
+        return None
+    return GameProgressShema.model_validate_json(body)
+
+
+async def make_move(
+        tguser_id: int,
+        game_id: int,
+        cell: int,
+        ply: int,
+        bot: Bot,
+        api_url: str = settings.api_url,
+) -> GameProgressShema | None:
+    """
+    Хід у гру. Не ідемпотентний, тому не об'єднується й не повторюється.
+    None - бекенд відхилив хід (не черга гравця, клітинка зайнята, дошка вже змінилась).
+    """
+    url = f"{api_url}users/tgusers/{tguser_id}/games/{game_id}/move/"
+    status, body = await backend_client.request_raw(bot.http_session, "POST", url, json={"cell": cell, "ply": ply})
+    if status != 201:
+        return None
+    return GameProgressShema.model_validate_json(body)
@@ -0,0 +1,142 @@
+from functools import lru_cache
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from settings import settings
+from .cache import TTLCache
+from .callback_codec import MoveCodec, MoveTap, derive_secret
+from .shemas import GameProgressShema
+
+# Позначки рушія в GameState.cells і знаки PossibleSign бекенду
+CELL_SIGNS = {"X": "❌", "0": "⭕"}
+EMPTY_CELL = "▫️"
+WINNING_CELL = {"❌": "❎", "⭕": "🟢"}
+NOOP = "noop"
+
+move_codec = MoveCodec(settings.CALLBACK_SECRET.encode() or derive_secret(settings.BOT_TOKEN))
+
+
+@lru_cache(maxsize=1024)
+def board_labels(cells: str, winning_cells: tuple[int, ...] = ()) -> tuple[str, ...]:
+    """Підписи 9 кнопок для дошки; різних дошок небагато (< 3^9), тож кеш покриває майже всі."""
+    labels = []
+    for index, cell in enumerate(cells):
+        sign = CELL_SIGNS.get(cell)
+        if sign is None:
+            labels.append(EMPTY_CELL)
+        elif index in winning_cells:
+            labels.append(WINNING_CELL[sign])
+        else:
+            labels.append(sign)
+    return tuple(labels)
+
+
+@lru_cache(maxsize=4096)
+def render_board(
+        game_id: int,
+        cells: str,
+        finished: bool = False,
+        winning_cells: tuple[int, ...] = (),
+) -> InlineKeyboardMarkup:
+    """
+    Інлайн-клавіатура 3x3 для стану дошки. Результат кешується й не змінюється викликачами:
+    повторний рендер того самого стану повертає той самий об'єкт, що дешево порівнюється в BoardMessages.update.
+    """
+    labels = board_labels(cells, winning_cells)
+    ply = len(cells) - cells.count(" ")
+    buttons = []
+    for index, label in enumerate(labels):
+        if finished or cells[index] != " ":
+            callback_data = NOOP
+        else:
+            callback_data = move_codec.encode(game_id, ply, index)
+        buttons.append(InlineKeyboardButton(text=label, callback_data=callback_data))
+    return InlineKeyboardMarkup(inline_keyboard=[buttons[row:row + 3] for row in range(0, 9, 3)])
+
+
+def render_progress(progress: GameProgressShema) -> InlineKeyboardMarkup:
+    return render_board(progress.game.id, progress.state.cells, progress.finished, tuple(progress.winning_cells))
+
+
+class BoardMessages:
+    """
+    Повідомлення з дошками ігор і остання надіслана в кожне клавіатура.
+    Редагування, що нічого не змінює, не надсилається в Telegram.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 24 * 3600):
+        # game_id -> {(chat_id, message_id), ...}
+        self._messages = TTLCache(maxsize=maxsize, ttl=ttl)
+        # (chat_id, message_id) -> InlineKeyboardMarkup
+        self._markups = TTLCache(maxsize=maxsize, ttl=ttl)
+        # game_id -> номер останнього відомого ходу
+        self._plies = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.edits = 0
+        self.skipped = 0
+        self.stale = 0
+
+    def register(self, game_id: int, chat_id: int, message_id: int, markup: InlineKeyboardMarkup) -> None:
+        messages = self._messages.get(game_id) or frozenset()
+        self._messages.set(game_id, messages | {(chat_id, message_id)})
+        self._markups.set((chat_id, message_id), markup)
+
+    def messages(self, game_id: int) -> frozenset[tuple[int, int]]:
+        return self._messages.get(game_id) or frozenset()
+
+    def observe(self, progress: GameProgressShema) -> None:
+        if progress.ply >= self._plies.get(progress.game.id, -1):
+            self._plies.set(progress.game.id, progress.ply)
+
+    def is_stale(self, move: MoveTap) -> bool:
+        """Натискання на дошці, після якої вже був хід: відкидається без звернення до бекенду."""
+        if move.ply < self._plies.get(move.game_id, -1):
+            self.stale += 1
+            return True
+        return False
+
+    async def send(self, bot: Bot, chat_id: int, progress: GameProgressShema) -> None:
+        self.observe(progress)
+        markup = render_progress(progress)
+        message = await bot.send_message(chat_id, f"Game #{progress.game.id}", reply_markup=markup)
+        self.register(progress.game.id, chat_id, message.message_id, markup)
+
+    async def update(self, bot: Bot, chat_id: int, message_id: int, markup: InlineKeyboardMarkup) -> bool:
+        """Оновлює клавіатуру повідомлення. False - повідомлення вже показує цю дошку."""
+        key = (chat_id, message_id)
+        sent = self._markups.get(key)
+        if sent is markup or sent == markup:
+            self.skipped += 1
+            return False
+        try:
+            await bot.edit_message_reply_markup(chat_id=chat_id, message_id=message_id, reply_markup=markup)
+        except TelegramBadRequest as exc:
+            # Повідомлення вже в цьому стані (наприклад, після перезапуску бота, коли кеш порожній)
+            if "message is not modified" not in exc.message:
+                raise
+            self.skipped += 1
+        else:
+            self.edits += 1
+        self._markups.set(key, markup)
+        return True
+
+    async def update_game(self, bot: Bot, progress: GameProgressShema, chat_id: int, message_id: int) -> None:
+        """Оновлює дошку в повідомленні, з якого зроблено хід, і в інших відомих повідомленнях цієї гри."""
+        self.observe(progress)
+        markup = render_progress(progress)
+        self.register(progress.game.id, chat_id, message_id, self._markups.get((chat_id, message_id)))
+        for board_chat_id, board_message_id in self.messages(progress.game.id):
+            await self.update(bot, board_chat_id, board_message_id, markup)
+
+    def stats(self) -> dict:
+        return {
+            "edits": self.edits,
+            "skipped": self.skipped,
+            "stale": self.stale,
+            "forged": move_codec.rejected,
+            "games": len(self._messages),
+        }
+
+
+board_messages = BoardMessages()
@@ -0,0 +1,82 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import struct
+from typing import NamedTuple
+
+from aiogram.filters import Filter
+from aiogram.types import CallbackQuery
+
+VERSION = 1
+# версія, game_id, ply, cell
+PAYLOAD = struct.Struct(">BQBB")
+SIGNATURE_SIZE = 8
+# 11 байт даних + 8 байт підпису = 19 байт -> 26 символів base64url без "="
+ENCODED_SIZE = 26
+
+
+class MoveTap(NamedTuple):
+    game_id: int
+    ply: int
+    cell: int
+
+
+def derive_secret(bot_token: str) -> bytes:
+    """Ключ підпису з токена бота: стабільний між перезапусками і не потребує окремого налаштування."""
+    return hashlib.sha256(b"callback-data:" + bot_token.encode()).digest()
+
+
+class MoveCodec:
+    """
+    Компактне кодування callback_data кнопки ходу (ліміт Telegram - 64 байти).
+    Формат: base64url(версія | game_id | ply | cell | HMAC-SHA256[:8]).
+    Підпис відсікає підроблені натискання ще до звернення до бекенду.
+    """
+
+    def __init__(self, secret: bytes):
+        self._secret = secret
+        self.rejected = 0
+
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.digest(self._secret, payload, "sha256")[:SIGNATURE_SIZE]
+
+    def encode(self, game_id: int, ply: int, cell: int) -> str:
+        payload = PAYLOAD.pack(VERSION, game_id, ply, cell)
+        return base64.urlsafe_b64encode(payload + self._sign(payload)).rstrip(b"=").decode()
+
+    def decode(self, data: str) -> MoveTap | None:
+        """None - дані не від цього бота, пошкоджені або іншої версії."""
+        if len(data) != ENCODED_SIZE:
+            return None
+        try:
+            # Строга перевірка алфавіту: urlsafe_b64decode мовчки відкидає сторонні символи й повертає коротший рядок
+            raw = base64.b64decode(data + "==", altchars=b"-_", validate=True)
+        except (binascii.Error, ValueError):
+            self.rejected += 1
+            return None
+        if len(raw) != PAYLOAD.size + SIGNATURE_SIZE:
+            self.rejected += 1
+            return None
+        payload, signature = raw[:PAYLOAD.size], raw[PAYLOAD.size:]
+        if raw[0] != VERSION or not hmac.compare_digest(signature, self._sign(payload)):
+            self.rejected += 1
+            return None
+        _, game_id, ply, cell = PAYLOAD.unpack(payload)
+        if cell > 8:
+            self.rejected += 1
+            return None
+        return MoveTap(game_id, ply, cell)
+
+
+class MoveFilter(Filter):
+    """Пропускає натискання кнопок ходу й передає хендлеру розкодований `move`."""
+
+    def __init__(self, codec: MoveCodec):
+        self.codec = codec
+
+    async def __call__(self, callback: CallbackQuery) -> bool | dict:
+        move = self.codec.decode(callback.data) if callback.data else None
+        if move is None:
+            return False
+        return {"move": move}
@@ -0,0 +1,156 @@
+"""
+Ендпоінт /metrics бота в текстовому форматі Prometheus без сторонніх залежностей.
+
+Бот уже рахує все потрібне у власних об'єктах статистики (планувальник, черга відправки,
+HTTP-клієнт до бекенду); колектори лише перетворюють їх на рядки метрик у момент запиту.
+Затримки віддаються як summary з квантилями за останніми вимірами LatencyStats.
+"""
+import logging
+from typing import Callable, Iterable
+
+from aiohttp import web
+
+from .utils import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+QUANTILES = (0.5, 0.95, 0.99)
+
+Collector = Callable[[], Iterable[str]]
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: dict | None) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def header(name: str, metric_type: str, documentation: str) -> list[str]:
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+
+
+def sample(name: str, value: float, labels: dict | None = None) -> str:
+    return f"{name}{format_labels(labels)} {value}"
+
+
+def summary_samples(name: str, stats: LatencyStats, labels: dict | None = None) -> list[str]:
+    lines = []
+    for quantile in QUANTILES:
+        value = stats.percentile(quantile)
+        if value is not None:
+            lines.append(sample(name, value, {**(labels or {}), "quantile": quantile}))
+    lines.append(sample(f"{name}_sum", stats.total, labels))
+    lines.append(sample(f"{name}_count", stats.count, labels))
+    return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._collectors: list[Collector] = []
+
+    def register(self, collector: Collector) -> Collector:
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        lines = []
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception:
+                # Збій одного колектора не повинен ламати весь /metrics
+                logger.exception("Metrics collector %s failed", getattr(collector, "__name__", collector))
+        return "\n".join(lines) + "\n"
+
+    async def handle(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    async def start_server(self, host: str, port: int) -> web.AppRunner:
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        logger.info("Metrics server listening on %s:%s", host, port)
+        return runner
+
+
+def scheduler_collector(scheduler) -> Collector:
+    def collect() -> list[str]:
+        stats = scheduler.stats()
+        lines = header("tg_updates_total", "counter", "Updates processed.")
+        lines.append(sample("tg_updates_total", stats["processed"]))
+        lines += header("tg_updates_per_second", "gauge", "Updates processed per second over the last minute.")
+        lines.append(sample("tg_updates_per_second", stats["updates_per_second"]))
+        lines += header("tg_updates_running", "gauge", "Updates being processed now.")
+        lines.append(sample("tg_updates_running", stats["running"]))
+        lines += header("tg_updates_waiting", "gauge", "Updates waiting for their chat or a free slot.")
+        lines.append(sample("tg_updates_waiting", stats["waiting"]))
+        lines += header("tg_update_wait_seconds", "summary", "Time an update waited before processing.")
+        lines += summary_samples("tg_update_wait_seconds", scheduler.wait_time)
+        lines += header("tg_handler_duration_seconds", "summary", "Handler latency.")
+        for handler_name, latency in list(scheduler.handler_latency.items()):
+            lines += summary_samples("tg_handler_duration_seconds", latency, {"handler": handler_name})
+        return lines
+    return collect
+
+
+def backend_collector(backend_stats, backend_client) -> Collector:
+    def collect() -> list[str]:
+        lines = header("tg_backend_request_duration_seconds", "summary", "Django API request latency.")
+        lines += summary_samples("tg_backend_request_duration_seconds", backend_stats.latency)
+        lines += header("tg_backend_pool_wait_seconds", "summary", "Time waiting for a free pooled connection.")
+        lines += summary_samples("tg_backend_pool_wait_seconds", backend_stats.queueing)
+        lines += header("tg_backend_connections_total", "counter", "Connections to Django API.")
+        lines.append(sample("tg_backend_connections_total", backend_stats.connections_created, {"kind": "created"}))
+        lines.append(sample("tg_backend_connections_total", backend_stats.connections_reused, {"kind": "reused"}))
+        client = backend_client.stats()
+        lines += header("tg_backend_client_events_total", "counter", "Retries, failures and short-circuited calls.")
+        for event in ("requests", "retries", "failures", "short_circuited"):
+            lines.append(sample("tg_backend_client_events_total", client[event], {"event": event}))
+        lines += header("tg_backend_circuit_open", "gauge", "1 if the circuit breaker is not closed.")
+        lines.append(sample("tg_backend_circuit_open", int(client["breaker_state"] != "closed")))
+        return lines
+    return collect
+
+
+def send_queue_collector(send_queue) -> Collector:
+    def collect() -> list[str]:
+        stats = send_queue.stats()
+        lines = header("tg_send_events_total", "counter", "Outbound Bot API calls: sent, coalesced edits, 429 retries.")
+        for event in ("sent", "coalesced", "retried"):
+            lines.append(sample("tg_send_events_total", stats[event], {"event": event}))
+        lines += header("tg_send_pending_edits", "gauge", "Board edits waiting for a token.")
+        lines.append(sample("tg_send_pending_edits", stats["pending_edits"]))
+        lines += header("tg_send_throttle_seconds", "summary", "Time a request waited for rate-limit tokens.")
+        lines += summary_samples("tg_send_throttle_seconds", send_queue.throttled)
+        return lines
+    return collect
+
+
+def cache_collector(name: str, cache) -> Collector:
+    def collect() -> list[str]:
+        lines = header("tg_cache_requests_total", "counter", "Cache lookups by result.")
+        lines.append(sample("tg_cache_requests_total", cache.hits, {"cache": name, "result": "hit"}))
+        lines.append(sample("tg_cache_requests_total", cache.misses, {"cache": name, "result": "miss"}))
+        lines += header("tg_cache_entries", "gauge", "Entries in the cache.")
+        lines.append(sample("tg_cache_entries", len(cache), {"cache": name}))
+        return lines
+    return collect
+
+
+def board_collector(board_messages) -> Collector:
+    def collect() -> list[str]:
+        stats = board_messages.stats()
+        lines = header("tg_board_events_total", "counter", "Board edits, skipped no-op edits, stale and forged taps.")
+        for event in ("edits", "skipped", "stale", "forged"):
+            lines.append(sample("tg_board_events_total", stats[event], {"event": event}))
+        lines += header("tg_board_games", "gauge", "Games with a tracked board message.")
+        lines.append(sample("tg_board_games", stats["games"]))
+        return lines
+    return collect
@@ -0,0 +1,112 @@
+"""
+Вибірковий профайлер хендлерів aiogram.
+
+Хендлер, що працює довше за поріг (або випадково відібраний з частки sample_rate), починає
+профілюватися: таймер циклу подій кожні `interval` секунд знімає стек корутин задачі
+(ланцюжок cr_await), тобто місце, на якому задача зараз чекає. Профіль пишеться у файл
+collapsed stacks ("frame;frame;frame count"), з якого будується flame graph.
+
+Поки поріг не перевищено, вартість - один call_later і його скасування на виклик хендлера.
+Код, що блокує цикл подій без await, таймер побачити не може: такі ділянки видно
+як пропуски вибірок і як затримку в метриках планувальника.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject
+
+from .scheduler import Handler
+
+logger = logging.getLogger(__name__)
+
+
+def frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def collapse_task(task: asyncio.Task) -> str:
+    """
+    Стек задачі від кореня до найглибшого await. Task.get_stack() для призупиненої корутини
+    повертає лише зовнішній кадр, тому ланцюжок іде через cr_await; в кінці - тип очікуваного об'єкта.
+    """
+    names = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            names.append(f"<{type(awaitable).__name__}>")
+            break
+        names.append(frame_name(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return ";".join(names)
+
+
+def write_collapsed(stacks: Counter, directory: Path, label: str) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    safe_label = "".join(char if char.isalnum() or char in "-_." else "_" for char in label)[:100]
+    path = directory / f"{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}-{safe_label}.collapsed"
+    path.write_text("".join(f"{stack} {count}\n" for stack, count in stacks.most_common()))
+    return path
+
+
+class _TaskProfile:
+    __slots__ = ("task", "stacks", "timer")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.stacks = Counter()
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class HandlerProfiler(BaseMiddleware):
+    """Inner-middleware на обсерверах подій, як HandlerTimer у планувальнику."""
+
+    def __init__(self, threshold: float, sample_rate: float = 0.0, interval: float = 0.005,
+                 directory: str | Path = "profiles"):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.directory = Path(directory)
+        self.profiled = 0
+
+    def setup(self, dispatcher: Dispatcher) -> None:
+        for event_name, observer in dispatcher.observers.items():
+            if event_name not in {"update", "error"}:
+                observer.middleware(self)
+
+    def _sample(self, profile: _TaskProfile) -> None:
+        profile.stacks[collapse_task(profile.task)] += 1
+        profile.timer = asyncio.get_running_loop().call_later(self.interval, self._sample, profile)
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: dict[str, Any]) -> Any:
+        sampled = self.sample_rate and random.random() < self.sample_rate
+        profile = _TaskProfile(asyncio.current_task())
+        profile.timer = asyncio.get_running_loop().call_later(
+            0 if sampled else self.threshold, self._sample, profile,
+        )
+        started_at = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            profile.timer.cancel()
+            if profile.stacks:
+                self.save(data, event, profile, time.perf_counter() - started_at)
+
+    def save(self, data: dict[str, Any], event: TelegramObject, profile: _TaskProfile, duration: float) -> None:
+        self.profiled += 1
+        handler_object = data.get("handler")
+        name = getattr(getattr(handler_object, "callback", None), "__name__", type(event).__name__)
+        path = write_collapsed(profile.stacks, self.directory, name)
+        logger.info(
+            "Profiled handler %s: %.1f ms, %s samples -> %s",
+            name, duration * 1000, sum(profile.stacks.values()), path,
+        )
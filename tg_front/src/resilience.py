@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Any, Callable
+
+import aiohttp
+
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class BackendError(Exception):
+    """Бекенд недоступний: помилка з'єднання, таймаут, 5xx або відкритий запобіжник."""
+
+
+class CircuitOpenError(BackendError):
+    """Запит не виконувався: запобіжник відкритий після серії збоїв."""
+
+
+class RetryPolicy:
+    """Експоненційна затримка з повним джитером: випадкове значення з [0, min(max_delay, base * 2^n)]."""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.1, max_delay: float = 1.0):
+        # attempts - загальна кількість спроб, включно з першою
+        if attempts < 1:
+            raise ValueError(f"RetryPolicy needs at least one attempt, got {attempts}")
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Запобіжник: після `failure_threshold` збоїв поспіль відкривається і одразу відмовляє,
+    через `reset_timeout` секунд пропускає один пробний запит (half-open).
+    Успіх пробного запиту закриває запобіжник, збій - знову відкриває.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opened = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Пробний запит завершився без відповіді й без збою бекенду (скасований) - наступний запит знову пробний."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("Circuit breaker closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning("Circuit breaker opened after %s failures", self.failures)
+                self.opened += 1
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+
+class ResilientClient:
+    """
+    Обгортка над aiohttp-сесією до Django API.
+    Ідемпотентні запити повторюються з джитером після збоїв з'єднання, таймаутів і 5xx;
+    неідемпотентні виконуються один раз. Усі збої рахуються запобіжником.
+    Відповіді 4xx - це не збій бекенду: вони повертаються викликачу як є.
+    """
+
+    def __init__(self, retry: RetryPolicy | None = None, breaker: CircuitBreaker | None = None,
+                 timeout: float | None = None, loads: Callable[[bytes], Any] = json.loads):
+        self.loads = loads
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.short_circuited = 0
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited,
+            "breaker_state": self.breaker.state,
+            "breaker_opened": self.breaker.opened,
+        }
+
+    async def request(self, session: aiohttp.ClientSession, method: str, url: str, *,
+                      json: Any = None, idempotent: bool | None = None) -> tuple[int, Any]:
+        """Повертає (HTTP-статус, розібраний JSON). Кидає BackendError, якщо відповіді так і не отримано."""
+        status, body = await self.request_raw(session, method, url, json=json, idempotent=idempotent)
+        try:
+            return status, self.loads(body) if body else None
+        except ValueError as exc:
+            raise BackendError(f"{method} {url}: invalid JSON in response: {exc}")
+
+    async def request_raw(self, session: aiohttp.ClientSession, method: str, url: str, *,
+                          json: Any = None, idempotent: bool | None = None) -> tuple[int, bytes]:
+        """
+        Повертає (HTTP-статус, тіло відповіді) - для розбору одразу в pydantic-модель (model_validate_json).
+        Кидає BackendError, якщо відповіді так і не отримано.
+        """
+        if idempotent is None:
+            idempotent = method in ("GET", "HEAD", "PUT", "DELETE")
+        attempts = self.retry.attempts if idempotent else 1
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                self.short_circuited += 1
+                raise CircuitOpenError(f"Backend circuit is open: {method} {url}")
+            self.requests += 1
+            try:
+                with tracing.span(f"{method} backend", tracing.SPAN_KIND_CLIENT, **{
+                    "http.method": method, "http.url": url, "http.attempt": attempt + 1,
+                }) as span:
+                    try:
+                        async with session.request(method, url, json=json, timeout=self.timeout,
+                                                   headers=tracing.inject_headers()) as response:
+                            if span is not None:
+                                span.attributes["http.status_code"] = response.status
+                            if response.status < 500:
+                                body = await response.read()
+                                self.breaker.record_success()
+                                return response.status, body
+                            error = BackendError(f"{method} {url}: HTTP {response.status}")
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                        error = BackendError(f"{method} {url}: {exc!r}")
+                    if span is not None:
+                        span.error = str(error)
+            except BaseException:
+                # Скасування або неочікуваний виняток: про стан бекенду нічого не відомо,
+                # але пробу треба звільнити - інакше half-open запобіжник відмовлятиме назавжди
+                self.breaker.release_probe()
+                raise
+            self.failures += 1
+            self.breaker.record_failure()
+            if attempt + 1 < attempts:
+                self.retries += 1
+                await asyncio.sleep(self.retry.delay(attempt))
+        raise error
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject
+
+from .utils import LatencyStats, RateMeter
+
+Handler = Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]]
+
+
+class _ChatLane:
+    """Черга одного чату: asyncio.Lock віддає блокування в порядку очікування (FIFO)."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class UpdateScheduler(BaseMiddleware):
+    """
+    Планувальник обробки оновлень.
+    Outer-middleware на dp.update: оновлення одного чату (або користувача, якщо чату немає)
+    обробляються строго по черзі, різні чати - паралельно, але не більше `limit` одночасно.
+    Inner-middleware на обсерверах подій міряє тривалість кожного хендлера.
+
+    Порядок зберігається, бо aiogram створює задачі в порядку надходження оновлень,
+    а до блокування чату задача доходить без жодного перемикання контексту.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self._lanes: dict[int, _ChatLane] = {}
+        self.waiting = 0
+        self.running = 0
+        self.max_waiting = 0
+        self.processed = 0
+        self.throughput = RateMeter()
+        self.wait_time = LatencyStats()
+        self.handler_latency: dict[str, LatencyStats] = {}
+
+    def setup(self, dispatcher: Dispatcher) -> None:
+        dispatcher.update.outer_middleware(self)
+        timer = HandlerTimer(self)
+        for event_name, observer in dispatcher.observers.items():
+            if event_name not in {"update", "error"}:
+                observer.middleware(timer)
+
+    @staticmethod
+    def _lane_key(data: dict[str, Any]) -> int | None:
+        chat = data.get("event_chat")
+        if chat is not None:
+            return chat.id
+        user = data.get("event_from_user")
+        if user is not None:
+            return user.id
+        return None
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: dict[str, Any]) -> Any:
+        key = self._lane_key(data)
+        if key is None:
+            return await self._run(handler, event, data, time.perf_counter())
+        queued_at = time.perf_counter()
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _ChatLane()
+        lane.users += 1
+        # Глибина черги - оновлення, що чекають на свій чат або на вільне місце в ліміті
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        waiting = True
+        try:
+            async with lane.lock:
+                waiting = False
+                self.waiting -= 1
+                return await self._run(handler, event, data, queued_at)
+        finally:
+            if waiting:
+                self.waiting -= 1
+            lane.users -= 1
+            if not lane.users:
+                del self._lanes[key]
+
+    async def _run(self, handler: Handler, event: TelegramObject, data: dict[str, Any], queued_at: float) -> Any:
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.wait_time.observe(time.perf_counter() - queued_at)
+        self.running += 1
+        try:
+            return await handler(event, data)
+        finally:
+            self.running -= 1
+            self.processed += 1
+            self.throughput.mark()
+            self._semaphore.release()
+
+    def observe_handler(self, name: str, duration: float) -> None:
+        stats = self.handler_latency.get(name)
+        if stats is None:
+            stats = self.handler_latency[name] = LatencyStats()
+        stats.observe(duration)
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            # Чати, в яких є оновлення в обробці або в черзі
+            "active_chats": len(self._lanes),
+            "processed": self.processed,
+            "updates_per_second": self.throughput.rate(),
+            "wait": self.wait_time.summary(),
+            "handlers": {name: stats.summary() for name, stats in self.handler_latency.items()},
+        }
+
+
+class HandlerTimer(BaseMiddleware):
+    """Inner-middleware: час виконання хендлера (без перевірки фільтрів)."""
+
+    def __init__(self, scheduler: UpdateScheduler):
+        self.scheduler = scheduler
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: dict[str, Any]) -> Any:
+        handler_object = data.get("handler")
+        name = getattr(getattr(handler_object, "callback", None), "__name__", type(event).__name__)
+        started_at = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            self.scheduler.observe_handler(name, time.perf_counter() - started_at)
@@ -0,0 +1,188 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageCaption, EditMessageReplyMarkup, EditMessageText, Response, TelegramMethod
+
+from . import tracing
+from .utils import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+EDIT_METHODS = (EditMessageText, EditMessageReplyMarkup, EditMessageCaption)
+
+
+class TokenBucket:
+    """
+    Відро токенів з резервуванням: reserve() одразу забирає токен і повертає, скільки треба зачекати.
+    Борг (від'ємна кількість токенів) впорядковує очікувачів у порядку звернення.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated_at = clock()
+
+    def _refill(self) -> float:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        return now
+
+    def reserve(self) -> float:
+        self._refill()
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def pause(self, seconds: float) -> None:
+        """Наступний токен з'явиться не раніше ніж через `seconds` (відповідь 429 з retry_after)."""
+        self._refill()
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+    @property
+    def idle(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity
+
+
+def is_group_chat(chat_id: int | str) -> bool:
+    # Групи й канали мають від'ємні id, канали також адресуються як @username
+    return isinstance(chat_id, str) or chat_id < 0
+
+
+class _PendingEdit:
+    __slots__ = ("method", "future")
+
+    def __init__(self, method: TelegramMethod, future: asyncio.Future):
+        self.method = method
+        self.future = future
+
+
+class SendQueue(BaseRequestMiddleware):
+    """
+    Middleware сесії бота, що тримає вихідні запити в лімітах Telegram.
+    Запити з chat_id чекають на токен свого чату (приватний ~1/с, група ~20/хв), потім на глобальний (~30/с).
+    На 429 чат призупиняється на retry_after і запит повторюється.
+    Поки редагування повідомлення чекає в черзі, новіше редагування того ж повідомлення
+    заміщує його - в Telegram іде лише останній стан, а обидва виклики отримують одну відповідь.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30,
+        chat_rate: float = 1,
+        group_rate: float = 20 / 60,
+        burst: int = 1,
+        max_retries: int = 3,
+        max_idle_chats: int = 10_000,
+    ):
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.max_idle_chats = max_idle_chats
+        self._global = TokenBucket(global_rate, burst)
+        self._chats: dict[int | str, TokenBucket] = {}
+        self._pending_edits: dict[tuple, _PendingEdit] = {}
+        self.sent = 0
+        self.coalesced = 0
+        self.retried = 0
+        self.throttled = LatencyStats()
+
+    def stats(self) -> dict:
+        return {
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "retried": self.retried,
+            "chats": len(self._chats),
+            "pending_edits": len(self._pending_edits),
+            "throttled": self.throttled.summary(),
+        }
+
+    def _chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_idle_chats:
+                # Відра, що встигли наповнитись, нічого не пам'ятають - їх можна викинути
+                self._chats = {key: value for key, value in self._chats.items() if not value.idle}
+            rate = self.group_rate if is_group_chat(chat_id) else self.chat_rate
+            bucket = self._chats[chat_id] = TokenBucket(rate, self.burst)
+        return bucket
+
+    async def _acquire(self, chat_id: int | str) -> None:
+        started_at = time.monotonic()
+        for bucket in (self._chat_bucket(chat_id), self._global):
+            delay = bucket.reserve()
+            if delay:
+                await asyncio.sleep(delay)
+        self.throttled.observe(time.monotonic() - started_at)
+
+    async def _request(self, make_request: NextRequestMiddlewareType, bot: Bot, method: TelegramMethod,
+                       chat_id: int | str) -> Response:
+        for attempt in itertools.count():
+            try:
+                with tracing.span(f"telegram {method.__api_method__}", tracing.SPAN_KIND_CLIENT,
+                                  **{"telegram.chat_id": chat_id, "telegram.attempt": attempt + 1}):
+                    response = await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning("Flood control in chat %s, retry in %s s", chat_id, exc.retry_after)
+                self.retried += 1
+                self._chat_bucket(chat_id).pause(exc.retry_after)
+                await self._acquire(chat_id)
+                continue
+            self.sent += 1
+            return response
+
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot: Bot, method: TelegramMethod) -> Any:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+        if not isinstance(method, EDIT_METHODS):
+            await self._acquire(chat_id)
+            return await self._request(make_request, bot, method, chat_id)
+
+        key = (chat_id, method.message_id)
+        pending = self._pending_edits.get(key)
+        if pending is not None and type(pending.method) is type(method):
+            pending.method = method
+            self.coalesced += 1
+            return await asyncio.shield(pending.future)
+        pending = self._pending_edits[key] = _PendingEdit(method, asyncio.get_running_loop().create_future())
+        try:
+            await self._acquire(chat_id)
+        except BaseException:
+            pending.future.cancel()
+            raise
+        finally:
+            if self._pending_edits.get(key) is pending:
+                del self._pending_edits[key]
+        # Після отримання токена надсилаємо найсвіжіше з редагувань, що накопичились
+        try:
+            response = await self._request(make_request, bot, pending.method, chat_id)
+        except Exception as exc:
+            pending.future.set_exception(exc)
+            # Виняток отримає цей виклик; позначаємо його як оброблений для тих, хто не чекає
+            pending.future.exception()
+            raise
+        except BaseException:
+            # Виклик-власник скасовано - без цього об'єднані з ним виклики чекали б на future вічно
+            pending.future.cancel()
+            raise
+        pending.future.set_result(response)
+        return response
@@ -13,6 +13,16 @@ class UserShema(BaseModel):
     added_to_attachment_menu: bool | None = Field(default=None, description="Is user added to attachment menu")
     is_active: bool = Field(default=True, description="Is user active")
 
+    def normalized(self) -> "UserShema":
+        """
+        Профіль у єдиному вигляді для кешу й порівняння незалежно від джерела (JSON бекенду чи aiogram User):
+        Telegram не надсилає прапорці зі значенням false (None), а бекенд повертає їх як False.
+        """
+        return self.model_copy(update={
+            "is_premium": bool(self.is_premium),
+            "added_to_attachment_menu": bool(self.added_to_attachment_menu),
+        })
+
     @classmethod
     def user_from_dict(cls, user_dict: dict) -> "UserShema":
         """
@@ -46,3 +56,25 @@ class UserShema(BaseModel):
             added_to_attachment_menu=user.added_to_attachment_menu,
             is_active=True,
         )
+
+
+class GameShema(BaseModel):
+    id: int = Field(..., description="Game ID")
+    player1_first: bool = Field(..., description="Player 1 goes first")
+    player1_symbol: str = Field(..., description="Player 1 sign (❌ or ⭕)")
+    player2_symbol: str = Field(..., description="Player 2 sign (❌ or ⭕)")
+
+
+class GameStateShema(BaseModel):
+    id: int | None = Field(default=None, description="Game state ID (None for the initial state of a game without states)")
+    cells: str = Field(..., description="Board cells: X, 0 or space", min_length=9, max_length=9)
+
+
+class GameProgressShema(BaseModel):
+    game: GameShema
+    state: GameStateShema
+    ply: int = Field(..., description="Number of moves made", ge=0, le=9)
+    next_symbol: str | None = Field(default=None, description="Sign of the player to move")
+    winner: str | None = Field(default=None, description="Sign of the winner")
+    winning_cells: list[int] = Field(default_factory=list)
+    finished: bool = Field(default=False, description="Game is over")
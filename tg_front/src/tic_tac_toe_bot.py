@@ -1,10 +1,13 @@
 import logging
 
 from aiogram import html, Dispatcher
-from aiogram.filters import CommandStart
-from aiogram.types import Message
+from aiogram.filters import Command, CommandObject, CommandStart, ExceptionTypeFilter
+from aiogram.types import CallbackQuery, ErrorEvent, Message
 
-from .api_requests import get_tguser, create_tguser
+from .api_requests import get_cached_tguser, get_game, make_move, sync_tguser
+from .board import board_messages, move_codec
+from .callback_codec import MoveFilter, MoveTap
+from .resilience import BackendError
 from .shemas import UserShema
 
 logger = logging.getLogger(__name__)
@@ -22,7 +25,7 @@ async def command_start_handler(message: Message) -> None:
     user = UserShema.user_from_aiogram(message.from_user)
     logger.info(f"User data: {user} started the bot")
     # перевірити, чи є в базі даних юзер з таким id
-    user_from_db = await get_tguser(user, message.bot)
+    user_from_db = await get_cached_tguser(user, message.bot)
     logger.info(f"User data from DB: {user_from_db}")
     if user_from_db:
         # якщо є - перевірити, чи активний
@@ -37,6 +40,63 @@ async def command_start_handler(message: Message) -> None:
     await message.answer(f"Hello, {html.bold(message.from_user.full_name)}!")
 
 
+@dp.message(Command("game"))
+async def game_handler(message: Message, command: CommandObject) -> None:
+    """
+    /game <id> - надсилає дошку гри; далі ходи редагують це повідомлення
+    """
+    if not command.args or not command.args.isdigit():
+        await message.answer("Usage: /game <game id>")
+        return
+    progress = await get_game(message.from_user.id, int(command.args), message.bot)
+    if progress is None:
+        await message.answer("Game not found.")
+        return
+    await board_messages.send(message.bot, message.chat.id, progress)
+
+
+@dp.callback_query(MoveFilter(move_codec))
+async def move_handler(callback: CallbackQuery, move: MoveTap) -> None:
+    """
+    Хід натисканням на клітинку: одне редагування клавіатури замість нового повідомлення
+    """
+    if board_messages.is_stale(move):
+        await callback.answer("The board has changed, try again.")
+        return
+    progress = await make_move(callback.from_user.id, move.game_id, move.cell, move.ply, callback.bot)
+    if progress is None:
+        await callback.answer("This move is not possible.")
+        return
+    if callback.message is not None:
+        await board_messages.update_game(callback.bot, progress, callback.message.chat.id, callback.message.message_id)
+    if progress.winner:
+        await callback.answer(f"{progress.winner} wins!")
+    elif progress.finished:
+        await callback.answer("Draw!")
+    else:
+        await callback.answer()
+
+
+@dp.callback_query()
+async def noop_handler(callback: CallbackQuery) -> None:
+    """
+    Зайняті клітинки, завершені ігри та кнопки з непідписаними (підробленими) даними
+    """
+    await callback.answer()
+
+
+@dp.error(ExceptionTypeFilter(BackendError))
+async def backend_error_handler(event: ErrorEvent) -> None:
+    """
+    Бекенд недоступний: коротко відповідаємо користувачу замість мовчазного падіння хендлера
+    """
+    logger.warning("Backend error while handling update %s: %s", event.update.update_id, event.exception)
+    if event.update.callback_query:
+        await event.update.callback_query.answer("Service is temporarily unavailable, try again later.")
+    elif event.update.message:
+        await event.update.message.answer("Service is temporarily unavailable, try again later.")
+
+
 @dp.message()
 async def echo_handler(message: Message) -> None:
     """
@@ -46,7 +106,7 @@ async def echo_handler(message: Message) -> None:
     """
     user = UserShema.user_from_aiogram(message.from_user)
     logger.info(f"User data: {user} started the bot")
-    # перевірити, чи є в базі даних юзер з таким id
-    user_db = await create_tguser(user, message.bot)
+    # додати/оновити юзера в базі даних, якщо профіль змінився з останньої синхронізації
+    user_db = await sync_tguser(user, message.bot)
 
     await message.answer(f"Nice try! user added/updated to DB: {user_db}")
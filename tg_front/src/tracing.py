@@ -0,0 +1,232 @@
+"""
+Трасування оновлень Telegram: span оновлення -> span хендлера -> span-и запитів до Django API і Bot API.
+
+Контекст trace живе в ContextVar задачі, що обробляє оновлення; ResilientClient додає його
+до запитів у бекенд заголовком traceparent (W3C Trace Context), а бекенд продовжує той самий trace
+аж до SQL. Span-и експортуються пачками у форматі OTLP/JSON: рядок на пачку у файл
+та/або POST на OTLP/HTTP-колектор (/v1/traces). Поза трасованим оновленням span() нічого не робить.
+"""
+import asyncio
+import json
+import logging
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import aiohttp
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject, Update
+
+from .scheduler import Handler
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+SPAN_KIND_CONSUMER = 5
+
+
+def otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, trace_id: str, parent_id: str | None, name: str, kind: int = SPAN_KIND_INTERNAL,
+                 attributes: dict | None = None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": otlp_value(value)} for key, value in self.attributes.items()],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error:
+            span["status"] = {"code": 2, "message": self.error}
+        return span
+
+
+class SpanExporter:
+    """Буфер готових span-ів; скидається раз на `flush_interval` секунд або при заповненні пачки."""
+
+    def __init__(self, service_name: str, path: str = "", endpoint: str = "",
+                 batch_size: int = 512, flush_interval: float = 1.0, max_buffer: int = 10_000):
+        self.service_name = service_name
+        self.path = path
+        self.endpoint = endpoint.rstrip("/")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.exported = 0
+        self.dropped = 0
+        self._buffer: list[Span] = []
+        self._session: aiohttp.ClientSession | None = None
+        self._task: asyncio.Task | None = None
+        self._flushing: asyncio.Task | None = None
+
+    def export(self, span: Span) -> None:
+        if len(self._buffer) >= self.max_buffer:
+            # Трасування не повинно тримати пам'ять, якщо колектор недоступний
+            self.dropped += 1
+            return
+        self._buffer.append(span)
+        if len(self._buffer) >= self.batch_size and (self._flushing is None or self._flushing.done()):
+            self._flushing = asyncio.get_running_loop().create_task(self.flush())
+
+    def payload(self, spans: list[Span]) -> dict:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": otlp_value(self.service_name)}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in spans]}],
+        }]}
+
+    def _append(self, body: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(body + "\n")
+
+    async def flush(self) -> None:
+        spans, self._buffer = self._buffer, []
+        if not spans:
+            return
+        body = json.dumps(self.payload(spans), separators=(",", ":"))
+        try:
+            if self.path:
+                await asyncio.to_thread(self._append, body)
+            if self.endpoint:
+                if self._session is None:
+                    self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))
+                async with self._session.post(f"{self.endpoint}/v1/traces", data=body,
+                                              headers={"Content-Type": "application/json"}) as response:
+                    response.raise_for_status()
+            self.exported += len(spans)
+        except Exception:
+            logger.exception("Failed to export %s spans", len(spans))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        await self.flush()
+        if self._session is not None:
+            await self._session.close()
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_exporter: SpanExporter | None = None
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def inject_headers() -> dict[str, str]:
+    """Заголовок traceparent поточного span-а для запиту в бекенд; поза trace - порожній словник."""
+    parent = _current_span.get()
+    return {TRACEPARENT_HEADER: parent.traceparent} if parent is not None else {}
+
+
+@contextmanager
+def activate(new_span: Span):
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except Exception as exc:
+        new_span.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _current_span.reset(token)
+        new_span.end_ns = time.time_ns()
+        if _exporter is not None:
+            _exporter.export(new_span)
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """Дочірній span поточного; поза трасованим оновленням - нічого не робить і повертає None."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    with activate(Span(parent.trace_id, parent.span_id, name, kind, attributes)) as child:
+        yield child
+
+
+class UpdateTracer(BaseMiddleware):
+    """
+    Outer-middleware на dp.update: кореневий span оновлення (разом з очікуванням у планувальнику),
+    якщо оновлення потрапило у вибірку `sample_rate`. Inner-middleware додає span хендлера.
+    Має реєструватись раніше за UpdateScheduler, щоб бути зовнішнім.
+    """
+
+    def __init__(self, exporter: SpanExporter, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def setup(self, dispatcher: Dispatcher) -> None:
+        global _exporter
+        _exporter = self.exporter
+        dispatcher.update.outer_middleware(self)
+        handler_span = _HandlerSpan()
+        for event_name, observer in dispatcher.observers.items():
+            if event_name not in {"update", "error"}:
+                observer.middleware(handler_span)
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: dict[str, Any]) -> Any:
+        if random.random() >= self.sample_rate:
+            return await handler(event, data)
+        attributes = {}
+        if isinstance(event, Update):
+            attributes["telegram.update_id"] = event.update_id
+            attributes["telegram.update_type"] = event.event_type
+        chat = data.get("event_chat")
+        if chat is not None:
+            attributes["telegram.chat_id"] = chat.id
+        name = f"update {attributes.get('telegram.update_type', type(event).__name__)}"
+        with activate(Span(secrets.token_hex(16), None, name, SPAN_KIND_CONSUMER, attributes)):
+            return await handler(event, data)
+
+
+class _HandlerSpan(BaseMiddleware):
+    async def __call__(self, handler: Handler, event: TelegramObject, data: dict[str, Any]) -> Any:
+        handler_object = data.get("handler")
+        name = getattr(getattr(handler_object, "callback", None), "__name__", type(event).__name__)
+        with span(f"handler {name}", **{"code.function": name}):
+            return await handler(event, data)
@@ -1,13 +1,179 @@
+import json
+import math
+import time
+from collections import deque
+from types import SimpleNamespace
+
 import aiohttp
 from aiogram import Bot
 import logging
 
+from settings import settings
+
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:  # orjson необов'язковий - без нього працює стандартний json
+    orjson = None
+
+
+def json_dumps(obj) -> str:
+    """Серіалізатор тіл запитів aiohttp (json=...)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+class LatencyStats:
+    """Лічильник тривалостей: кількість, сума, максимум і останні значення для перцентилів."""
+
+    def __init__(self, samples: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=samples)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self._recent.append(value)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._recent:
+            return None
+        values = sorted(self._recent)
+        return values[max(0, math.ceil(q * len(values)) - 1)]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else None,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class RateMeter:
+    """Кількість подій за секунду в ковзному вікні (лічильники по секундах)."""
+
+    def __init__(self, window: int = 60, clock=time.monotonic):
+        self.window = window
+        self.clock = clock
+        self._buckets: deque[list] = deque()
+
+    def mark(self, count: int = 1) -> None:
+        second = int(self.clock())
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += count
+        else:
+            self._buckets.append([second, count])
+        self._expire(second)
+
+    def _expire(self, now: int) -> None:
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+
+    def rate(self) -> float:
+        self._expire(int(self.clock()))
+        return sum(count for _, count in self._buckets) / self.window
+
+
+class BackendClientStats:
+    """Статистика HTTP-клієнта до бекенду, яку збирають trace-хуки aiohttp."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.latency = LatencyStats()
+        self.queueing = LatencyStats()
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "latency": self.latency.summary(),
+            "queueing": self.queueing.summary(),
+        }
+
+
+backend_stats = BackendClientStats()
+
+
+def create_trace_config(stats: BackendClientStats) -> aiohttp.TraceConfig:
+    """Trace-хуки: час запиту, очікування вільного з'єднання в пулі та повторне використання з'єднань."""
+    trace_config = aiohttp.TraceConfig(trace_config_ctx_factory=SimpleNamespace)
+
+    async def on_request_start(session, ctx, params):
+        ctx.started_at = time.perf_counter()
+
+    async def on_request_end(session, ctx, params):
+        stats.requests += 1
+        stats.latency.observe(time.perf_counter() - ctx.started_at)
+
+    async def on_request_exception(session, ctx, params):
+        stats.requests += 1
+        stats.errors += 1
+        stats.latency.observe(time.perf_counter() - ctx.started_at)
+
+    async def on_connection_queued_start(session, ctx, params):
+        ctx.queued_at = time.perf_counter()
+
+    async def on_connection_queued_end(session, ctx, params):
+        stats.queueing.observe(time.perf_counter() - ctx.queued_at)
+
+    async def on_connection_create_end(session, ctx, params):
+        stats.connections_created += 1
+
+    async def on_connection_reuseconn(session, ctx, params):
+        stats.connections_reused += 1
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    trace_config.on_connection_queued_start.append(on_connection_queued_start)
+    trace_config.on_connection_queued_end.append(on_connection_queued_end)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    return trace_config
+
+
+def create_backend_session(stats: BackendClientStats = backend_stats) -> aiohttp.ClientSession:
+    """Сесія до Django API з налаштованим пулом з'єднань, таймаутами та кешем DNS (host.docker.internal)."""
+    connector = aiohttp.TCPConnector(
+        limit=settings.BACKEND_CONNECTION_LIMIT,
+        limit_per_host=settings.BACKEND_CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout=settings.BACKEND_KEEPALIVE_TIMEOUT,
+        use_dns_cache=True,
+        ttl_dns_cache=settings.BACKEND_DNS_CACHE_TTL,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.BACKEND_TIMEOUT_TOTAL,
+        connect=settings.BACKEND_TIMEOUT_CONNECT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        # DRF обирає JSON-рендерер за Accept, тому ?format=json у кожному URL не потрібен
+        headers={"Accept": "application/json"},
+        json_serialize=json_dumps,
+        trace_configs=[create_trace_config(stats)],
+    )
+
 
 async def add_aiohttp_client_session(bot: Bot):
     # Створюємо сесію aiohttp під час запуску бота
-    bot.http_session = aiohttp.ClientSession()
+    bot.http_session = create_backend_session()
     logger.info("Aiohttp client session created.")
 
 
@@ -15,7 +181,7 @@ async def close_aiohttp_client_session(bot: Bot):
     # Закриваємо сесію aiohttp під час завершення роботи бота
     if hasattr(bot, 'http_session'):
         await bot.http_session.close()
-    logger.info("Aiohttp client session closed.")
+    logger.info("Aiohttp client session closed. Backend client stats: %s", backend_stats.summary())
 
 
 async def make_api_request(url, bot: Bot):
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import secrets
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiogram.webhook.aiohttp_server import setup_application
+from aiohttp import web
+from pydantic import ValidationError
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookUpdateQueue:
+    """
+    Прийом оновлень від Telegram через webhook.
+    HTTP-обробник лише перевіряє секрет, одразу передає оновлення в Dispatcher окремою задачею
+    й відповідає 200. Порядок у межах чату та ліміт одночасної обробки забезпечує UpdateScheduler,
+    тож зайнятий чат не блокує решту.
+    Якщо непідтверджених обробкою оновлень уже `queue_size` - відповідаємо 503,
+    і Telegram повторить доставку пізніше.
+    """
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, secret: str, queue_size: int = 1000):
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.secret = secret
+        self.queue_size = queue_size
+        self._tasks: set[asyncio.Task] = set()
+        self.received = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "received": self.received,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "failed": self.failed,
+            "queue_depth": len(self._tasks),
+        }
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if not secrets.compare_digest(request.headers.get(SECRET_HEADER, ""), self.secret):
+            return web.Response(status=401)
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": self.bot})
+        except (ValueError, ValidationError):
+            return web.Response(status=400)
+        if len(self._tasks) >= self.queue_size:
+            self.rejected += 1
+            return web.Response(status=503)
+        # Задачі створюються в порядку надходження - на цьому тримається черговість у чаті
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.received += 1
+        return web.Response()
+
+    async def _process(self, update: Update) -> None:
+        try:
+            await self.dispatcher.feed_update(self.bot, update)
+            self.processed += 1
+        except Exception:
+            self.failed += 1
+            logger.exception("Failed to process update %s", update.update_id)
+
+    async def join(self) -> None:
+        """Чекає, доки оброблено всі прийняті оновлення."""
+        while self._tasks:
+            await asyncio.wait(set(self._tasks))
+
+    async def stop(self, *args) -> None:
+        # Даємо дообробити те, що вже підтверджено Telegram
+        try:
+            await asyncio.wait_for(self.join(), timeout=10)
+        except TimeoutError:
+            logger.warning("Webhook updates not drained on shutdown: %s updates lost", len(self._tasks))
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def setup(self, app: web.Application, path: str) -> None:
+        app.router.add_post(path, self.handle)
+        app.on_shutdown.append(self.stop)
+
+
+async def run_webhook(dispatcher: Dispatcher, bot: Bot, settings) -> None:
+    """Запускає aiohttp-сервер для webhook і реєструє webhook у Telegram."""
+    secret = settings.WEBHOOK_SECRET or secrets.token_urlsafe(32)
+    updates = WebhookUpdateQueue(dispatcher, bot, secret, queue_size=settings.WEBHOOK_QUEUE_SIZE)
+    app = web.Application()
+    updates.setup(app, settings.WEBHOOK_PATH)
+    setup_application(app, dispatcher, bot=bot)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, settings.WEBHOOK_HOST, settings.WEBHOOK_PORT)
+    await site.start()
+    await bot.set_webhook(
+        f"{settings.WEBHOOK_BASE_URL.rstrip('/')}{settings.WEBHOOK_PATH}",
+        secret_token=secret,
+        allowed_updates=dispatcher.resolve_used_update_types(),
+    )
+    logger.info("Webhook server listening on %s:%s", settings.WEBHOOK_HOST, settings.WEBHOOK_PORT)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        logger.info("Webhook stats: %s", updates.stats())
+        await runner.cleanup()
@@ -0,0 +1,8 @@
+import os
+
+# settings читаються під час імпорту модулів src; тестам справжні значення не потрібні
+for name in ("BOT_TOKEN", "BOT_NAME", "BOT_USERNAME", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB",
+             "POSTGRES_HOST_CONTAINER", "DJANGO_HOST"):
+    os.environ.setdefault(name, "test")
+for name in ("POSTGRES_PORT_CONTAINER", "DJANGO_PORT"):
+    os.environ.setdefault(name, "0")
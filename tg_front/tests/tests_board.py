@@ -0,0 +1,89 @@
+import unittest
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import EditMessageReplyMarkup
+
+from src.board import EMPTY_CELL, NOOP, BoardMessages, move_codec, render_board, render_progress
+from src.callback_codec import MoveTap
+from src.shemas import GameProgressShema
+
+
+def progress(cells, ply, finished=False, winning_cells=(), state_id=None):
+    return GameProgressShema.model_validate({
+        "game": {"id": 42, "player1_first": True, "player1_symbol": "❌", "player2_symbol": "⭕"},
+        "state": {"id": state_id, "cells": cells},
+        "ply": ply,
+        "finished": finished,
+        "winning_cells": list(winning_cells),
+    })
+
+
+class FakeBot:
+    def __init__(self, error: str | None = None):
+        self.edits = []
+        self.error = error
+
+    async def edit_message_reply_markup(self, chat_id, message_id, reply_markup):
+        if self.error:
+            raise TelegramBadRequest(EditMessageReplyMarkup(chat_id=chat_id, message_id=message_id), self.error)
+        self.edits.append((chat_id, message_id, reply_markup))
+        return True
+
+
+class RenderBoardTestCase(unittest.TestCase):
+    def test_empty_cells_carry_signed_moves(self):
+        markup = render_board(42, "X   0    ")
+        buttons = [button for row in markup.inline_keyboard for button in row]
+        self.assertEqual(len(markup.inline_keyboard), 3)
+        self.assertEqual([button.text for button in buttons[:5]], ["❌", EMPTY_CELL, EMPTY_CELL, EMPTY_CELL, "⭕"])
+        self.assertEqual(buttons[0].callback_data, NOOP)
+        self.assertEqual(move_codec.decode(buttons[1].callback_data), MoveTap(game_id=42, ply=2, cell=1))
+        self.assertEqual(move_codec.decode(buttons[8].callback_data), MoveTap(game_id=42, ply=2, cell=8))
+
+    def test_finished_board_marks_winner_and_disables_cells(self):
+        markup = render_progress(progress("XXX00    ", 5, finished=True, winning_cells=(0, 1, 2)))
+        buttons = [button for row in markup.inline_keyboard for button in row]
+        self.assertEqual([button.text for button in buttons[:3]], ["❎"] * 3)
+        self.assertEqual({button.callback_data for button in buttons}, {NOOP})
+
+    def test_same_state_renders_same_object(self):
+        self.assertIs(render_board(42, "X        "), render_board(42, "X        "))
+        self.assertIsNot(render_board(42, "X        "), render_board(43, "X        "))
+
+
+class BoardMessagesTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.boards = BoardMessages()
+        self.bot = FakeBot()
+        self.initial = progress(" " * 9, 0, state_id=None)
+        self.boards.register(42, 1, 10, render_progress(self.initial))
+        self.boards.register(42, 2, 20, render_progress(self.initial))
+
+    async def test_unchanged_board_is_not_edited(self):
+        self.assertFalse(await self.boards.update(self.bot, 1, 10, render_progress(self.initial)))
+        # Рівна, але не та сама клавіатура теж не надсилається
+        self.assertFalse(await self.boards.update(self.bot, 1, 10, render_progress(self.initial).model_copy(deep=True)))
+        self.assertEqual(self.bot.edits, [])
+        self.assertEqual(self.boards.stats()["skipped"], 2)
+
+    async def test_move_updates_every_board_of_game_once(self):
+        moved = progress("    X    ", 1, state_id=7)
+        await self.boards.update_game(self.bot, moved, 1, 10)
+        self.assertEqual(sorted((chat_id, message_id) for chat_id, message_id, _ in self.bot.edits), [(1, 10), (2, 20)])
+        await self.boards.update_game(self.bot, moved, 2, 20)
+        self.assertEqual(len(self.bot.edits), 2)
+        self.assertEqual(self.boards.stats()["edits"], 2)
+
+        # Натискання на дошці до цього ходу застаріле
+        self.assertTrue(self.boards.is_stale(MoveTap(game_id=42, ply=0, cell=0)))
+        self.assertFalse(self.boards.is_stale(MoveTap(game_id=42, ply=1, cell=0)))
+
+    async def test_not_modified_error_counts_as_skip(self):
+        self.bot.error = "Bad Request: message is not modified"
+        self.assertTrue(await self.boards.update(self.bot, 3, 30, render_progress(self.initial)))
+        self.assertEqual(self.boards.stats()["skipped"], 1)
+        self.assertFalse(await self.boards.update(self.bot, 3, 30, render_progress(self.initial)))
+
+        self.bot.error = "Bad Request: message to edit not found"
+        with self.assertRaises(TelegramBadRequest):
+            await self.boards.update(self.bot, 3, 31, render_progress(self.initial))
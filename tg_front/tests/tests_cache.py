@@ -0,0 +1,81 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import aiohttp
+from aiogram.types import User
+
+from src.api_requests import backend_client, get_cached_tguser, profile_cache, sync_tguser
+from src.cache import TTLCache
+from src.shemas import UserShema
+from tools.fake_backend import FakeBackend, serve
+
+PORT = 8766
+API_URL = f"http://127.0.0.1:{PORT}/api/v1/"
+
+
+class TTLCacheTestCase(unittest.TestCase):
+    def test_entry_expires_after_ttl(self):
+        cache = TTLCache(maxsize=10, ttl=5)
+        with mock.patch("src.cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+        with mock.patch("src.cache.time.monotonic", return_value=104.0):
+            self.assertEqual(cache.get("key"), "value")
+        with mock.patch("src.cache.time.monotonic", return_value=106.0):
+            self.assertIsNone(cache.get("key"))
+            # Прострочений запис лишається запасним варіантом
+            self.assertEqual(cache.get_stale("key"), "value")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_hits_misses_and_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        # "b" використовувався найдавніше
+        self.assertIsNone(cache.get_stale("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+        self.assertEqual(len(cache), 2)
+
+
+class ProfileCacheTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.backend = FakeBackend()
+        self.runner = await serve(self.backend, "127.0.0.1", PORT)
+        self.bot = SimpleNamespace(http_session=aiohttp.ClientSession())
+        # Так профіль повертає бекенд: прапорці, яких Telegram не надсилав, збережені як False
+        self.backend.tgusers[7] = {
+            "id": 7, "tg_first_name": "Carol", "tg_last_name": None, "tg_username": "carol", "is_bot": False,
+            "language_code": "uk", "is_premium": False, "added_to_attachment_menu": False,
+            "created_at": "2026-01-01T00:00:00Z", "updated_at": "2026-01-01T00:00:00Z",
+        }
+        self.telegram_user = User(id=7, is_bot=False, first_name="Carol", username="carol", language_code="uk")
+        profile_cache.clear()
+
+    async def asyncTearDown(self):
+        profile_cache.clear()
+        backend_client.breaker.record_success()
+        await self.bot.http_session.close()
+        await self.runner.cleanup()
+
+    async def test_unchanged_profile_is_not_synced_again(self):
+        user = UserShema.user_from_aiogram(self.telegram_user)
+        self.assertIsNone(user.is_premium)
+        profile = await get_cached_tguser(user, self.bot, API_URL)
+        self.assertEqual(profile, user.normalized())
+
+        await sync_tguser(user, self.bot, API_URL)
+        self.assertEqual(self.backend.calls["POST /api/v1/users/tgusers/"], 0)
+        self.assertEqual(await get_cached_tguser(user, self.bot, API_URL), profile)
+        self.assertEqual(self.backend.calls["GET /api/v1/users/tgusers/{tguser_id}/"], 1)
+
+    async def test_changed_profile_is_synced(self):
+        await get_cached_tguser(UserShema.user_from_aiogram(self.telegram_user), self.bot, API_URL)
+        renamed = UserShema.user_from_aiogram(self.telegram_user.model_copy(update={"first_name": "Caroline"}))
+        synced = await sync_tguser(renamed, self.bot, API_URL)
+        self.assertEqual(self.backend.calls["POST /api/v1/users/tgusers/"], 1)
+        self.assertEqual(self.backend.tgusers[7]["tg_first_name"], "Caroline")
+        self.assertEqual(profile_cache.get(7), synced)
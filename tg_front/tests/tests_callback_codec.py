@@ -0,0 +1,57 @@
+import base64
+import hashlib
+import hmac
+import unittest
+
+from src.callback_codec import ENCODED_SIZE, PAYLOAD, SIGNATURE_SIZE, VERSION, MoveCodec, MoveTap, derive_secret
+
+SECRET = derive_secret("42:TEST")
+
+
+def forge(payload: bytes, secret: bytes = SECRET) -> str:
+    """callback_data з довільним (але підписаним) вмістом."""
+    signature = hmac.digest(secret, payload, "sha256")[:SIGNATURE_SIZE]
+    return base64.urlsafe_b64encode(payload + signature).rstrip(b"=").decode()
+
+
+class MoveCodecTestCase(unittest.TestCase):
+    def setUp(self):
+        self.codec = MoveCodec(SECRET)
+
+    def test_round_trip(self):
+        for move in (MoveTap(1, 0, 0), MoveTap(2 ** 64 - 1, 9, 8), MoveTap(123_456, 4, 5)):
+            with self.subTest(move):
+                data = self.codec.encode(*move)
+                self.assertEqual(len(data), ENCODED_SIZE)
+                self.assertLessEqual(len(data.encode()), 64)
+                self.assertEqual(self.codec.decode(data), move)
+        self.assertEqual(self.codec.rejected, 0)
+
+    def test_tampered_signature_or_other_secret(self):
+        data = self.codec.encode(7, 1, 4)
+        tampered = data[:-1] + ("A" if data[-1] != "A" else "B")
+        self.assertIsNone(self.codec.decode(tampered))
+        self.assertIsNone(MoveCodec(hashlib.sha256(b"other").digest()).decode(data))
+        self.assertEqual(self.codec.rejected, 1)
+
+    def test_wrong_version(self):
+        self.assertIsNone(self.codec.decode(forge(PAYLOAD.pack(VERSION + 1, 7, 1, 4))))
+        self.assertEqual(self.codec.rejected, 1)
+
+    def test_bad_alphabet(self):
+        for data in ("!" * ENCODED_SIZE, "=" * ENCODED_SIZE, "+" + self.codec.encode(7, 1, 4)[1:],
+                     "я" * ENCODED_SIZE, " " * ENCODED_SIZE):
+            with self.subTest(data):
+                self.assertIsNone(self.codec.decode(data))
+        self.assertEqual(self.codec.rejected, 5)
+
+    def test_bad_length(self):
+        data = self.codec.encode(7, 1, 4)
+        for bad in ("", "noop", data[:-1], data + "A"):
+            with self.subTest(bad):
+                self.assertIsNone(self.codec.decode(bad))
+
+    def test_cell_out_of_board(self):
+        self.assertIsNone(self.codec.decode(forge(PAYLOAD.pack(VERSION, 7, 1, 9))))
+        self.assertIsNone(self.codec.decode(forge(PAYLOAD.pack(VERSION, 7, 1, 255))))
+        self.assertEqual(self.codec.rejected, 2)
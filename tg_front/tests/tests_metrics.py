@@ -0,0 +1,74 @@
+import unittest
+
+import aiohttp
+
+from src.cache import TTLCache
+from src.metrics import CONTENT_TYPE, MetricsRegistry, cache_collector, format_labels, summary_samples
+from src.utils import LatencyStats, RateMeter
+
+PORT = 8766
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class MetricsFormatTestCase(unittest.TestCase):
+    def test_labels_are_escaped(self):
+        self.assertEqual(format_labels({"handler": 'a"b\\c'}), '{handler="a\\"b\\\\c"}')
+        self.assertEqual(format_labels({}), "")
+
+    def test_summary_has_quantiles_sum_and_count(self):
+        stats = LatencyStats()
+        for value in (0.1, 0.2, 0.3, 0.4):
+            stats.observe(value)
+        lines = summary_samples("latency", stats, {"handler": "move"})
+        self.assertIn('latency{handler="move",quantile="0.5"} 0.2', lines)
+        self.assertIn('latency{handler="move",quantile="0.99"} 0.4', lines)
+        self.assertIn('latency_count{handler="move"} 4', lines)
+
+    def test_empty_summary_has_no_quantiles(self):
+        self.assertEqual(summary_samples("latency", LatencyStats()), ["latency_sum 0.0", "latency_count 0"])
+
+    def test_failing_collector_does_not_break_render(self):
+        registry = MetricsRegistry()
+        registry.register(lambda: 1 / 0)
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.get(1)
+        registry.register(cache_collector("profile", cache))
+        with self.assertLogs("src.metrics", "ERROR"):
+            output = registry.render()
+        self.assertIn('tg_cache_requests_total{cache="profile",result="miss"} 1', output)
+
+
+class RateMeterTestCase(unittest.TestCase):
+    def test_rate_over_sliding_window(self):
+        clock = FakeClock()
+        meter = RateMeter(window=10, clock=clock)
+        for second in range(5):
+            clock.now = second
+            meter.mark(2)
+        self.assertEqual(meter.rate(), 1.0)
+        clock.now = 12
+        self.assertEqual(meter.rate(), 0.4)
+        clock.now = 20
+        self.assertEqual(meter.rate(), 0)
+
+
+class MetricsServerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_metrics_endpoint(self):
+        registry = MetricsRegistry()
+        registry.register(lambda: ["# TYPE tg_up gauge", "tg_up 1"])
+        runner = await registry.start_server("127.0.0.1", PORT)
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{PORT}/metrics") as response:
+                    self.assertEqual(response.status, 200)
+                    self.assertEqual(response.headers["Content-Type"], CONTENT_TYPE)
+                    self.assertEqual(await response.text(), "# TYPE tg_up gauge\ntg_up 1\n")
+        finally:
+            await runner.cleanup()
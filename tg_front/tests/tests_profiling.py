@@ -0,0 +1,50 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.profiling import HandlerProfiler
+
+
+async def fetch_profile():
+    await asyncio.sleep(0.1)
+
+
+async def slow_handler(event, data):
+    await fetch_profile()
+
+
+async def fast_handler(event, data):
+    return "ok"
+
+
+class HandlerProfilerTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def profiles(self):
+        return list(Path(self.directory.name).glob("*.collapsed"))
+
+    async def call(self, profiler, handler):
+        return await profiler(handler, object(), {"handler": SimpleNamespace(callback=handler)})
+
+    async def test_only_slow_handler_is_profiled(self):
+        profiler = HandlerProfiler(threshold=0.03, interval=0.005, directory=self.directory.name)
+        self.assertEqual(await self.call(profiler, fast_handler), "ok")
+        with self.assertLogs("src.profiling", "INFO"):
+            await self.call(profiler, slow_handler)
+
+        profiles = self.profiles()
+        self.assertEqual(len(profiles), 1)
+        self.assertIn("slow_handler", profiles[0].name)
+        stack, count = profiles[0].read_text().splitlines()[0].rsplit(" ", 1)
+        self.assertIn("tests.tests_profiling:slow_handler;tests.tests_profiling:fetch_profile;asyncio.tasks:sleep;<", stack)
+        self.assertGreater(int(count), 5)
+
+    async def test_sampled_handler_is_profiled_from_start(self):
+        profiler = HandlerProfiler(threshold=10, sample_rate=1.0, interval=0.005, directory=self.directory.name)
+        with self.assertLogs("src.profiling", "INFO"):
+            await self.call(profiler, slow_handler)
+        self.assertEqual(profiler.profiled, 1)
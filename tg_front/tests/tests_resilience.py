@@ -0,0 +1,167 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import aiohttp
+
+from src.api_requests import backend_client, get_cached_tguser, profile_cache
+from src.resilience import BackendError, CircuitBreaker, CircuitOpenError, ResilientClient, RetryPolicy
+from src.shemas import UserShema
+from tools.fake_backend import API_PREFIX, FakeBackend, serve
+
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RetryPolicyTestCase(unittest.TestCase):
+    def test_at_least_one_attempt(self):
+        self.assertEqual(RetryPolicy(attempts=1).attempts, 1)
+        for attempts in (0, -1):
+            with self.subTest(attempts), self.assertRaises(ValueError):
+                RetryPolicy(attempts=attempts)
+
+
+class ResilientClientTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.backend = FakeBackend()
+        self.backend.tgusers[1] = {"id": 1, "tg_first_name": "Alice"}
+        self.runner = await serve(self.backend, "127.0.0.1", PORT)
+        self.session = aiohttp.ClientSession()
+        self.clock = FakeClock()
+        self.client = ResilientClient(
+            retry=RetryPolicy(attempts=3, base_delay=0.001, max_delay=0.002),
+            breaker=CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=self.clock),
+        )
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.runner.cleanup()
+
+    def url(self, tguser_id=None):
+        return f"{BASE_URL}{API_PREFIX}/tgusers/" + (f"{tguser_id}/" if tguser_id else "")
+
+    async def test_get_is_retried_after_server_errors(self):
+        self.backend.fail_next(2)
+        status, data = await self.client.request(self.session, "GET", self.url(1))
+        self.assertEqual((status, data["tg_first_name"]), (200, "Alice"))
+        self.assertEqual(self.backend.requests, 3)
+        self.assertEqual(self.client.retries, 2)
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.CLOSED)
+
+    async def test_post_is_not_retried(self):
+        self.backend.fail_next(1)
+        with self.assertRaises(BackendError):
+            await self.client.request(self.session, "POST", self.url(), json={"id": 2, "tg_first_name": "Bob"})
+        self.assertEqual(self.backend.requests, 1)
+        self.assertNotIn(2, self.backend.tgusers)
+
+    async def test_client_errors_are_returned_not_counted(self):
+        status, _ = await self.client.request(self.session, "GET", self.url(404))
+        self.assertEqual(status, 404)
+        self.assertEqual((self.client.failures, self.client.retries), (0, 0))
+
+    async def test_timeout_is_a_failure(self):
+        self.backend.latency = 0.2
+        client = ResilientClient(retry=RetryPolicy(attempts=2, base_delay=0.001), timeout=0.05)
+        with self.assertRaises(BackendError):
+            await client.request(self.session, "GET", self.url(1))
+        self.assertEqual(client.failures, 2)
+
+    async def test_breaker_opens_fails_fast_and_recovers(self):
+        self.backend.fail_next(100)
+        with self.assertRaises(BackendError):
+            await self.client.request(self.session, "GET", self.url(1))
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.OPEN)
+        requests = self.backend.requests
+
+        with self.assertRaises(CircuitOpenError):
+            await self.client.request(self.session, "GET", self.url(1))
+        self.assertEqual(self.backend.requests, requests)
+        self.assertEqual(self.client.short_circuited, 1)
+
+        # Після reset_timeout пропускається один пробний запит; успіх закриває запобіжник
+        self.backend.fail_next(0)
+        self.clock.now += 10
+        status, _ = await self.client.request(self.session, "GET", self.url(1))
+        self.assertEqual(status, 200)
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.CLOSED)
+
+    async def test_failed_probe_reopens_breaker(self):
+        self.backend.fail_next(100)
+        with self.assertRaises(BackendError):
+            await self.client.request(self.session, "GET", self.url(1))
+        self.clock.now += 10
+        with self.assertRaises(BackendError):
+            await self.client.request(self.session, "GET", self.url(1))
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.client.breaker.opened, 2)
+
+    async def open_breaker(self):
+        self.backend.fail_next(100)
+        with self.assertRaises(BackendError):
+            await self.client.request(self.session, "GET", self.url(1))
+        self.backend.fail_next(0)
+        self.clock.now += 10
+
+    async def test_cancelled_probe_is_released(self):
+        await self.open_breaker()
+        self.backend.latency = 1
+        probe = asyncio.create_task(self.client.request(self.session, "GET", self.url(1)))
+        await asyncio.sleep(0.05)
+        # Поки проба в дорозі, інші запити відхиляються
+        with self.assertRaises(CircuitOpenError):
+            await self.client.request(self.session, "GET", self.url(1))
+        probe.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await probe
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.HALF_OPEN)
+
+        self.backend.latency = 0
+        status, _ = await self.client.request(self.session, "GET", self.url(1))
+        self.assertEqual(status, 200)
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.CLOSED)
+
+    async def test_unexpected_error_releases_probe(self):
+        await self.open_breaker()
+        broken_session = SimpleNamespace(request=mock.Mock(side_effect=RuntimeError("bug")))
+        with self.assertRaises(RuntimeError):
+            await self.client.request(broken_session, "GET", self.url(1))
+        status, _ = await self.client.request(self.session, "GET", self.url(1))
+        self.assertEqual(status, 200)
+
+
+class CachedProfileFallbackTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.backend = FakeBackend()
+        self.runner = await serve(self.backend, "127.0.0.1", PORT)
+        self.bot = SimpleNamespace(http_session=aiohttp.ClientSession())
+        self.user = UserShema(id=7, tg_first_name="Carol")
+        self.backend.tgusers[7] = self.user.model_dump()
+        profile_cache.clear()
+
+    async def asyncTearDown(self):
+        profile_cache.clear()
+        backend_client.breaker.record_success()
+        await self.bot.http_session.close()
+        await self.runner.cleanup()
+
+    async def test_expired_profile_is_served_while_backend_is_down(self):
+        api_url = f"{BASE_URL}/api/v1/"
+        self.assertEqual(await get_cached_tguser(self.user, self.bot, api_url), self.user.normalized())
+        # Запис прострочився, а бекенд лежить
+        profile_cache._data[self.user.id] = (0.0, self.user)
+        self.backend.fail_next(100)
+        self.assertEqual(await get_cached_tguser(self.user, self.bot, api_url), self.user)
+
+        profile_cache.clear()
+        with self.assertRaises(BackendError):
+            await get_cached_tguser(self.user, self.bot, api_url)
@@ -0,0 +1,63 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from src.scheduler import UpdateScheduler
+
+
+class UpdateSchedulerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.log: list[tuple[str, int, int]] = []
+        self.running = 0
+        self.max_running = 0
+
+    def dispatch(self, scheduler, chat_id, number, delay=0.01):
+        async def handler(event, data):
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.log.append(("start", chat_id, number))
+            await asyncio.sleep(delay)
+            self.log.append(("end", chat_id, number))
+            self.running -= 1
+            return number
+
+        data = {"event_chat": SimpleNamespace(id=chat_id)} if chat_id is not None else {}
+        return asyncio.create_task(scheduler(handler, SimpleNamespace(), data))
+
+    async def test_updates_of_one_chat_run_in_order(self):
+        scheduler = UpdateScheduler(limit=10)
+        # Пізніші оновлення коротші: без черги чату вони завершилися б першими
+        tasks = [self.dispatch(scheduler, 1, number, delay=0.03 - number * 0.01) for number in range(3)]
+        self.assertEqual(await asyncio.gather(*tasks), [0, 1, 2])
+        self.assertEqual(self.log, [
+            ("start", 1, 0), ("end", 1, 0), ("start", 1, 1), ("end", 1, 1), ("start", 1, 2), ("end", 1, 2),
+        ])
+        self.assertEqual(self.max_running, 1)
+        stats = scheduler.stats()
+        self.assertEqual((stats["processed"], stats["active_chats"], stats["waiting"]), (3, 0, 0))
+
+    async def test_chats_run_in_parallel_up_to_limit(self):
+        scheduler = UpdateScheduler(limit=2)
+        tasks = [self.dispatch(scheduler, chat_id, 0, delay=0.02) for chat_id in range(5)]
+        await asyncio.sleep(0.005)
+        stats = scheduler.stats()
+        self.assertEqual((stats["running"], stats["waiting"], stats["active_chats"]), (2, 3, 5))
+        await asyncio.gather(*tasks)
+        self.assertEqual(self.max_running, 2)
+        self.assertEqual(scheduler.stats()["processed"], 5)
+        self.assertEqual(scheduler.stats()["max_waiting"], 3)
+
+    async def test_update_without_chat_still_counts_against_limit(self):
+        scheduler = UpdateScheduler(limit=1)
+        await asyncio.gather(self.dispatch(scheduler, None, 0), self.dispatch(scheduler, 2, 1))
+        self.assertEqual(self.max_running, 1)
+
+    async def test_cancelled_update_frees_its_chat(self):
+        scheduler = UpdateScheduler(limit=1)
+        first = self.dispatch(scheduler, 1, 0, delay=1)
+        second = self.dispatch(scheduler, 1, 1)
+        await asyncio.sleep(0.005)
+        first.cancel()
+        self.assertEqual(await second, 1)
+        self.assertEqual(scheduler.stats()["active_chats"], 0)
+        self.assertEqual(scheduler.stats()["running"], 0)
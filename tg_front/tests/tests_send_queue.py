@@ -0,0 +1,121 @@
+import asyncio
+import unittest
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import EditMessageText, SendMessage
+
+from src.send_queue import SendQueue, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TokenBucketTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_reservations_queue_up_as_debt(self):
+        bucket = TokenBucket(rate=2, capacity=2, clock=self.clock)
+        self.assertEqual([bucket.reserve() for _ in range(4)], [0.0, 0.0, 0.5, 1.0])
+        self.clock.now += 1
+        self.assertEqual(bucket.reserve(), 0.5)
+
+    def test_refill_is_capped_by_capacity(self):
+        bucket = TokenBucket(rate=1, capacity=1, clock=self.clock)
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        self.assertFalse(bucket.idle)
+        self.clock.now += 10
+        self.assertTrue(bucket.idle)
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+    def test_pause_delays_next_token(self):
+        bucket = TokenBucket(rate=1, capacity=5, clock=self.clock)
+        bucket.pause(3)
+        self.assertEqual(bucket.reserve(), 3.0)
+
+
+class FakeTelegram:
+    """make_request для SendQueue: запам'ятовує надіслані методи, може відповісти 429 або зависнути."""
+
+    def __init__(self):
+        self.sent = []
+        self.flood = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.entered = asyncio.Event()
+
+    async def __call__(self, bot, method):
+        self.entered.set()
+        await self.gate.wait()
+        if self.flood:
+            self.flood -= 1
+            raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=0)
+        self.sent.append(method)
+        return len(self.sent)
+
+
+class SendQueueTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.telegram = FakeTelegram()
+        self.queue = SendQueue(global_rate=1000, chat_rate=20, burst=1)
+
+    def send(self, method):
+        return asyncio.create_task(self.queue(self.telegram, None, method))
+
+    @staticmethod
+    def edit(text):
+        return EditMessageText(chat_id=1, message_id=5, text=text)
+
+    async def test_waiting_edits_of_one_message_are_coalesced(self):
+        # Перше повідомлення забирає токен чату - редагування чекають у черзі
+        await self.send(SendMessage(chat_id=1, text="board"))
+        edits = [self.send(self.edit(text)) for text in ("a", "b", "c")]
+        other = self.send(EditMessageText(chat_id=1, message_id=6, text="other"))
+        results = await asyncio.gather(*edits, other)
+
+        self.assertEqual([method.text for method in self.telegram.sent], ["board", "c", "other"])
+        self.assertEqual(results, [2, 2, 2, 3])
+        self.assertEqual(self.queue.stats()["coalesced"], 2)
+        self.assertEqual(self.queue.stats()["pending_edits"], 0)
+
+    async def test_cancelled_owner_releases_coalesced_edits(self):
+        await self.send(SendMessage(chat_id=1, text="board"))
+        self.telegram.gate.clear()
+        self.telegram.entered.clear()
+        owner = self.send(self.edit("a"))
+        coalesced = self.send(self.edit("b"))
+        await asyncio.wait_for(self.telegram.entered.wait(), timeout=1)
+
+        owner.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await asyncio.wait_for(coalesced, timeout=1)
+        self.assertTrue(owner.cancelled())
+
+    async def test_failed_owner_passes_error_to_coalesced_edits(self):
+        self.queue.max_retries = 0
+        await self.send(SendMessage(chat_id=1, text="board"))
+        self.telegram.flood = 1
+        edits = [self.send(self.edit(text)) for text in ("a", "b")]
+        results = await asyncio.gather(*edits, return_exceptions=True)
+        self.assertIsInstance(results[0], TelegramRetryAfter)
+        self.assertIs(results[1], results[0])
+
+    async def test_flood_control_is_retried(self):
+        self.telegram.flood = 2
+        self.assertEqual(await self.send(SendMessage(chat_id=1, text="hello")), 1)
+        self.assertEqual(self.queue.stats()["retried"], 2)
+        self.assertEqual(self.queue.stats()["sent"], 1)
+
+    async def test_flood_control_gives_up_after_max_retries(self):
+        self.queue.max_retries = 1
+        self.telegram.flood = 2
+        with self.assertRaises(TelegramRetryAfter):
+            await self.send(SendMessage(chat_id=1, text="hello"))
+        self.assertEqual(self.telegram.sent, [])
@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+from src.single_flight import SingleFlight
+
+
+class SingleFlightTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.flight = SingleFlight()
+        self.release = asyncio.Event()
+        self.started = 0
+
+    async def slow(self, result="value"):
+        self.started += 1
+        await self.release.wait()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def test_concurrent_callers_share_one_call(self):
+        callers = [asyncio.create_task(self.flight.do("key", self.slow)) for _ in range(5)]
+        await asyncio.sleep(0)
+        self.assertEqual(self.flight.in_flight, 1)
+        self.release.set()
+        self.assertEqual(await asyncio.gather(*callers), ["value"] * 5)
+        self.assertEqual(self.started, 1)
+        self.assertEqual(self.flight.stats(), {"calls": 5, "coalesced": 4, "in_flight": 0})
+
+        # Після завершення наступний виклик знову йде до функції
+        self.assertEqual(await self.flight.do("key", self.slow, "again"), "again")
+        self.assertEqual(self.started, 2)
+
+    async def test_different_keys_are_not_coalesced(self):
+        callers = [asyncio.create_task(self.flight.do(key, self.slow, key)) for key in ("a", "b")]
+        await asyncio.sleep(0)
+        self.release.set()
+        self.assertEqual(await asyncio.gather(*callers), ["a", "b"])
+        self.assertEqual(self.started, 2)
+
+    async def test_exception_reaches_all_waiters_and_releases_key(self):
+        error = ValueError("backend is down")
+        callers = [asyncio.create_task(self.flight.do("key", self.slow, error)) for _ in range(3)]
+        await asyncio.sleep(0)
+        self.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        self.assertEqual(results, [error] * 3)
+        self.assertEqual(self.flight.in_flight, 0)
+        self.assertEqual(await self.flight.do("key", self.slow, "recovered"), "recovered")
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        first = asyncio.create_task(self.flight.do("key", self.slow))
+        second = asyncio.create_task(self.flight.do("key", self.slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        self.assertTrue(first.cancelled())
+        self.assertEqual(self.flight.in_flight, 1)
+        self.release.set()
+        self.assertEqual(await second, "value")
+        self.assertEqual(self.flight.in_flight, 0)
+
+    async def test_cancelled_call_releases_key(self):
+        caller = asyncio.create_task(self.flight.do("key", self.slow))
+        await asyncio.sleep(0)
+        self.flight._in_flight["key"].cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await caller
+        self.assertEqual(self.flight.in_flight, 0)
+        self.release.set()
+        self.assertEqual(await self.flight.do("key", self.slow, "retried"), "retried")
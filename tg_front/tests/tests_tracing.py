@@ -0,0 +1,90 @@
+import json
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+from aiogram import Bot, Dispatcher
+from aiogram.types import Chat, Message, Update, User
+from aiohttp import web
+
+from src import tracing
+from src.resilience import ResilientClient
+
+PORT = 8767
+
+
+def make_update(update_id: int) -> Update:
+    return Update(update_id=update_id, message=Message(
+        message_id=1, date=datetime.now(), text="/start",
+        chat=Chat(id=42, type="private"), from_user=User(id=42, is_bot=False, first_name="Trace"),
+    ))
+
+
+class UpdateTracerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.received_headers = []
+        app = web.Application()
+        app.router.add_get("/ping", self.ping)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", PORT).start()
+        self.session = aiohttp.ClientSession()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "spans.jsonl"
+        self.exporter = tracing.SpanExporter("test", path=str(self.path))
+        self.addCleanup(setattr, tracing, "_exporter", None)
+        self.bot = Bot("42:TEST")
+        self.client = ResilientClient()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.runner.cleanup()
+        await self.bot.session.close()
+
+    async def ping(self, request: web.Request) -> web.Response:
+        self.received_headers.append(request.headers.get(tracing.TRACEPARENT_HEADER))
+        return web.json_response({"ok": True})
+
+    def make_dispatcher(self, sample_rate: float) -> Dispatcher:
+        dp = Dispatcher()
+        tracing.UpdateTracer(self.exporter, sample_rate=sample_rate).setup(dp)
+
+        @dp.message()
+        async def start_handler(message: Message):
+            await self.client.request(self.session, "GET", f"http://127.0.0.1:{PORT}/ping")
+
+        return dp
+
+    async def spans(self) -> list[dict]:
+        await self.exporter.close()
+        if not self.path.exists():
+            return []
+        return [
+            span
+            for line in self.path.read_text().splitlines()
+            for resource in json.loads(line)["resourceSpans"]
+            for scope in resource["scopeSpans"]
+            for span in scope["spans"]
+        ]
+
+    async def test_update_trace_is_propagated_to_backend(self):
+        await self.make_dispatcher(sample_rate=1.0).feed_update(self.bot, make_update(1))
+
+        spans = {span["name"]: span for span in await self.spans()}
+        self.assertEqual(set(spans), {"update message", "handler start_handler", "GET backend"})
+        root, handler, request = spans["update message"], spans["handler start_handler"], spans["GET backend"]
+        self.assertNotIn("parentSpanId", root)
+        self.assertEqual(handler["parentSpanId"], root["spanId"])
+        self.assertEqual(request["parentSpanId"], handler["spanId"])
+        self.assertEqual({span["traceId"] for span in spans.values()}, {root["traceId"]})
+        # Бекенд отримав контекст span-а запиту і продовжить trace від нього
+        self.assertEqual(self.received_headers, [f"00-{root['traceId']}-{request['spanId']}-01"])
+
+    async def test_unsampled_update_is_not_traced(self):
+        await self.make_dispatcher(sample_rate=0.0).feed_update(self.bot, make_update(2))
+        self.assertEqual(await self.spans(), [])
+        self.assertEqual(self.received_headers, [None])
@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from settings import settings
+from src.utils import BackendClientStats, LatencyStats, RateMeter, create_backend_session
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class LatencyStatsTestCase(unittest.TestCase):
+    def test_summary(self):
+        stats = LatencyStats(samples=3)
+        self.assertEqual(stats.summary()["p50"], None)
+        for value in (0.4, 0.1, 0.3, 0.2):
+            stats.observe(value)
+        summary = stats.summary()
+        self.assertEqual((summary["count"], summary["max"]), (4, 0.4))
+        self.assertAlmostEqual(summary["avg"], 0.25)
+        # Перцентилі рахуються лише з останніх `samples` значень
+        self.assertEqual((summary["p50"], summary["p99"]), (0.2, 0.3))
+
+
+class RateMeterTestCase(unittest.TestCase):
+    def test_rate_over_sliding_window(self):
+        clock = FakeClock()
+        meter = RateMeter(window=10, clock=clock)
+        meter.mark(5)
+        clock.now += 1
+        meter.mark(15)
+        self.assertEqual(meter.rate(), 2.0)
+        clock.now += 9.5
+        self.assertEqual(meter.rate(), 1.5)
+        clock.now += 1
+        self.assertEqual(meter.rate(), 0.0)
+
+
+class BackendSessionTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.accept = []
+
+        async def handle(request):
+            self.accept.append(request.headers.get("Accept"))
+            await asyncio.sleep(float(request.query.get("delay", 0)))
+            return web.json_response({"ok": True})
+
+        app = web.Application()
+        app.router.add_get("/", handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.stats = BackendClientStats()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    def session(self) -> aiohttp.ClientSession:
+        session = create_backend_session(self.stats)
+        self.addAsyncCleanup(session.close)
+        return session
+
+    async def get(self, session, delay=0.0):
+        async with session.get(self.server.make_url("/"), params={"delay": delay}) as response:
+            return await response.json()
+
+    async def test_session_uses_configured_pool_and_timeouts(self):
+        session = self.session()
+        self.assertEqual(session.connector.limit, settings.BACKEND_CONNECTION_LIMIT)
+        self.assertEqual(session.connector.limit_per_host, settings.BACKEND_CONNECTION_LIMIT_PER_HOST)
+        self.assertTrue(session.connector.use_dns_cache)
+        self.assertEqual(session.timeout.total, settings.BACKEND_TIMEOUT_TOTAL)
+        self.assertEqual(session.timeout.connect, settings.BACKEND_TIMEOUT_CONNECT)
+
+        self.assertEqual(await self.get(session), {"ok": True})
+        self.assertEqual(self.accept, ["application/json"])
+
+    async def test_trace_hooks_record_latency_and_reuse(self):
+        session = self.session()
+        await self.get(session, delay=0.05)
+        await self.get(session)
+        summary = self.stats.summary()
+        self.assertEqual((summary["requests"], summary["errors"]), (2, 0))
+        self.assertEqual((summary["connections_created"], summary["connections_reused"]), (1, 1))
+        self.assertEqual(summary["latency"]["count"], 2)
+        self.assertGreaterEqual(summary["latency"]["max"], 0.05)
+
+    async def test_trace_hooks_count_errors(self):
+        session = self.session()
+        url = self.server.make_url("/")
+        await self.server.close()
+        with self.assertRaises(aiohttp.ClientConnectionError):
+            async with session.get(url):
+                pass
+        self.assertEqual((self.stats.requests, self.stats.errors), (1, 1))
+        self.assertEqual(self.stats.latency.count, 1)
+
+    async def test_pool_wait_is_measured(self):
+        with mock.patch.object(settings, "BACKEND_CONNECTION_LIMIT", 1):
+            session = self.session()
+        await asyncio.gather(self.get(session, delay=0.05), self.get(session))
+        # Другий запит чекав, доки перший поверне єдине з'єднання в пул
+        self.assertEqual(self.stats.queueing.count, 1)
+        self.assertGreater(self.stats.queueing.max, 0)
@@ -0,0 +1,111 @@
+import asyncio
+import unittest
+from collections import defaultdict
+
+from aiogram import Bot
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.webhook import SECRET_HEADER, WebhookUpdateQueue
+from tools.fake_bot_api import make_message_update
+
+SECRET = "webhook-secret"
+
+
+def opened_gate() -> asyncio.Event:
+    gate = asyncio.Event()
+    gate.set()
+    return gate
+
+
+class RecordingDispatcher:
+    """
+    Замість Dispatcher з UpdateScheduler: оновлення одного чату обробляються по черзі
+    й запам'ятовуються, поки відкрито gate цього чату.
+    """
+
+    def __init__(self):
+        self.updates = []
+        self.gates: defaultdict[int, asyncio.Event] = defaultdict(opened_gate)
+        self.lanes: defaultdict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def feed_update(self, bot, update):
+        chat_id = update.message.chat.id
+        async with self.lanes[chat_id]:
+            await self.gates[chat_id].wait()
+            if update.message.text == "boom":
+                raise RuntimeError("handler failed")
+            self.updates.append(update.update_id)
+
+
+class WebhookUpdateQueueTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.bot = Bot("42:TEST")
+        self.dispatcher = RecordingDispatcher()
+        self.updates = WebhookUpdateQueue(self.dispatcher, self.bot, SECRET, queue_size=2)
+        app = web.Application()
+        self.updates.setup(app, "/webhook")
+        self.client = TestClient(TestServer(app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        for gate in self.dispatcher.gates.values():
+            gate.set()
+        await self.client.close()
+        await self.bot.session.close()
+
+    async def deliver(self, update_id, text="hello", secret=SECRET, user_id=1000):
+        response = await self.client.post(
+            "/webhook", json=make_message_update(update_id, user_id=user_id, text=text),
+            headers={SECRET_HEADER: secret},
+        )
+        return response.status
+
+    async def test_wrong_or_missing_secret_is_rejected(self):
+        self.assertEqual(await self.deliver(1, secret="guess"), 401)
+        response = await self.client.post("/webhook", json=make_message_update(2, user_id=1000, text="hello"))
+        self.assertEqual(response.status, 401)
+        self.assertEqual(self.updates.stats()["received"], 0)
+
+    async def test_malformed_update_is_rejected(self):
+        response = await self.client.post("/webhook", data=b"not json", headers={SECRET_HEADER: SECRET})
+        self.assertEqual(response.status, 400)
+
+    async def test_updates_are_fed_to_dispatcher(self):
+        with self.assertLogs("src.webhook", "ERROR"):
+            for update_id in (1, 2, 3):
+                self.assertEqual(await self.deliver(update_id, text="boom" if update_id == 2 else "hello"), 200)
+            await asyncio.wait_for(self.updates.join(), timeout=5)
+        self.assertEqual(self.dispatcher.updates, [1, 3])
+        self.assertEqual(self.updates.stats(), {
+            "received": 3, "rejected": 0, "processed": 2, "failed": 1, "queue_depth": 0,
+        })
+
+    async def test_full_queue_returns_503(self):
+        self.dispatcher.gates[1000].clear()
+        self.assertEqual([await self.deliver(update_id) for update_id in (1, 2, 3)], [200, 200, 503])
+        self.assertEqual(self.updates.stats()["rejected"], 1)
+        self.assertEqual(self.updates.stats()["queue_depth"], 2)
+
+        self.dispatcher.gates[1000].set()
+        await asyncio.wait_for(self.updates.join(), timeout=5)
+        self.assertEqual(self.dispatcher.updates, [1, 2])
+        self.assertEqual(await self.deliver(3), 200)
+
+    async def test_busy_chat_does_not_block_other_chats(self):
+        self.updates.queue_size = 100
+        self.dispatcher.gates[1000].clear()
+        # Оновлень зайнятого чату більше, ніж будь-яка розумна кількість воркерів
+        for update_id in range(1, 41):
+            self.assertEqual(await self.deliver(update_id), 200)
+        self.assertEqual(await self.deliver(100, user_id=2000), 200)
+        for _ in range(100):
+            if self.dispatcher.updates:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.dispatcher.updates, [100])
+
+        self.dispatcher.gates[1000].set()
+        await asyncio.wait_for(self.updates.join(), timeout=5)
+        self.assertEqual(self.dispatcher.updates, [100, *range(1, 41)])
+        self.assertEqual(self.updates.stats()["queue_depth"], 0)
@@ -0,0 +1,52 @@
+"""
+Мікробенчмарк кодування callback_data кнопок ходу (виконується на кожне натискання).
+
+Порівнює MoveCodec (struct + HMAC + base64url) з aiogram CallbackData (текст без підпису)
+за часом encode/decode і довжиною рядка.
+
+    python -m tools.bench_callback_codec --number 100000
+"""
+import argparse
+import secrets
+import timeit
+
+from aiogram.filters.callback_data import CallbackData
+
+from src.callback_codec import MoveCodec
+
+
+class PlainMoveCallback(CallbackData, prefix="mv"):
+    game_id: int
+    ply: int
+    cell: int
+
+
+def report(name: str, number: int, seconds: float) -> None:
+    print(f"{name:<32} {seconds / number * 1e6:8.2f} us/op")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Callback data codec microbenchmark")
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+    number = args.number
+
+    codec = MoveCodec(secrets.token_bytes(32))
+    game_id, ply, cell = 123_456_789, 4, 7
+    encoded = codec.encode(game_id, ply, cell)
+    assert codec.decode(encoded) == (game_id, ply, cell)
+    forged = encoded[:-2] + ("AA" if encoded[-2:] != "AA" else "BB")
+    assert codec.decode(forged) is None
+    plain = PlainMoveCallback(game_id=game_id, ply=ply, cell=cell).pack()
+
+    print(f"MoveCodec: {encoded!r} ({len(encoded)} bytes), CallbackData: {plain!r} ({len(plain)} bytes)")
+    report("MoveCodec.encode", number, timeit.timeit(lambda: codec.encode(game_id, ply, cell), number=number))
+    report("MoveCodec.decode", number, timeit.timeit(lambda: codec.decode(encoded), number=number))
+    report("MoveCodec.decode (forged)", number, timeit.timeit(lambda: codec.decode(forged), number=number))
+    report("CallbackData.pack", number, timeit.timeit(
+        lambda: PlainMoveCallback(game_id=game_id, ply=ply, cell=cell).pack(), number=number))
+    report("CallbackData.unpack", number, timeit.timeit(lambda: PlainMoveCallback.unpack(plain), number=number))
+
+
+if __name__ == "__main__":
+    main()
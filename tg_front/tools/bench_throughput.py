@@ -0,0 +1,211 @@
+"""
+Бенчмарк пропускної здатності бота без Telegram і Django.
+
+Піднімає FakeBotAPI (Bot API) і FakeBackend (Django API з ендпоінтами ігор і затримкою --backend-latency),
+імпортує бота з TELEGRAM_API_URL/BACKEND_API_URL, що вказують на заглушки, і проганяє через dp.feed_update
+синтетичний трафік: пари віртуальних користувачів роблять /start, пишуть повідомлення в чат,
+відкривають дошку спільної гри (/game) і по черзі ходять натисканнями на клітинки до кінця гри.
+
+Звіт: оновлень за секунду, перцентилі повної обробки оновлення і часу хендлерів (UpdateScheduler),
+кількість вихідних викликів Bot API і Django API. Ліміти SendQueue за замовчуванням зняті,
+щоб вимірювати сам бот; --telegram-limits залишає налаштування з оточення.
+
+    python -m tools.bench_throughput --games 200 --concurrency 50 --backend-latency 0.02 --json bench.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+from collections import Counter
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from tools import fake_backend, fake_bot_api
+from tools.fake_backend import FakeBackend, FakeGame
+from tools.fake_bot_api import BOT_USER, FakeBotAPI, make_message_update, make_user
+from tools.webhook_load import REQUIRED_SETTINGS, percentile
+UNLIMITED_SENDING = {
+    "SEND_GLOBAL_RATE": "1000000", "SEND_CHAT_RATE": "1000000", "SEND_GROUP_RATE": "1000000", "SEND_BURST": "1000",
+}
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+class Traffic:
+    """Генератор синтетичних оновлень і лічильники їх обробки."""
+
+    def __init__(self, dp: Dispatcher, bot: Bot, backend: FakeBackend, board_messages, move_codec, seed: int = 0):
+        self.dp = dp
+        self.bot = bot
+        self.backend = backend
+        self.board_messages = board_messages
+        self.move_codec = move_codec
+        self.random = random.Random(seed)
+        self.latencies: list[float] = []
+        self.updates: Counter[str] = Counter()
+        self.errors = 0
+        self._update_ids = itertools.count(1)
+
+    async def feed(self, kind: str, raw: dict) -> None:
+        update = Update.model_validate(raw, context={"bot": self.bot})
+        started = time.perf_counter()
+        try:
+            await self.dp.feed_update(self.bot, update)
+        except Exception:
+            self.errors += 1
+        self.latencies.append(time.perf_counter() - started)
+        self.updates[kind] += 1
+
+    async def message(self, kind: str, user_id: int, text: str) -> None:
+        await self.feed(kind, make_message_update(next(self._update_ids), user_id, text))
+
+    async def tap(self, user_id: int, message_id: int, data: str) -> None:
+        update_id = next(self._update_ids)
+        await self.feed("move", {
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "from": make_user(user_id),
+                "chat_instance": str(user_id),
+                "data": data,
+                "message": {
+                    "message_id": message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private"},
+                    "from": BOT_USER,
+                    "text": "Game",
+                },
+            },
+        })
+
+    async def chat(self, user_id: int, messages: int) -> None:
+        await self.message("start", user_id, "/start")
+        for index in range(messages):
+            await self.message("chat", user_id, f"message {index}")
+
+    async def play(self, player1: int, player2: int, messages: int) -> None:
+        await asyncio.gather(self.chat(player1, messages), self.chat(player2, messages))
+        game = self.backend.add_game(player1, player2, player1_first=self.random.random() < 0.5)
+        await asyncio.gather(*(self.message("game", player, f"/game {game.id}") for player in game.players))
+        while not game.finished:
+            if not await self.move(game):
+                break
+
+    async def move(self, game: FakeGame) -> bool:
+        player = game.next_player
+        boards = [message_id for chat_id, message_id in self.board_messages.messages(game.id) if chat_id == player]
+        if not boards:
+            # Дошка не надіслана (помилка обробки /game) - грати нема на чому
+            return False
+        ply = game.ply
+        cell = self.random.choice([index for index, cell in enumerate(game.cells) if cell == " "])
+        await self.tap(player, boards[0], self.move_codec.encode(game.id, ply, cell))
+        return game.ply > ply
+
+
+async def run(args) -> dict:
+    api = FakeBotAPI(flood_control=args.flood_control)
+    backend = FakeBackend(latency=args.backend_latency)
+    api_runner = await fake_bot_api.serve(api, "127.0.0.1", args.api_port)
+    backend_runner = await fake_backend.serve(backend, "127.0.0.1", args.backend_port)
+    for name, value in REQUIRED_SETTINGS.items():
+        os.environ.setdefault(name, value)
+    os.environ.update(
+        TELEGRAM_API_URL=f"http://127.0.0.1:{args.api_port}",
+        BACKEND_API_URL=f"http://127.0.0.1:{args.backend_port}/api/v1/",
+        METRICS_PORT="0",
+    )
+    if not args.telegram_limits:
+        os.environ.update(UNLIMITED_SENDING)
+    # Імпорт після налаштування оточення: settings читаються при імпорті
+    import main as bot_main
+    from src.board import board_messages, move_codec
+
+    dp = bot_main.dp
+    bot = bot_main.create_bot()
+    workflow_data = {"dispatcher": dp, "bots": [bot], **dp.workflow_data}
+    await dp.emit_startup(bot=bot, **workflow_data)
+    traffic = Traffic(dp, bot, backend, board_messages, move_codec, seed=args.seed)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def pair(index: int) -> None:
+        async with semaphore:
+            await traffic.play(args.user_base + 2 * index, args.user_base + 2 * index + 1, args.messages)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(pair(index) for index in range(args.games)))
+        elapsed = time.perf_counter() - started
+        scheduler_stats = bot_main.update_scheduler.stats()
+    finally:
+        await dp.emit_shutdown(bot=bot, **workflow_data)
+        await bot.session.close()
+        await api_runner.cleanup()
+        await backend_runner.cleanup()
+
+    total = sum(traffic.updates.values())
+    finished = sum(game.finished for game in backend.games.values())
+    return {
+        "games": args.games,
+        "games_finished": finished,
+        "concurrency": args.concurrency,
+        "backend_latency_s": args.backend_latency,
+        "elapsed_s": round(elapsed, 3),
+        "updates": total,
+        "updates_by_kind": dict(traffic.updates),
+        "errors": traffic.errors,
+        "updates_per_second": round(total / elapsed, 2) if elapsed else None,
+        "p50_ms": _ms(percentile(traffic.latencies, 0.5)) if total else None,
+        "p95_ms": _ms(percentile(traffic.latencies, 0.95)) if total else None,
+        "p99_ms": _ms(percentile(traffic.latencies, 0.99)) if total else None,
+        "handlers": {
+            name: {key: _ms(summary[key]) for key in ("avg", "p50", "p95", "p99", "max")} | {"count": summary["count"]}
+            for name, summary in scheduler_stats["handlers"].items()
+        },
+        "bot_api_calls": dict(api.calls),
+        "backend_calls": dict(backend.calls),
+        "bot_api_calls_per_update": round(sum(api.calls.values()) / total, 3) if total else None,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"{report['updates']} updates ({report['updates_by_kind']}) in {report['elapsed_s']}s: "
+          f"{report['updates_per_second']} updates/s, {report['errors']} errors, "
+          f"{report['games_finished']}/{report['games']} games finished")
+    print(f"update latency ms: p50={report['p50_ms']} p95={report['p95_ms']} p99={report['p99_ms']}")
+    print(f"{'handler':<24} {'count':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, stats in sorted(report["handlers"].items()):
+        print(f"{name:<24} {stats['count']:>7} {stats['p50']:>8} {stats['p95']:>8} {stats['p99']:>8} {stats['max']:>8}")
+    print(f"outbound Bot API calls: {report['bot_api_calls']} ({report['bot_api_calls_per_update']} per update)")
+    print(f"outbound Django API calls: {report['backend_calls']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bot throughput benchmark against fake Bot API and Django API")
+    parser.add_argument("--games", type=int, default=100, help="pairs of virtual users, each plays one game")
+    parser.add_argument("--concurrency", type=int, default=50, help="pairs active at the same time")
+    parser.add_argument("--messages", type=int, default=3, help="chat messages per user before the game")
+    parser.add_argument("--backend-latency", type=float, default=0.0, help="fake Django API delay, seconds")
+    parser.add_argument("--telegram-limits", action="store_true", help="keep SendQueue rate limits from settings")
+    parser.add_argument("--flood-control", action="store_true", help="fake Bot API responds 429 above limits")
+    parser.add_argument("--user-base", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--api-port", type=int, default=8081)
+    parser.add_argument("--backend-port", type=int, default=8083)
+    parser.add_argument("--json", dest="json_path", help="write the report to this file")
+    args = parser.parse_args()
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
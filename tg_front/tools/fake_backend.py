@@ -0,0 +1,174 @@
+"""
+Заглушка Django API для тестів і навантажувальних прогонів tg_front без бекенду.
+
+Реалізує ендпоінти профілів TgUser і ігор (стан гри та хід, ігри створюються через add_game)
+і вміє вносити збої: затримку відповіді, частку відповідей 500 і серію помилок поспіль.
+
+    python -m tools.fake_backend --port 8000 --latency 0.05 --error-rate 0.1
+"""
+import argparse
+import asyncio
+import logging
+import random
+from collections import Counter
+
+from aiohttp import web
+
+API_PREFIX = "/api/v1/users"
+# Позначки клітинок бекенду для знаків гравців
+SIGN_MARKS = {"❌": "X", "⭕": "0"}
+LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6))
+
+
+class FakeGame:
+    """Гра в пам'яті з тими ж правилами, що й бекенд: черговість ходів, перевірка ply і кінця гри."""
+
+    def __init__(self, game_id: int, player1: int, player2: int, player1_first: bool = True,
+                 player1_symbol: str = "❌"):
+        self.id = game_id
+        self.players = (player1, player2)
+        self.player1_first = player1_first
+        self.player1_symbol = player1_symbol
+        self.player2_symbol = "⭕" if player1_symbol == "❌" else "❌"
+        self.cells = [" "] * 9
+        self.ply = 0
+        self.winner: str | None = None
+        self.winning_cells: list[int] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.winner is not None or self.ply == 9
+
+    @property
+    def next_player(self) -> int | None:
+        if self.finished:
+            return None
+        first, second = self.players if self.player1_first else self.players[::-1]
+        return first if self.ply % 2 == 0 else second
+
+    def symbol(self, player: int) -> str:
+        return self.player1_symbol if player == self.players[0] else self.player2_symbol
+
+    def move(self, player: int, cell: int, ply: int) -> bool:
+        if player != self.next_player or ply != self.ply or not 0 <= cell < 9 or self.cells[cell] != " ":
+            return False
+        mark = SIGN_MARKS[self.symbol(player)]
+        self.cells[cell] = mark
+        self.ply += 1
+        for line in LINES:
+            if all(self.cells[index] == mark for index in line):
+                self.winner = self.symbol(player)
+                self.winning_cells = list(line)
+                break
+        return True
+
+    def progress(self) -> dict:
+        return {
+            "game": {"id": self.id, "player1_first": self.player1_first,
+                     "player1_symbol": self.player1_symbol, "player2_symbol": self.player2_symbol},
+            "state": {"id": self.id * 10 + self.ply, "cells": "".join(self.cells)},
+            "ply": self.ply,
+            "next_symbol": self.symbol(self.next_player) if self.next_player is not None else None,
+            "winner": self.winner,
+            "winning_cells": self.winning_cells,
+            "finished": self.finished,
+        }
+
+
+class FakeBackend:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.fail_status = 503
+        self._fail_next = 0
+        self.tgusers: dict[int, dict] = {}
+        self.games: dict[int, FakeGame] = {}
+        self.calls: Counter[str] = Counter()
+        self.app = web.Application(middlewares=[self.faults])
+        self.app.router.add_get(API_PREFIX + "/tgusers/{tguser_id:\\d+}/", self.get_tguser)
+        self.app.router.add_post(API_PREFIX + "/tgusers/", self.create_tguser)
+        self.app.router.add_get(API_PREFIX + "/tgusers/{tguser_id:\\d+}/games/{game_id:\\d+}/", self.get_game)
+        self.app.router.add_post(API_PREFIX + "/tgusers/{tguser_id:\\d+}/games/{game_id:\\d+}/move/",
+                                 self.make_move)
+
+    @property
+    def requests(self) -> int:
+        return sum(self.calls.values())
+
+    def fail_next(self, count: int, status: int = 503) -> None:
+        """Наступні `count` запитів отримають відповідь `status`."""
+        self._fail_next = count
+        self.fail_status = status
+
+    def add_game(self, player1: int, player2: int, **options) -> FakeGame:
+        game = FakeGame(len(self.games) + 1, player1, player2, **options)
+        self.games[game.id] = game
+        return game
+
+    @web.middleware
+    async def faults(self, request: web.Request, handler):
+        self.calls[f"{request.method} {request.match_info.route.resource.canonical}"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._fail_next:
+            self._fail_next -= 1
+            return web.json_response({"detail": "Injected failure"}, status=self.fail_status)
+        if self.error_rate and random.random() < self.error_rate:
+            return web.json_response({"detail": "Injected failure"}, status=500)
+        return await handler(request)
+
+    async def get_tguser(self, request: web.Request) -> web.Response:
+        tguser = self.tgusers.get(int(request.match_info["tguser_id"]))
+        if tguser is None:
+            return web.json_response({"detail": "No TgUser matches the given query."}, status=404)
+        return web.json_response(tguser)
+
+    async def create_tguser(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        created = payload["id"] not in self.tgusers
+        self.tgusers[payload["id"]] = payload
+        return web.json_response(payload, status=201 if created else 200)
+
+    def player_game(self, request: web.Request) -> tuple[int, FakeGame | None]:
+        tguser_id = int(request.match_info["tguser_id"])
+        game = self.games.get(int(request.match_info["game_id"]))
+        if game is None or tguser_id not in game.players:
+            return tguser_id, None
+        return tguser_id, game
+
+    async def get_game(self, request: web.Request) -> web.Response:
+        _, game = self.player_game(request)
+        if game is None:
+            return web.json_response({"detail": "No Game matches the given query."}, status=404)
+        return web.json_response(game.progress())
+
+    async def make_move(self, request: web.Request) -> web.Response:
+        tguser_id, game = self.player_game(request)
+        if game is None:
+            return web.json_response({"detail": "No Game matches the given query."}, status=404)
+        payload = await request.json()
+        if not game.move(tguser_id, int(payload["cell"]), int(payload["ply"])):
+            return web.json_response({"non_field_errors": ["This move is not possible."]}, status=400)
+        return web.json_response(game.progress(), status=201)
+
+
+async def serve(backend: FakeBackend, host: str, port: int) -> web.AppRunner:
+    runner = web.AppRunner(backend.app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Django API for tg_front")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="response delay, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 500 responses")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(FakeBackend(args.latency, args.error_rate).app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
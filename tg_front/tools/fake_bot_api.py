@@ -0,0 +1,209 @@
+"""
+Локальна заглушка Telegram Bot API для офлайн-навантажувальних тестів.
+
+Бот підключається до неї через TELEGRAM_API_URL=http://<host>:<port>.
+Заглушка відповідає на методи Bot API, рахує вихідні виклики,
+віддає синтетичні оновлення через getUpdates або доставляє їх на зареєстрований webhook.
+З --flood-control імітує ліміти Telegram і відповідає 429 з retry_after.
+
+    python -m tools.fake_bot_api --port 8081 [--flood-control]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import time
+from collections import Counter
+
+import aiohttp
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Fake", "username": "fake_bot"}
+
+
+def make_user(user_id: int) -> dict:
+    return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}", "username": f"user{user_id}",
+            "language_code": "uk"}
+
+
+def make_message_update(update_id: int, user_id: int, text: str, message_id: int | None = None) -> dict:
+    """Синтетичне оновлення з текстовим повідомленням у приватному чаті."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": message_id or update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": make_user(user_id),
+            "text": text,
+            **({"entities": [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]}
+               if text.startswith("/") else {}),
+        },
+    }
+
+
+class FloodLimit:
+    """Відро токенів, яким заглушка імітує flood control Telegram (з невеликим допуском на сплески)."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil((1 - self.tokens) / self.rate))
+
+
+# (швидкість за секунду, допустимий сплеск)
+FLOOD_LIMITS = {
+    "global": (30, 30),
+    "private": (1, 3),
+    "group": (20 / 60, 20),
+}
+FLOOD_METHODS = {"sendMessage", "editMessageText", "editMessageReplyMarkup", "editMessageCaption"}
+
+
+class FakeBotAPI:
+    def __init__(self, flood_control: bool = False):
+        self.flood_control = flood_control
+        self._global_limit = FloodLimit(*FLOOD_LIMITS["global"])
+        self._chat_limits: dict[int, FloodLimit] = {}
+        self.flood_errors = 0
+        self.calls: Counter[str] = Counter()
+        self.updates: asyncio.Queue[dict] = asyncio.Queue()
+        self.webhook_url: str | None = None
+        self.webhook_secret: str | None = None
+        self._message_ids = itertools.count(1)
+        self.app = web.Application()
+        self.app.router.add_post("/bot{token}/{method}", self.handle)
+        self.app.router.add_get("/bot{token}/{method}", self.handle)
+
+    @staticmethod
+    def ok(result) -> web.Response:
+        return web.json_response({"ok": True, "result": result})
+
+    async def params(self, request: web.Request) -> dict:
+        """aiogram надсилає параметри як form-data; складні значення - JSON-рядками."""
+        if request.content_type == "application/json":
+            return await request.json()
+        data = {}
+        for key, value in (await request.post()).items():
+            try:
+                data[key] = json.loads(value)
+            except (TypeError, ValueError):
+                data[key] = value
+        return data
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self.params(request)
+        self.calls[method] += 1
+        if self.flood_control and method in FLOOD_METHODS and (response := self.check_flood(params)) is not None:
+            return response
+        response = await self.dispatch(method, params)
+        if response is not None:
+            return response
+        return web.json_response({"ok": False, "error_code": 404, "description": "Not Found: method not found"},
+                                 status=404)
+
+    def check_flood(self, params: dict) -> web.Response | None:
+        chat_id = int(params.get("chat_id", 0))
+        limit = self._chat_limits.get(chat_id)
+        if limit is None:
+            limit = self._chat_limits[chat_id] = FloodLimit(*FLOOD_LIMITS["private" if chat_id > 0 else "group"])
+        for bucket in (limit, self._global_limit):
+            if not bucket.allow():
+                self.flood_errors += 1
+                retry_after = bucket.retry_after()
+                return web.json_response({
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {retry_after}",
+                    "parameters": {"retry_after": retry_after},
+                }, status=429)
+        return None
+
+    async def dispatch(self, method: str, params: dict) -> web.Response | None:
+        match method:
+            case "getMe":
+                return self.ok(BOT_USER)
+            case "setWebhook":
+                self.webhook_url = params.get("url")
+                self.webhook_secret = params.get("secret_token")
+                return self.ok(True)
+            case "deleteWebhook":
+                self.webhook_url = None
+                return self.ok(True)
+            case "getUpdates":
+                return self.ok(await self.get_updates(float(params.get("timeout", 0))))
+            case "sendMessage":
+                return self.ok(self.message(params))
+            case "editMessageText" | "editMessageReplyMarkup" | "editMessageCaption":
+                return self.ok(self.message(params, message_id=int(params.get("message_id", 0))))
+            case "answerCallbackQuery" | "close" | "logOut":
+                return self.ok(True)
+        return None
+
+    def message(self, params: dict, message_id: int | None = None) -> dict:
+        chat_id = int(params.get("chat_id", 0))
+        result = {
+            "message_id": message_id or next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private" if chat_id > 0 else "group"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+        if params.get("reply_markup"):
+            result["reply_markup"] = params["reply_markup"]
+        return result
+
+    async def get_updates(self, timeout: float) -> list[dict]:
+        updates = []
+        try:
+            updates.append(await asyncio.wait_for(self.updates.get(), timeout=timeout or 0.01))
+        except TimeoutError:
+            return updates
+        while not self.updates.empty() and len(updates) < 100:
+            updates.append(self.updates.get_nowait())
+        return updates
+
+    async def deliver(self, session: aiohttp.ClientSession, update: dict) -> int:
+        """Надсилає оновлення на зареєстрований webhook, як це робить Telegram. Повертає HTTP-статус."""
+        headers = {"X-Telegram-Bot-Api-Secret-Token": self.webhook_secret or ""}
+        async with session.post(self.webhook_url, json=update, headers=headers) as response:
+            return response.status
+
+
+async def serve(api: FakeBotAPI, host: str, port: int) -> web.AppRunner:
+    runner = web.AppRunner(api.app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Telegram Bot API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--flood-control", action="store_true", help="respond 429 above Telegram limits")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(FakeBotAPI(flood_control=args.flood_control).app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
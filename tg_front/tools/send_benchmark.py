@@ -0,0 +1,88 @@
+"""
+Бенчмарк вихідної черги повідомлень проти заглушки Telegram з flood control.
+
+Кожен чат отримує --messages повідомлень, а перше з них ще й --edits редагувань поспіль
+(як дошка гри, що змінюється кілька разів за секунду). Без --no-queue запити йдуть через SendQueue.
+Виводить тривалість, швидкість, кількість 429 від заглушки та помилок у викликачів.
+
+    python -m tools.send_benchmark --chats 50 --messages 4 --edits 5
+    python -m tools.send_benchmark --chats 50 --messages 4 --edits 5 --no-queue
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramRetryAfter
+
+from tools.fake_bot_api import FakeBotAPI, serve
+
+
+async def run(args) -> None:
+    # Налаштування бота не потрібні бенчмарку, але src.utils читає settings при імпорті
+    for name in ("BOT_TOKEN", "BOT_NAME", "BOT_USERNAME", "POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB",
+                 "POSTGRES_HOST_CONTAINER", "DJANGO_HOST"):
+        os.environ.setdefault(name, "benchmark")
+    for name in ("POSTGRES_PORT_CONTAINER", "DJANGO_PORT"):
+        os.environ.setdefault(name, "0")
+    from src.send_queue import SendQueue
+
+    api = FakeBotAPI(flood_control=True)
+    runner = await serve(api, "127.0.0.1", args.api_port)
+    session = AiohttpSession(api=TelegramAPIServer.from_base(f"http://127.0.0.1:{args.api_port}"))
+    bot = Bot(token="42:benchmark", session=session)
+    queue = None
+    if not args.no_queue:
+        queue = SendQueue(global_rate=args.global_rate, chat_rate=args.chat_rate)
+        session.middleware(queue)
+
+    failures = 0
+
+    async def chat(chat_id: int) -> None:
+        nonlocal failures
+        try:
+            message = await bot.send_message(chat_id, "board")
+            await asyncio.gather(*(
+                bot.edit_message_text(text=f"board v{edit}", chat_id=chat_id, message_id=message.message_id)
+                for edit in range(1, args.edits + 1)
+            ))
+        except TelegramRetryAfter:
+            failures += 1
+        for number in range(1, args.messages):
+            try:
+                await bot.send_message(chat_id, f"message {number}")
+            except TelegramRetryAfter:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(chat(1000 + index) for index in range(args.chats)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    await session.close()
+    await runner.cleanup()
+
+    requested = args.chats * (args.messages + args.edits)
+    delivered = api.calls["sendMessage"] + api.calls["editMessageText"] - api.flood_errors
+    print(f"requested: {requested}, delivered: {delivered} in {elapsed:.2f}s ({delivered / elapsed:.1f} msg/s)")
+    print(f"429 responses: {api.flood_errors}, failed calls: {failures}")
+    print(f"Bot API calls: {dict(api.calls)}")
+    if queue is not None:
+        print(f"send queue: {queue.stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Outbound send queue benchmark against a fake Telegram Bot API")
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=4)
+    parser.add_argument("--edits", type=int, default=5)
+    parser.add_argument("--global-rate", type=float, default=30)
+    parser.add_argument("--chat-rate", type=float, default=1)
+    parser.add_argument("--no-queue", action="store_true")
+    parser.add_argument("--api-port", type=int, default=8083)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
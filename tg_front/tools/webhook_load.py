@@ -0,0 +1,107 @@
+"""
+Навантажувальний тест webhook-режиму проти локальної заглушки Telegram.
+
+Піднімає FakeBotAPI і FakeBackend (заглушка Django API), запускає бота в webhook-режимі в цьому ж процесі
+(з TELEGRAM_API_URL/BACKEND_API_URL, що вказують на заглушки) і надсилає N синтетичних оновлень
+з заданою конкурентністю. Виводить швидкість і затримку підтвердження (ack) webhook-ом
+та кількість вихідних викликів Bot API.
+
+    python -m tools.webhook_load --updates 5000 --concurrency 100
+"""
+import argparse
+import asyncio
+import math
+import os
+import time
+
+import aiohttp
+
+from tools import fake_backend, fake_bot_api
+from tools.fake_backend import FakeBackend
+from tools.fake_bot_api import FakeBotAPI, make_message_update
+
+# Обов'язкові налаштування, яких бот не використовує без справжніх Telegram і БД
+REQUIRED_SETTINGS = {
+    "BOT_TOKEN": "42:BENCHMARK", "BOT_NAME": "bench", "BOT_USERNAME": "bench_bot",
+    "POSTGRES_USER": "bench", "POSTGRES_PASSWORD": "bench", "POSTGRES_DB": "bench",
+    "POSTGRES_HOST_CONTAINER": "localhost", "POSTGRES_PORT_CONTAINER": "0",
+    "DJANGO_HOST": "localhost", "DJANGO_PORT": "0",
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+async def run(args) -> None:
+    api = FakeBotAPI()
+    backend = FakeBackend(latency=args.backend_latency)
+    api_runner = await fake_bot_api.serve(api, "127.0.0.1", args.api_port)
+    backend_runner = await fake_backend.serve(backend, "127.0.0.1", args.backend_port)
+    for name, value in REQUIRED_SETTINGS.items():
+        os.environ.setdefault(name, value)
+    os.environ.update(
+        BOT_MODE="webhook",
+        TELEGRAM_API_URL=f"http://127.0.0.1:{args.api_port}",
+        BACKEND_API_URL=f"http://127.0.0.1:{args.backend_port}/api/v1/",
+        METRICS_PORT="0",
+        WEBHOOK_BASE_URL=f"http://127.0.0.1:{args.webhook_port}",
+        WEBHOOK_HOST="127.0.0.1",
+        WEBHOOK_PORT=str(args.webhook_port),
+    )
+    # Імпорт після налаштування оточення: settings читаються при імпорті
+    import main as bot_main
+
+    bot_task = asyncio.create_task(bot_main.main())
+    while api.webhook_url is None:
+        await asyncio.sleep(0.05)
+
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    async with aiohttp.ClientSession() as session:
+        async def send(update_id: int) -> None:
+            update = make_message_update(update_id, user_id=1000 + update_id % args.users, text="hello")
+            async with semaphore:
+                started = time.perf_counter()
+                status = await api.deliver(session, update)
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send(i) for i in range(1, args.updates + 1)))
+        elapsed = time.perf_counter() - started
+
+    # Чекаємо, поки обробники відповідять на прийняті оновлення
+    deadline = time.monotonic() + args.drain_timeout
+    while api.calls["sendMessage"] < statuses.get(200, 0) and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    bot_task.cancel()
+    await asyncio.gather(bot_task, return_exceptions=True)
+    await api_runner.cleanup()
+    await backend_runner.cleanup()
+
+    print(f"updates sent: {args.updates} in {elapsed:.2f}s ({args.updates / elapsed:.0f} updates/s)")
+    print(f"webhook statuses: {statuses}")
+    print("ack latency ms: p50={:.2f} p95={:.2f} p99={:.2f}".format(
+        *(percentile(latencies, q) * 1000 for q in (0.5, 0.95, 0.99))))
+    print(f"outbound Bot API calls: {dict(api.calls)}")
+    print(f"Django API calls: {dict(backend.calls)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Webhook load test against a fake Telegram Bot API")
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--api-port", type=int, default=8081)
+    parser.add_argument("--webhook-port", type=int, default=8082)
+    parser.add_argument("--backend-port", type=int, default=8083)
+    parser.add_argument("--backend-latency", type=float, default=0.0, help="Django API response delay, seconds")
+    parser.add_argument("--drain-timeout", type=float, default=30)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()